@@ -0,0 +1,69 @@
+# app/benchmarks/adaptive_k.py
+"""
+Prompt-size benchmark: fixed top-3 vs adaptive k.
+
+Samples logged questions from `conversations` (or reads one question
+per line from --questions) and compares the RAG prompt built with
+both retrieval modes.
+
+Run: python -m app.benchmarks.adaptive_k --sample 500
+"""
+
+import argparse
+
+from app.rag.prompt import build_rag_prompt
+from app.rag.retriever import retrieve_context
+
+
+def load_questions(sample: int, path: str = None):
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()][:sample]
+
+    from app.db.mongo import conversations_collection
+
+    cursor = conversations_collection.aggregate([
+        {"$match": {"question": {"$type": "string"}}},
+        {"$sample": {"size": sample}},
+        {"$project": {"_id": 0, "question": 1}},
+    ])
+    return [d["question"] for d in cursor]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sample", type=int, default=500)
+    parser.add_argument("--questions", help="text file, one question per line")
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    questions = load_questions(args.sample, args.questions)
+    if not questions:
+        print("No questions to benchmark.")
+        return
+
+    fixed_chars = 0
+    adaptive_chars = 0
+    zero_context = 0
+
+    for q in questions:
+        fixed_ctx, _ = retrieve_context(q, top_k=args.top_k, adaptive=False)
+        adaptive_ctx, _ = retrieve_context(q, top_k=args.top_k, adaptive=True)
+
+        fixed_chars += len(build_rag_prompt(q, fixed_ctx))
+        adaptive_chars += len(build_rag_prompt(q, adaptive_ctx))
+        zero_context += not adaptive_ctx
+
+    n = len(questions)
+    reduction = 100.0 * (1 - adaptive_chars / fixed_chars)
+
+    # ~4 characters per token for English text
+    print(f"Questions:             {n}")
+    print(f"Avg prompt (fixed):    {fixed_chars / n:8.0f} chars  ~{fixed_chars / n / 4:6.0f} tokens")
+    print(f"Avg prompt (adaptive): {adaptive_chars / n:8.0f} chars  ~{adaptive_chars / n / 4:6.0f} tokens")
+    print(f"Reduction:             {reduction:7.1f} %")
+    print(f"No-context questions:  {zero_context} ({100.0 * zero_context / n:.1f} %)")
+
+
+if __name__ == "__main__":
+    main()
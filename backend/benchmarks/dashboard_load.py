@@ -0,0 +1,98 @@
+# app/benchmarks/dashboard_load.py
+"""
+Concurrent dashboard load test against a running server.
+
+Logs in once, then hammers the dashboard page and summary API from
+--concurrency threads for --duration seconds and prints requests per
+second and latency percentiles. Run it against a deployment before
+and after a change (same data, same worker count) to compare.
+
+Run: python -m app.benchmarks.dashboard_load --url http://localhost:8009 \
+         --email admin@example.com --password … --concurrency 50
+"""
+
+import time
+import argparse
+import threading
+import numpy as np
+import requests
+
+PATHS = ["/dashboard", "/api/dashboard/summary"]
+
+
+def login(url: str, email: str, password: str) -> str:
+    res = requests.post(
+        f"{url}/login",
+        data={"email": email, "password": password},
+        allow_redirects=False,
+        timeout=30,
+    )
+    token = res.cookies.get("access_token")
+    if not token:
+        raise SystemExit(f"Login failed (HTTP {res.status_code})")
+    return token
+
+
+def worker(url: str, token: str, deadline: float, results: list, lock):
+    session = requests.Session()
+    session.cookies.set("access_token", token)
+
+    timings, errors, i = [], 0, 0
+    while time.perf_counter() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+
+        started = time.perf_counter()
+        try:
+            res = session.get(f"{url}{path}", allow_redirects=False, timeout=30)
+            ok = res.status_code == 200
+        except requests.RequestException:
+            ok = False
+        timings.append((time.perf_counter() - started) * 1000)
+        errors += not ok
+
+    with lock:
+        results.append((timings, errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8009")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    token = login(url, args.email, args.password)
+
+    lock = threading.Lock()
+    # Warm-up pass first; only the last (measured) pass is reported
+    for seconds in (args.warmup, args.duration):
+        results = []
+        deadline = time.perf_counter() + seconds
+        threads = [
+            threading.Thread(target=worker, args=(url, token, deadline, results, lock))
+            for _ in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+    timings = np.concatenate([np.asarray(t) for t, _ in results if t])
+    errors = sum(e for _, e in results)
+
+    print(f"Concurrency: {args.concurrency}  duration: {elapsed:.1f}s  paths: {', '.join(PATHS)}")
+    print(f"Requests:    {len(timings)}  errors: {errors}")
+    print(f"Throughput:  {len(timings) / elapsed:.1f} req/s")
+    print(f"Latency:     p50 {np.percentile(timings, 50):.1f} ms  "
+          f"p95 {np.percentile(timings, 95):.1f} ms  p99 {np.percentile(timings, 99):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# app/benchmarks/dashboard_metrics.py
+"""
+Dashboard metrics latency: separate counts vs one $facet aggregation.
+
+Seeds a scratch database (<DB_NAME>_bench) with --reports reports
+(1M by default) spread over --users users, applies the app indexes,
+and times the admin and user dashboard queries both ways.
+
+Run: python -m app.benchmarks.dashboard_metrics --reports 1000000 [--keep]
+"""
+
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.db.indexes import ensure_indexes
+from app.db.mongo import DB_NAME, client
+from app.modules.home.service import (
+    user_metrics_pipeline,
+    RECENT_FIELDS,
+    REPORT_ROW_FIELDS,
+)
+
+STATUSES = ["Analyzed", "Pending", "Processing", "Failed"]
+BATCH = 10_000
+
+
+def seed(db, reports: int, users: int, conversations: int):
+    rng = random.Random(0)
+    now = datetime.utcnow()
+
+    db.users.insert_many([
+        {"email": f"user{i}@bench.local", "status": rng.choice(["Active", "Disabled"])}
+        for i in range(users)
+    ])
+
+    for start in range(0, reports, BATCH):
+        db.medical_reports.insert_many([
+            {
+                "report_id": f"R{i}",
+                "report_type": "Blood panel",
+                "user_email": f"user{rng.randrange(users)}@bench.local",
+                "status": rng.choice(STATUSES),
+                "type": "Report",
+                "description": "Uploaded report " + "x" * 200,
+                "timestamp": now - timedelta(seconds=i),
+                "created_at": now - timedelta(seconds=i),
+                "findings": ["…"] * 20,
+            }
+            for i in range(start, min(start + BATCH, reports))
+        ], ordered=False)
+        print(f"📦 Seeded {min(start + BATCH, reports):,} reports", end="\r")
+
+    for start in range(0, conversations, BATCH):
+        db.conversations.insert_many([
+            {"user_email": "user0@bench.local", "question": "q", "created_at": now}
+            for _ in range(start, min(start + BATCH, conversations))
+        ])
+    print()
+
+
+# =====================================================
+# THE TWO VARIANTS
+# =====================================================
+def legacy_admin(db):
+    return (
+        db.medical_reports.count_documents({}),
+        db.medical_reports.count_documents({"status": "Analyzed"}),
+        db.users.count_documents({"status": "Active"}),
+        db.conversations.count_documents({}),
+        list(db.medical_reports.find({}, {"_id": 0}).sort("created_at", -1).limit(5)),
+    )
+
+
+def admin_metrics_pipeline(recent: int = 5):
+    """
+    Report counts by status and the latest reports, plus the user and
+    conversation counters through uncorrelated $lookups, as one document.
+    (The app now reads admin counters from app.services.metrics.)
+    """
+    return [
+        {"$facet": {
+            "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+            "recent": [
+                {"$sort": {"created_at": -1}},
+                {"$limit": recent},
+                {"$project": RECENT_FIELDS},
+            ],
+        }},
+        {"$lookup": {
+            "from": "users",
+            "pipeline": [{"$match": {"status": "Active"}}, {"$count": "n"}],
+            "as": "active_users",
+        }},
+        {"$lookup": {
+            "from": "conversations",
+            "pipeline": [{"$count": "n"}],
+            "as": "assistant_queries",
+        }},
+    ]
+
+
+def facet_admin(db):
+    return list(db.medical_reports.aggregate(admin_metrics_pipeline()))
+
+
+def legacy_user(db, email):
+    reports = list(db.medical_reports.find({"user_email": email}, {"_id": 0})
+                   .sort("created_at", -1))
+    return (
+        len(reports),
+        len([r for r in reports if r.get("status") == "Analyzed"]),
+        len([r for r in reports if r.get("status") != "Analyzed"]),
+    )
+
+
+def facet_user(db, email):
+    return list(db.medical_reports.aggregate(user_metrics_pipeline(email)))
+
+
+def timed(func, runs: int):
+    func()  # warm-up
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return np.percentile(timings, 50), np.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--conversations", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    args = parser.parse_args()
+
+    db_name = f"{DB_NAME}_bench"
+    db = client[db_name]
+
+    if db.medical_reports.estimated_document_count() != args.reports:
+        client.drop_database(db_name)
+        seed(db, args.reports, args.users, args.conversations)
+    ensure_indexes(db)
+
+    email = "user1@bench.local"
+    variants = [
+        ("admin: 4 counts + find", lambda: legacy_admin(db)),
+        ("admin: $facet", lambda: facet_admin(db)),
+        ("user: find + Python count", lambda: legacy_user(db, email)),
+        ("user: $facet", lambda: facet_user(db, email)),
+    ]
+
+    print(f"Reports: {args.reports:,}  users: {args.users:,}  "
+          f"reports/user ≈ {args.reports // args.users:,}")
+    print(f"{'variant':<28} {'p50 ms':>9} {'mean ms':>9}")
+    for name, func in variants:
+        p50, mean = timed(func, args.runs)
+        print(f"{name:<28} {p50:>9.1f} {mean:>9.1f}")
+
+    print(f"(user rows projected to {len(REPORT_ROW_FIELDS) - 1} fields in the $facet variant)")
+
+    if not args.keep:
+        client.drop_database(db_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# app/benchmarks/encoder_backends.py
+"""
+Query encoder backend benchmark: torch vs ONNX (fp32 / int8).
+
+Each backend runs in a fresh interpreter so import + load time and
+peak RSS are not skewed by the others. Per-query latency is measured
+on single-question batches, as the chat endpoint encodes them.
+
+Run: python -m app.benchmarks.encoder_backends --queries 200
+"""
+
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+
+QUESTIONS = [
+    "What are the symptoms of type 2 diabetes?",
+    "How is high blood pressure treated?",
+    "What causes migraine headaches?",
+    "Is Marfan syndrome inherited?",
+    "What are the side effects of metformin?",
+    "How can I prevent osteoporosis?",
+    "What is the outlook for people with Parkinson's disease?",
+    "What tests diagnose celiac disease?",
+]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(backend: str, queries: int) -> dict:
+    """Child process side: load, warm up, time single-query encodes."""
+    import numpy as np
+
+    started = time.perf_counter()
+    from app.rag import encoder
+    model = encoder.create(backend)
+    startup = time.perf_counter() - started
+
+    model.encode(QUESTIONS[:1])
+
+    timings = []
+    for i in range(queries):
+        started = time.perf_counter()
+        model.encode([QUESTIONS[i % len(QUESTIONS)]])
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "backend": backend,
+        "startup_s": startup,
+        "rss_mb": _peak_rss_mb(),
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "torch_loaded": "torch" in sys.modules,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--child", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.queries)))
+        return
+
+    print(f"{'backend':<10} {'startup s':>10} {'RSS MB':>8} {'p50 ms':>8} {'p99 ms':>8}  torch")
+
+    for backend in args.backends:
+        result = subprocess.run(
+            [sys.executable, "-m", "app.benchmarks.encoder_backends",
+             "--child", backend, "--queries", str(args.queries)],
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            print(f"{backend:<10} failed: {result.stderr.strip().splitlines()[-1:]}")
+            continue
+
+        r = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{backend:<10} {r['startup_s']:>10.2f} {r['rss_mb']:>8.0f} "
+              f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}  {'yes' if r['torch_loaded'] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
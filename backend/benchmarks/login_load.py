@@ -0,0 +1,140 @@
+# app/benchmarks/login_load.py
+"""
+Login burst vs concurrent chat latency, against a running server.
+
+Two phases of --duration seconds each:
+  1. chat only: --chat-concurrency threads post to /api/assistant/chat
+  2. chat + logins: the same, plus --login-concurrency threads posting
+     /login as fast as they can (password hashing on the server)
+
+Prints login throughput (and rejections from the hashing queue limit,
+a redirect carrying Retry-After) and chat latency percentiles for both phases. Run before and
+after a change with the same worker count; a --message answered from
+the precomputed cache keeps the LLM out of the chat timings.
+
+Run: python -m app.benchmarks.login_load --url http://localhost:8009 \
+         --email user@example.com --password … --login-concurrency 32
+"""
+
+import time
+import argparse
+import threading
+import numpy as np
+import requests
+
+from app.benchmarks.dashboard_load import login
+
+
+def chat_worker(url: str, token: str, message: str, deadline: float, out: dict, lock):
+    session = requests.Session()
+    session.cookies.set("access_token", token)
+
+    timings, errors = [], 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            res = session.post(f"{url}/api/assistant/chat", json={"message": message}, timeout=120)
+            ok = res.status_code == 200
+        except requests.RequestException:
+            ok = False
+        timings.append((time.perf_counter() - started) * 1000)
+        errors += not ok
+
+    with lock:
+        out["chat"].extend(timings)
+        out["chat_errors"] += errors
+
+
+def login_worker(url: str, email: str, password: str, deadline: float, out: dict, lock):
+    session = requests.Session()
+
+    timings, ok_count, rejected, errors = [], 0, 0, 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            res = session.post(
+                f"{url}/login",
+                data={"email": email, "password": password},
+                allow_redirects=False,
+                timeout=120,
+            )
+            if res.status_code == 303 and "access_token" in res.cookies:
+                ok_count += 1
+            elif "Retry-After" in res.headers:
+                rejected += 1
+            else:
+                errors += 1
+        except requests.RequestException:
+            errors += 1
+        timings.append((time.perf_counter() - started) * 1000)
+
+    with lock:
+        out["login"].extend(timings)
+        out["logins"] += ok_count
+        out["rejected"] += rejected
+        out["login_errors"] += errors
+
+
+def run_phase(args, url: str, token: str, logins: bool) -> dict:
+    out = {"chat": [], "chat_errors": 0, "login": [], "logins": 0, "rejected": 0, "login_errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    threads = [
+        threading.Thread(target=chat_worker, args=(url, token, args.message, deadline, out, lock))
+        for _ in range(args.chat_concurrency)
+    ]
+    if logins:
+        threads += [
+            threading.Thread(target=login_worker,
+                             args=(url, args.email, args.password, deadline, out, lock))
+            for _ in range(args.login_concurrency)
+        ]
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    out["elapsed"] = time.perf_counter() - started
+    return out
+
+
+def percentiles(timings) -> str:
+    if not timings:
+        return "n/a"
+    values = np.asarray(timings)
+    return (f"p50 {np.percentile(values, 50):.1f} ms  p95 {np.percentile(values, 95):.1f} ms  "
+            f"p99 {np.percentile(values, 99):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8009")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--message", default="What are the symptoms of diabetes?")
+    parser.add_argument("--chat-concurrency", type=int, default=4)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    token = login(url, args.email, args.password)
+
+    baseline = run_phase(args, url, token, logins=False)
+    burst = run_phase(args, url, token, logins=True)
+
+    print(f"Chat concurrency: {args.chat_concurrency}  login concurrency: "
+          f"{args.login_concurrency}  phase duration: {args.duration:.0f}s")
+    print(f"Chat only:      {len(baseline['chat'])} req ({baseline['chat_errors']} errors)  "
+          f"{percentiles(baseline['chat'])}")
+    print(f"Chat + logins:  {len(burst['chat'])} req ({burst['chat_errors']} errors)  "
+          f"{percentiles(burst['chat'])}")
+    print(f"Logins:         {burst['logins'] / burst['elapsed']:.1f} /s  "
+          f"({burst['logins']} ok, {burst['rejected']} rejected busy, "
+          f"{burst['login_errors']} errors)  {percentiles(burst['login'])}")
+
+
+if __name__ == "__main__":
+    main()
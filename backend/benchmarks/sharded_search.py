@@ -0,0 +1,73 @@
+# app/benchmarks/sharded_search.py
+"""
+Sharded exact search scaling benchmark.
+
+Scores a synthetic (rows × 384) float32 matrix with 1, 2, 4, … shards
+up to the core count and prints latency / speed-up per shard count.
+Pass --store to benchmark the real on-disk store instead.
+
+Run: python -m app.benchmarks.sharded_search --rows 2000000
+"""
+
+import os
+import time
+import argparse
+import numpy as np
+
+from app.rag import retriever, store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--store", help="benchmark this store directory instead")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    if args.store:
+        matrix = np.ascontiguousarray(store.load_embeddings(args.store))
+    else:
+        matrix = rng.standard_normal((args.rows, args.dim), dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    queries = rng.standard_normal((args.queries, matrix.shape[1]), dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    retriever._embeddings = matrix
+    retriever.MIN_SHARD_ROWS = 1
+    runs = [(0, len(matrix))]
+
+    cores = os.cpu_count() or 1
+    shard_counts = sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i <= cores], cores})
+
+    print(f"Matrix: {matrix.shape[0]:,} × {matrix.shape[1]}  cores: {cores}")
+    print(f"{'shards':>6} {'p50 ms':>9} {'mean ms':>9} {'speed-up':>9}")
+
+    baseline = None
+    expected = None
+    for shards in shard_counts:
+        retriever._search(queries[0], runs, args.top_k, shards=shards)  # warm-up
+
+        timings = []
+        for q in queries:
+            started = time.perf_counter()
+            rows, _ = retriever._search(q, runs, args.top_k, shards=shards)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        # Every shard count must return the same exact top-k
+        if expected is None:
+            expected = rows
+        elif not np.array_equal(np.sort(expected), np.sort(rows)):
+            print("⚠ result mismatch at", shards, "shards")
+
+        mean = float(np.mean(timings))
+        baseline = baseline or mean
+        print(f"{shards:>6} {np.percentile(timings, 50):>9.2f} {mean:>9.2f} {baseline / mean:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
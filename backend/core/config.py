@@ -0,0 +1,47 @@
+# app/core/config.py
+"""
+Environment settings shared across modules, and the default admin.
+
+The first administrator comes from DEFAULT_ADMIN_EMAIL /
+DEFAULT_ADMIN_PASSWORD; ensure_default_admin() creates it at startup if
+no user with that email exists yet and never touches an existing one.
+"""
+
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMAIL_SENDER = os.getenv("EMAIL_SENDER")
+EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
+
+DEFAULT_ADMIN_EMAIL = os.getenv("DEFAULT_ADMIN_EMAIL", "").strip().lower()
+DEFAULT_ADMIN_PASSWORD = os.getenv("DEFAULT_ADMIN_PASSWORD")
+DEFAULT_ADMIN_NAME = os.getenv("DEFAULT_ADMIN_NAME", "Administrator")
+
+
+def ensure_default_admin():
+    if not DEFAULT_ADMIN_EMAIL or not DEFAULT_ADMIN_PASSWORD:
+        print("⚠ DEFAULT_ADMIN_EMAIL / DEFAULT_ADMIN_PASSWORD not set — no default admin")
+        return
+
+    from app.core.security import hash_password
+    from app.db.mongo import users_collection
+
+    # Upsert on the unique email: concurrent workers create it once
+    result = users_collection.update_one(
+        {"email": DEFAULT_ADMIN_EMAIL},
+        {"$setOnInsert": {
+            "name": DEFAULT_ADMIN_NAME,
+            "email": DEFAULT_ADMIN_EMAIL,
+            "password": hash_password(DEFAULT_ADMIN_PASSWORD),
+            "role": "Admin",
+            "status": "Active",
+            "created_at": datetime.utcnow(),
+        }},
+        upsert=True,
+    )
+    if result.upserted_id is not None:
+        print(f"✅ Default admin created ({DEFAULT_ADMIN_EMAIL})")
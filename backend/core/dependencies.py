@@ -0,0 +1,117 @@
+# app/core/dependencies.py
+"""
+Request dependencies: who is calling, and may they.
+
+get_current_user → the caller's email from the access token, as
+                   already verified by the auth guard (app.main).
+get_user_context → the caller's user document (no password), loaded
+once per request and kept on request.state.user. Documents come from a
+short-TTL in-process cache, so a page load costs at most one users
+lookup, and usually none.
+
+Endpoints that change a user's role, status or profile call
+invalidate_user(); other workers catch up within USER_CACHE_TTL_SECONDS.
+"""
+
+import os
+import time
+
+from fastapi import Depends, HTTPException, Request
+
+from app.core.token_cache import verify_token
+from app.db.async_mongo import users_collection
+
+ADMIN_ROLE = "Admin"
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+# email → (expires_at, user document)
+_users = {}
+
+
+# =============================
+# USER CACHE
+# =============================
+async def load_user(email: str):
+    """User document without the password hash, or None."""
+    now = time.monotonic()
+    entry = _users.get(email)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    user = await users_collection.find_one({"email": email}, {"password": 0})
+    if user is None:
+        # Not cached: a signup must be visible right away
+        return None
+
+    if len(_users) >= USER_CACHE_MAX_ENTRIES:
+        # Drop the oldest entry (dicts keep insertion order)
+        _users.pop(next(iter(_users)), None)
+    _users.pop(email, None)
+    _users[email] = (now + USER_CACHE_TTL_SECONDS, user)
+    return user
+
+
+def invalidate_user(email: str):
+    _users.pop(email, None)
+
+
+# =============================
+# DEPENDENCIES
+# =============================
+def request_token(request: Request):
+    token = request.cookies.get("access_token")
+    if token:
+        return token
+
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    return credentials if scheme.lower() == "bearer" and credentials else None
+
+
+def resolve_identity(request: Request):
+    """Caller's email (or None), verified at most once per request."""
+    if not hasattr(request.state, "user_email"):
+        token = request_token(request)
+        request.state.user_email = verify_token(token) if token else None
+    return request.state.user_email
+
+
+async def get_current_user(request: Request) -> str:
+    """Email of the authenticated caller; 401 otherwise."""
+    email = resolve_identity(request)
+
+    if not email:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return email
+
+
+async def get_user_context(
+    request: Request,
+    email: str = Depends(get_current_user),
+) -> dict:
+    """The caller's user document, resolved once per request."""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        user = await load_user(email)
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        request.state.user = user
+    return user
+
+
+async def admin_required(user: dict = Depends(get_user_context)) -> dict:
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Administrator access required")
+    return user
+
+
+# =============================
+# ROLE CHECKS
+# =============================
+def is_admin(user) -> bool:
+    return bool(user) and user.get("role") == ADMIN_ROLE
+
+
+async def is_admin_by_email(email: str) -> bool:
+    return is_admin(await load_user(email))
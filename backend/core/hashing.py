@@ -0,0 +1,70 @@
+# app/core/hashing.py
+"""
+Password hashing off the event loop.
+
+hash_password / verify_password are deliberately slow CPU work. Called
+inside an async handler they stall every other request on the worker,
+so handlers await these wrappers instead. The work runs on a dedicated,
+bounded thread pool (bcrypt releases the GIL while hashing). At most
+HASH_QUEUE_LIMIT hashes can be queued or running; beyond that the call
+raises HashingBusy right away rather than piling up behind a burst. Form
+handlers turn it into a flash message; elsewhere the app answers 503 +
+Retry-After (see app.main).
+
+    if not await verify_password_async(password, user["password"]):
+        ...
+"""
+
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.security import hash_password, verify_password
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(HASH_WORKERS * 16)))
+
+RETRY_AFTER_SECONDS = 1
+BUSY_MESSAGE = "Too many sign-in requests, please retry shortly"
+
+_executor = None
+_pending = 0
+
+
+class HashingBusy(Exception):
+    """The hashing queue is full; retry after RETRY_AFTER_SECONDS."""
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="hash")
+    return _executor
+
+
+async def _run(func, *args):
+    global _pending
+
+    if _pending >= HASH_QUEUE_LIMIT:
+        raise HashingBusy(BUSY_MESSAGE)
+
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await _run(verify_password, password, hashed)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
@@ -0,0 +1,82 @@
+# app/core/security.py
+"""
+Access tokens and password hashes.
+
+Tokens are HS256 JWTs (python-jose) carrying the user's email in `sub`
+and an `exp`; the same tokens back the password reset links. Passwords
+are hashed with bcrypt; hash_password / verify_password are slow on
+purpose, so async handlers go through app.core.hashing.
+
+SECRET_KEY is required: the import fails without it, so the app never
+starts signing tokens with a missing key.
+"""
+
+import os
+import re
+from datetime import datetime, timedelta
+
+import bcrypt
+from dotenv import load_dotenv
+from jose import JWTError, jwt
+
+load_dotenv()
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    raise RuntimeError("SECRET_KEY is not set (environment or .env)")
+
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+
+# Starts with a capital, at least 7 characters, one of @ # $ % (see signup.html)
+PASSWORD_PATTERN = re.compile(r"^[A-Z](?=.*[@#$%]).{6,}$")
+
+# bcrypt only reads this many bytes; newer releases refuse longer input
+BCRYPT_MAX_BYTES = 72
+
+
+# =============================
+# TOKENS
+# =============================
+def create_access_token(email: str) -> str:
+    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    payload = {"sub": email, "exp": expire}
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def verify_access_token(token: str):
+    """The token's claims if the signature and `exp` check out, else None."""
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return claims if claims.get("sub") else None
+
+
+def decode_token(token: str):
+    """The token's email, or None if it is invalid or expired."""
+    claims = verify_access_token(token)
+    return claims["sub"] if claims else None
+
+
+# =============================
+# PASSWORDS
+# =============================
+def _secret(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt()).decode("ascii")
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(_secret(password), hashed.encode("ascii"))
+    except ValueError:
+        # Malformed or unknown hash format
+        return False
+
+
+def validate_password(password: str) -> bool:
+    return bool(PASSWORD_PATTERN.match(password or ""))
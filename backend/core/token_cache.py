@@ -0,0 +1,53 @@
+# app/core/token_cache.py
+"""
+Bounded cache of verified access tokens.
+
+Verifying a JWT checks its signature on every call; a browser sends
+the same token with every request, so the result is kept per token
+string until the token's own `exp` (or TOKEN_CACHE_TTL_SECONDS, if
+sooner). Only successfully verified tokens are cached, and an expired
+entry is never served.
+"""
+
+import os
+import time
+from collections import OrderedDict
+
+from app.core.security import verify_access_token
+
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+# token → (expires_at epoch seconds, email), least recently used first
+_tokens = OrderedDict()
+
+
+def verify_token(token: str):
+    """The token's email if it is valid and unexpired, else None."""
+    now = time.time()
+
+    entry = _tokens.get(token)
+    if entry is not None:
+        if entry[0] > now:
+            _tokens.move_to_end(token)
+            return entry[1]
+        del _tokens[token]
+
+    claims = verify_access_token(token)
+    if claims is None:
+        return None
+
+    email = claims["sub"]
+    exp = claims.get("exp")
+    expires_at = now + TOKEN_CACHE_TTL_SECONDS
+    if exp is not None:
+        expires_at = min(expires_at, float(exp))
+
+    _tokens[token] = (expires_at, email)
+    if len(_tokens) > TOKEN_CACHE_MAX_ENTRIES:
+        _tokens.popitem(last=False)
+    return email
+
+
+def clear():
+    _tokens.clear()
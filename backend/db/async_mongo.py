@@ -0,0 +1,77 @@
+# app/db/async_mongo.py
+"""
+Async (Motor) access to the MedExplain database for request handlers.
+
+The client is opened and closed by the app lifespan (see app.main) and
+uses CLIENT_OPTIONS from app.db.mongo (pool size and timeouts). The sync
+client there, still used by background jobs and CLI scripts, has the
+same settings except for its own, smaller minPoolSize.
+
+Collections are exposed under the same names as in app.db.mongo, so a
+handler only swaps the import and awaits the call:
+
+    from app.db.async_mongo import users_collection
+    user = await users_collection.find_one({"email": email})
+"""
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.db.mongo import CLIENT_OPTIONS, DB_NAME, MONGO_URL
+
+_client = None
+_db = None
+
+
+# =============================
+# LIFESPAN
+# =============================
+async def connect():
+    global _client, _db
+
+    if _client is not None:
+        return
+
+    _client = AsyncIOMotorClient(MONGO_URL, **CLIENT_OPTIONS)
+    _db = _client[DB_NAME]
+
+    # Fail fast at startup instead of on the first request
+    await _client.admin.command("ping")
+    print(f"✅ Async Mongo connected (pool {CLIENT_OPTIONS['minPoolSize']}"
+          f"–{CLIENT_OPTIONS['maxPoolSize']})")
+
+
+def close():
+    global _client, _db
+
+    if _client is not None:
+        _client.close()
+    _client = _db = None
+
+
+def get_db():
+    """Return the async MedExplain database reference."""
+    if _db is None:
+        raise RuntimeError("Async Mongo client is not connected")
+    return _db
+
+
+# =============================
+# COLLECTIONS
+# =============================
+class _Collection:
+    """Resolves to the Motor collection once the client is connected."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self.name], attr)
+
+
+users_collection = _Collection("users")
+conversations_collection = _Collection("conversations")
+reports_collection = _Collection("medical_reports")
+audit_logs_collection = _Collection("audit_logs")
+role_history_collection = _Collection("role_history")
+metrics_collection = _Collection("metrics")
+usage_rollups_collection = _Collection("usage_rollups")
@@ -0,0 +1,238 @@
+# app/db/indexes.py
+"""
+Declarative index registry.
+
+INDEXES lists every index the application relies on; ensure_indexes()
+applies them idempotently (an existing identical index is a no-op) and
+runs at startup. QUERY_SHAPES lists the filters/sorts the code issues;
+report_unindexed() explains each one and reports collection scans and
+in-memory sorts, so a new query without an index shows up in the logs.
+
+Run: python -m app.db.indexes [--report-only]
+"""
+
+import os
+import argparse
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.db.mongo import db
+
+INDEX_REPORT = os.getenv("MONGO_INDEX_REPORT", "true").lower() in ("1", "true", "yes")
+
+# Hot window for conversations; older records are expired by a TTL index
+# (after the archiver has copied them, see app.jobs.conversation_archive).
+# 0 keeps conversations forever.
+CONVERSATION_RETENTION_DAYS = int(os.getenv("CONVERSATION_RETENTION_DAYS", "0"))
+
+
+def _ttl(days: int) -> dict:
+    return {"expireAfterSeconds": days * 86400} if days > 0 else {}
+
+
+# =============================
+# REGISTRY
+# =============================
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("status", ASCENDING)], name="status"),
+    ],
+    "medical_reports": [
+        IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING)],
+                   name="user_email_created_at"),
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+        IndexModel([("status", ASCENDING)], name="status"),
+    ],
+    "conversations": [
+        IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING)],
+                   name="user_email_created_at"),
+        IndexModel([("created_at", DESCENDING)], name="created_at",
+                   **_ttl(CONVERSATION_RETENTION_DAYS)),
+    ],
+    "role_history": [
+        IndexModel([("timestamp", DESCENDING)], name="timestamp"),
+        IndexModel([("target_user", ASCENDING), ("timestamp", DESCENDING)],
+                   name="target_user_timestamp"),
+    ],
+    "audit_logs": [
+        IndexModel([("timestamp", ASCENDING)], name="timestamp"),
+        IndexModel([("user_email", ASCENDING), ("timestamp", ASCENDING)],
+                   name="user_email_timestamp"),
+    ],
+    "precomputed_answers": [
+        IndexModel([("version", ASCENDING), ("key", ASCENDING)],
+                   name="version_key_unique", unique=True),
+    ],
+    "usage_rollups": [
+        IndexModel([("granularity", ASCENDING), ("start", ASCENDING)],
+                   name="granularity_start"),
+    ],
+    "knowledge": [
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+}
+
+# (collection, filter, sort) as issued by the application; values are
+# placeholders, only the shape matters to the planner
+QUERY_SHAPES = [
+    ("users", {"email": "user@example.com"}, None),
+    ("users", {"status": "Active"}, None),
+    ("medical_reports", {"user_email": "user@example.com"}, [("created_at", -1)]),
+    ("medical_reports", {}, [("created_at", -1)]),
+    ("medical_reports", {"status": "Analyzed"}, None),
+    ("conversations", {"user_email": "user@example.com"}, [("created_at", -1)]),
+    ("conversations", {"created_at": {"$gte": 0}}, [("created_at", 1)]),
+    ("role_history", {}, [("timestamp", -1)]),
+    ("role_history", {"target_user": "user@example.com"}, [("timestamp", -1)]),
+    ("role_history", {"timestamp": {"$gte": 0}}, [("timestamp", 1)]),
+    ("audit_logs", {"timestamp": {"$gte": 0}}, [("timestamp", 1)]),
+    ("audit_logs", {"user_email": "user@example.com"}, [("timestamp", 1)]),
+    ("precomputed_answers", {"version": "v"}, None),
+    ("usage_rollups", {"granularity": "day", "start": {"$gte": 0}}, [("start", 1)]),
+    ("knowledge", {"updated_at": {"$gte": 0}}, [("updated_at", 1)]),
+]
+
+
+# =============================
+# APPLY
+# =============================
+INDEX_OPTIONS_CONFLICT = 85
+
+
+def _sync_ttl(database, collection: str, models) -> bool:
+    """
+    Brings existing TTL indexes in line with the registry (a changed
+    retention window) and returns True if anything changed. A new
+    window is applied with collMod; a TTL the registry no longer has
+    (retention set back to 0) is removed by dropping the index so it is
+    recreated without one. False if some other option differs.
+    """
+    existing = database[collection].index_information()
+    updated = False
+
+    for model in models:
+        spec = model.document
+        current = existing.get(spec["name"])
+        if current is None:
+            continue
+
+        wanted = spec.get("expireAfterSeconds")
+        present = current.get("expireAfterSeconds")
+        if wanted == present:
+            continue
+
+        if wanted is None:
+            database[collection].drop_index(spec["name"])
+            print(f"⚠⚠ TTL REMOVED from {collection}.{spec['name']} "
+                  f"(was {present // 86400} days): records are no longer expired")
+        else:
+            database.command("collMod", collection, index={
+                "name": spec["name"],
+                "expireAfterSeconds": wanted,
+            })
+            print(f"✅ TTL on {collection}.{spec['name']} set to {wanted // 86400} days")
+        updated = True
+
+    return updated
+
+
+def _apply(database, collection: str, models) -> int:
+    try:
+        return len(database[collection].create_indexes(models))
+    except OperationFailure as e:
+        # A changed retention window: adjust the TTL in place and retry
+        if e.code == INDEX_OPTIONS_CONFLICT and _sync_ttl(database, collection, models):
+            return len(database[collection].create_indexes(models))
+        raise
+
+
+def ensure_indexes(database=db) -> int:
+    """Creates missing indexes; conflicts are reported, never fatal."""
+    ensured = 0
+
+    for collection, models in INDEXES.items():
+        try:
+            ensured += _apply(database, collection, models)
+        except OperationFailure as e:
+            # e.g. duplicate emails blocking the unique index, or an
+            # index with the same keys but other options already there
+            reason = (e.details or {}).get("errmsg", e)
+            print(f"⚠ Index setup failed on {collection}: {reason}")
+
+    print(f"✅ Indexes ensured ({ensured} specs across {len(INDEXES)} collections)")
+    return ensured
+
+
+# =============================
+# REPORT
+# =============================
+# Plan stages that read through an index
+INDEX_STAGES = {"IXSCAN", "IDHACK", "COUNT_SCAN", "DISTINCT_SCAN", "EXPRESS_IXSCAN"}
+
+
+def _stages(plan):
+    """
+    Every stage name in a (possibly nested) winning plan. With the slot
+    based engine (MongoDB 6+) the classic tree sits under `queryPlan`.
+    """
+    if plan.get("stage"):
+        yield plan["stage"]
+
+    children = list(plan.get("inputStages", []))
+    for key in ("queryPlan", "inputStage", "outerStage", "innerStage"):
+        if plan.get(key):
+            children.append(plan[key])
+
+    for child in children:
+        yield from _stages(child)
+
+
+def explain_shape(collection: str, query: dict, sort=None, database=db):
+    command = {"find": collection, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+
+    explained = database.command("explain", command, verbosity="queryPlanner")
+    return set(_stages(explained["queryPlanner"]["winningPlan"]))
+
+
+def report_unindexed(database=db):
+    """Prints and returns [(collection, filter, sort, problem)] for bad shapes."""
+    problems = []
+
+    for collection, query, sort in QUERY_SHAPES:
+        try:
+            stages = explain_shape(collection, query, sort, database)
+        except OperationFailure as e:
+            print(f"⚠ Could not explain {collection} {query}: {e}")
+            continue
+
+        if "COLLSCAN" in stages:
+            problems.append((collection, query, sort, "collection scan"))
+        elif "SORT" in stages:
+            problems.append((collection, query, sort, "in-memory sort"))
+        elif not stages & INDEX_STAGES:
+            problems.append((collection, query, sort, f"unknown plan {sorted(stages)}"))
+
+    for collection, query, sort, problem in problems:
+        print(f"⚠ Unindexed query ({problem}): {collection} filter={query} sort={sort}")
+    if not problems:
+        print(f"✅ All {len(QUERY_SHAPES)} known query shapes use an index")
+
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply / check MongoDB indexes")
+    parser.add_argument("--report-only", action="store_true",
+                        help="only explain the known query shapes")
+    args = parser.parse_args()
+
+    if not args.report_only:
+        ensure_indexes()
+    report_unindexed()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,27 @@ DB_NAME = os.getenv("DB_NAME", "medexplain_db")
 if not MONGO_URL:
     raise RuntimeError("MONGO_URL missing in environment!")
 
-client = MongoClient(
-    MONGO_URL,
-    tls=True,
-    tlsAllowInvalidCertificates=True,
-)
+# Shared by the sync client (jobs, scripts) and the async client (routes)
+CLIENT_OPTIONS = {
+    "tls": True,
+    "tlsAllowInvalidCertificates": True,
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "10")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_MS", "60000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000")),
+}
+
+# Jobs and scripts use a few connections now and then; idle sockets are
+# reopened on demand instead of held open next to the async pool
+SYNC_CLIENT_OPTIONS = {
+    **CLIENT_OPTIONS,
+    "minPoolSize": int(os.getenv("MONGO_SYNC_MIN_POOL_SIZE", "0")),
+}
+
+client = MongoClient(MONGO_URL, **SYNC_CLIENT_OPTIONS)
 
 db = client[DB_NAME]
 
@@ -28,6 +44,11 @@ conversations_collection = db["conversations"]
 reports_collection = db["medical_reports"]
 audit_logs_collection = db["audit_logs"]
 role_history_collection = db["role_history"]
+precomputed_answers_collection = db["precomputed_answers"]
+job_locks_collection = db["job_locks"]
+knowledge_collection = db["knowledge"]
+metrics_collection = db["metrics"]
+usage_rollups_collection = db["usage_rollups"]
 
 
 def get_collections():
@@ -37,6 +58,11 @@ def get_collections():
         "reports": reports_collection,
         "audit_logs": audit_logs_collection,
         "role_history": role_history_collection,
+        "precomputed_answers": precomputed_answers_collection,
+        "job_locks": job_locks_collection,
+        "knowledge": knowledge_collection,
+        "metrics": metrics_collection,
+        "usage_rollups": usage_rollups_collection,
     }
 
 
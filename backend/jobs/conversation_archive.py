@@ -0,0 +1,194 @@
+# app/jobs/conversation_archive.py
+"""
+Cold archive for conversations.
+
+Conversations older than ARCHIVE_AFTER_DAYS are copied, one UTC day per
+file, into gzip-compressed NDJSON under ARCHIVE_DIR:
+
+    <ARCHIVE_DIR>/2024/05/2024-05-17.ndjson.gz
+
+The TTL index on conversations.created_at (CONVERSATION_RETENTION_DAYS,
+see app.db.indexes) deletes them from the hot collection afterwards, so
+the archive lag must be shorter than the retention window. Days are
+archived oldest first and a file is only renamed into place once
+complete, so the archive is always a contiguous run of whole days and
+re-running the job is a no-op.
+
+ARCHIVE_DIR must be storage shared by every worker and kept across
+deployments (a mounted volume, not the container filesystem).
+
+Per-day record counts are kept in `metrics` (_id "conversation_archive")
+so totals spanning the archive (dashboard counters) need no file reads.
+
+Run: python -m app.jobs.conversation_archive
+"""
+
+import os
+import glob
+import gzip
+import argparse
+from datetime import datetime, timedelta
+
+from bson import json_util
+
+from app.db.indexes import CONVERSATION_RETENTION_DAYS
+from app.db.mongo import conversations_collection, metrics_collection
+
+# ===============================
+# CONFIG
+# ===============================
+ARCHIVE_DIR = os.getenv("CONVERSATION_ARCHIVE_DIR", "/app/data/archive/conversations")
+
+# Two days of headroom before the TTL monitor removes a day
+ARCHIVE_AFTER_DAYS = int(os.getenv(
+    "CONVERSATION_ARCHIVE_AFTER_DAYS",
+    str(max(CONVERSATION_RETENTION_DAYS - 2, 1) if CONVERSATION_RETENTION_DAYS else 0),
+))
+
+FILE_SUFFIX = ".ndjson.gz"
+BATCH_SIZE = 1000
+
+COUNTS_ID = "conversation_archive"
+
+
+def _day(value: datetime) -> datetime:
+    return datetime(value.year, value.month, value.day)
+
+
+def day_path(day: datetime) -> str:
+    return os.path.join(ARCHIVE_DIR, f"{day:%Y}", f"{day:%m}", f"{day:%Y-%m-%d}{FILE_SUFFIX}")
+
+
+def archived_days():
+    """Archived days, oldest first."""
+    pattern = os.path.join(ARCHIVE_DIR, "*", "*", f"*{FILE_SUFFIX}")
+    return sorted(
+        datetime.strptime(os.path.basename(path)[:-len(FILE_SUFFIX)], "%Y-%m-%d")
+        for path in glob.glob(pattern)
+    )
+
+
+def archived_until():
+    """End of the last archived day; hot records before it are duplicates."""
+    days = archived_days()
+    return days[-1] + timedelta(days=1) if days else None
+
+
+# ===============================
+# WRITE
+# ===============================
+def archive_day(day: datetime) -> int:
+    """Writes one day's conversations to its archive file; returns the count."""
+    query = {"created_at": {"$gte": day, "$lt": day + timedelta(days=1)}}
+    cursor = conversations_collection.find(query).sort("created_at", 1).batch_size(BATCH_SIZE)
+
+    path = day_path(day)
+    tmp_path = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    count = 0
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        for doc in cursor:
+            f.write(json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS) + "\n")
+            count += 1
+
+    if count:
+        os.replace(tmp_path, path)
+        _record_count(day, count)
+    else:
+        os.remove(tmp_path)
+    return count
+
+
+def _record_count(day: datetime, count: int):
+    metrics_collection.update_one(
+        {"_id": COUNTS_ID},
+        {"$set": {f"days.{day:%Y-%m-%d}": count}},
+        upsert=True,
+    )
+
+
+def archive(after_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    """Archives every whole day older than `after_days` not yet on disk."""
+    if after_days <= 0:
+        return 0
+    if CONVERSATION_RETENTION_DAYS and after_days >= CONVERSATION_RETENTION_DAYS:
+        print(f"⚠ Archive lag ({after_days}d) is not shorter than retention "
+              f"({CONVERSATION_RETENTION_DAYS}d); days may expire before they are archived")
+
+    cutoff = _day(datetime.utcnow() - timedelta(days=after_days))
+    resume = archived_until()
+
+    query = {"created_at": {"$lt": cutoff}}
+    if resume:
+        query["created_at"]["$gte"] = resume
+
+    oldest = conversations_collection.find_one(query, {"created_at": 1}, sort=[("created_at", 1)])
+    if oldest is None:
+        return 0
+
+    day, days, records = _day(oldest["created_at"]), 0, 0
+    while day < cutoff:
+        count = archive_day(day)
+        if count:
+            days += 1
+            records += count
+        day += timedelta(days=1)
+
+    print(f"✅ Archived {records} conversations over {days} day(s) to {ARCHIVE_DIR}")
+    return records
+
+
+# ===============================
+# READ
+# ===============================
+def iter_archived(start: datetime = None, end: datetime = None, user: str = None):
+    """
+    Archived conversations in [start, end), oldest first, optionally for
+    one user. Yields documents with their original types restored.
+    """
+    for day in archived_days():
+        if (start and day + timedelta(days=1) <= start) or (end and day >= end):
+            continue
+
+        with gzip.open(day_path(day), "rt", encoding="utf-8") as f:
+            for line in f:
+                doc = json_util.loads(line)
+                created_at = doc.get("created_at")
+                if start and created_at < start:
+                    continue
+                if end and created_at >= end:
+                    continue
+                if user and doc.get("user_email") != user:
+                    continue
+                yield doc
+
+
+def archived_count() -> int:
+    """Conversations in the archive; days archived without a recorded count are counted once."""
+    counts = (metrics_collection.find_one({"_id": COUNTS_ID}) or {}).get("days", {})
+
+    total = 0
+    for day in archived_days():
+        count = counts.get(f"{day:%Y-%m-%d}")
+        if count is None:
+            with gzip.open(day_path(day), "rt", encoding="utf-8") as f:
+                count = sum(1 for _ in f)
+            _record_count(day, count)
+        total += count
+    return total
+
+
+# ===============================
+# CLI
+# ===============================
+def main():
+    parser = argparse.ArgumentParser(description="Archive old conversations")
+    parser.add_argument("--after-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    args = parser.parse_args()
+
+    archive(args.after_days)
+
+
+if __name__ == "__main__":
+    main()
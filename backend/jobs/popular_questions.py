@@ -0,0 +1,149 @@
+# app/jobs/popular_questions.py
+"""
+Precomputes answers for the most frequently asked questions.
+
+Mines conversations for the top normalized questions, runs them through
+the regular RAG pipeline against the current store and LLM model, and
+upserts the results into precomputed_answers keyed by (key, version).
+
+Run: python -m app.jobs.popular_questions [--top-n 200] [--min-count 3]
+"""
+
+import os
+import argparse
+from datetime import datetime, timedelta
+
+from app.db.mongo import conversations_collection, precomputed_answers_collection
+from app.rag.prompt import build_rag_prompt
+from app.rag.retriever import retrieve_context
+from app.services import answer_cache
+from app.services.llm import NO_RESPONSE_REPLY, UNAVAILABLE_REPLY, generate_response
+
+# ===============================
+# CONFIG
+# ===============================
+TOP_N = int(os.getenv("PRECOMPUTE_TOP_N", "200"))
+MIN_COUNT = int(os.getenv("PRECOMPUTE_MIN_COUNT", "3"))
+LOOKBACK_DAYS = int(os.getenv("PRECOMPUTE_LOOKBACK_DAYS", "30"))
+
+# Candidates pulled from Mongo before merging in Python; the pipeline's
+# lowercase/trim key is coarser-grained than normalize_question
+MINE_LIMIT_FACTOR = 5
+
+
+# ===============================
+# MINING
+# ===============================
+def popular_questions(top_n: int = TOP_N, min_count: int = MIN_COUNT,
+                      lookback_days: int = LOOKBACK_DAYS):
+    """[(key, question, count), …] most frequent first."""
+    since = datetime.utcnow() - timedelta(days=lookback_days)
+
+    pipeline = [
+        # Filtered and restricted-source questions are not cacheable
+        {"$match": {"created_at": {"$gte": since}, "retrieval.sources": None}},
+        {"$group": {
+            "_id": {"$ifNull": [
+                "$question_norm",
+                {"$toLower": {"$trim": {"input": "$question"}}},
+            ]},
+            "question": {"$first": "$question"},
+            "count": {"$sum": 1},
+        }},
+        {"$sort": {"count": -1}},
+        {"$limit": top_n * MINE_LIMIT_FACTOR},
+    ]
+
+    merged = {}
+    for row in conversations_collection.aggregate(pipeline, allowDiskUse=True):
+        key = answer_cache.normalize_question(row["_id"] or "")
+        if not key:
+            continue
+        entry = merged.setdefault(key, {"question": row["question"], "count": 0})
+        entry["count"] += row["count"]
+
+    ranked = sorted(merged.items(), key=lambda item: item[1]["count"], reverse=True)
+    return [
+        (key, entry["question"], entry["count"])
+        for key, entry in ranked[:top_n]
+        if entry["count"] >= min_count
+    ]
+
+
+# ===============================
+# PRECOMPUTE
+# ===============================
+def precompute(top_n: int = TOP_N, min_count: int = MIN_COUNT,
+               lookback_days: int = LOOKBACK_DAYS):
+    version = answer_cache.current_version()
+    questions = popular_questions(top_n, min_count, lookback_days)
+
+    existing = {
+        entry["key"]
+        for entry in precomputed_answers_collection.find(
+            {"version": version}, {"_id": 0, "key": 1}
+        )
+    }
+
+    computed = 0
+    failed = 0
+    for key, question, count in questions:
+        now = datetime.utcnow()
+
+        # Already answered for this store/model → only refresh its rank
+        if key in existing:
+            precomputed_answers_collection.update_one(
+                {"key": key, "version": version},
+                {"$set": {"count": count, "updated_at": now}},
+            )
+            continue
+
+        retrieval = {}
+        context, sources = retrieve_context(question, trace=retrieval)
+        reply = generate_response(build_rag_prompt(question, context))
+
+        # Never cache a failure reply
+        if reply in (NO_RESPONSE_REPLY, UNAVAILABLE_REPLY):
+            failed += 1
+            continue
+
+        precomputed_answers_collection.update_one(
+            {"key": key, "version": version},
+            {"$set": {
+                "question": question,
+                "reply": reply,
+                "sources": sources,
+                "retrieval": retrieval,
+                "count": count,
+                "updated_at": now,
+            }, "$setOnInsert": {"created_at": now}},
+            upsert=True,
+        )
+        computed += 1
+
+    # Drop answers for older stores/models and questions that fell out
+    keys = [key for key, _, _ in questions]
+    stale = precomputed_answers_collection.delete_many({
+        "$or": [{"version": {"$ne": version}}, {"key": {"$nin": keys}}]
+    }).deleted_count
+
+    loaded = answer_cache.reload()
+    print(f"✅ Precomputed answers: {computed} new, {len(questions) - computed - failed} "
+          f"kept, {failed} failed, {stale} stale removed ({loaded} loaded)")
+
+
+# ===============================
+# CLI
+# ===============================
+def main():
+    parser = argparse.ArgumentParser(description="Precompute popular answers")
+    parser.add_argument("--top-n", type=int, default=TOP_N)
+    parser.add_argument("--min-count", type=int, default=MIN_COUNT)
+    parser.add_argument("--lookback-days", type=int, default=LOOKBACK_DAYS)
+    args = parser.parse_args()
+
+    precompute(args.top_n, args.min_count, args.lookback_days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# app/jobs/scheduler.py
+"""
+Minimal in-process periodic job runner.
+
+Jobs are plain sync functions run on a worker thread. Jobs that must
+run once per deployment (not once per Uvicorn worker) take a lease in
+job_locks first; whoever holds the unexpired lease is the leader.
+
+Jobs report through `log` (app.jobs), which propagates to Uvicorn's
+error logger, so its INFO lines land in the server log.
+"""
+
+import os
+import logging
+import socket
+import asyncio
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.db.mongo import job_locks_collection
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+log = logging.getLogger("uvicorn.error").getChild("app.jobs")
+
+_tasks = []
+
+
+# ===============================
+# LEADER LEASE
+# ===============================
+def acquire_lease(name: str, seconds: float) -> bool:
+    """True if this worker holds (or just took) the `name` lease."""
+    now = datetime.utcnow()
+    try:
+        lock = job_locks_collection.find_one_and_update(
+            {
+                "_id": name,
+                "$or": [{"owner": WORKER_ID}, {"expires_at": {"$lt": now}}],
+            },
+            {"$set": {
+                "owner": WORKER_ID,
+                "expires_at": now + timedelta(seconds=seconds),
+            }},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Lease exists and is held by another live worker
+        return False
+
+    return lock is not None and lock["owner"] == WORKER_ID
+
+
+# ===============================
+# PERIODIC JOBS
+# ===============================
+async def _run_periodically(name: str, func, interval: float,
+                            leader_only: bool, delay: float):
+    await asyncio.sleep(delay)
+
+    while True:
+        try:
+            if not leader_only or await asyncio.to_thread(
+                acquire_lease, name, interval * 1.5
+            ):
+                await asyncio.to_thread(func)
+        except Exception:
+            log.exception("Job %s failed", name)
+
+        await asyncio.sleep(interval)
+
+
+def schedule(name: str, func, interval: float, leader_only: bool = False,
+             delay: float = 0):
+    """Runs `func` every `interval` seconds in the background."""
+    task = asyncio.create_task(
+        _run_periodically(name, func, interval, leader_only, delay),
+        name=f"job:{name}",
+    )
+    _tasks.append(task)
+    return task
+
+
+async def stop():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -1,13 +1,34 @@
 # app/main.py
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.openapi.utils import get_openapi
 from fastapi.templating import Jinja2Templates
 
-from app.core.security import decode_token
+from app.core import hashing
 from app.core.config import ensure_default_admin
+from app.db import async_mongo
+from app.db.indexes import INDEX_REPORT, ensure_indexes, report_unindexed
+from app.services import metrics
+
+
+# =====================================================
+# LIFESPAN
+# =====================================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await async_mongo.connect()
+    initialize()
+    await start_jobs()
+
+    yield
+
+    await stop_jobs()
+    hashing.shutdown()
+    async_mongo.close()
 
 
 # =====================================================
@@ -22,6 +43,7 @@ app = FastAPI(
         "• Clinical Decision Support (Not Diagnosis)\n"
         "• Audit-safe & Ethics-first"
     ),
+    lifespan=lifespan,
 )
 
 
@@ -68,11 +90,13 @@ app.openapi = custom_openapi
 # =====================================================
 # ROUTERS — UI
 # =====================================================
+from app.modules.admin.router import ui_router as admin_ui_router
 from app.modules.auth.router import ui_router as auth_ui_router
 from app.modules.home.router import ui_router as home_ui_router
 from app.modules.profile.router import ui_router as profile_ui_router
 from app.modules.users.router import api_router as users_api_router
 
+app.include_router(admin_ui_router)
 app.include_router(auth_ui_router)
 app.include_router(home_ui_router)
 app.include_router(profile_ui_router)
@@ -82,8 +106,10 @@ app.include_router(users_api_router)
 # =====================================================
 # ROUTERS — API (CORE MODULES TEMPORARILY DISABLED)
 # =====================================================
+from app.modules.admin.router import api_router as admin_api_router
 from app.modules.auth.router import api_router as auth_api_router
 
+app.include_router(admin_api_router)
 app.include_router(auth_api_router)
 
 # 🔒 COMMENTED CORE MEDICAL MODULES
@@ -103,31 +129,36 @@ app.include_router(assistant_api_router)
 # =====================================================
 # PUBLIC & PROTECTED UI ROUTE GUARD
 # =====================================================
+from app.core.dependencies import resolve_identity
+
 PUBLIC_PATHS = {
-    "/", "/login", "/signup",
+    "/login", "/signup",
     "/forgot-password", "/reset-password",
 }
 
-PUBLIC_PREFIXES = [
-    "/static", "/favicon", "/docs", "/openapi.json",
-]
+PUBLIC_PREFIXES = (
+    "/static", "/favicon", "/docs", "/redoc", "/openapi.json",
+)
 
 
 @app.middleware("http")
 async def authentication_guard(request: Request, call_next):
     path = request.url.path.lower()
 
-    token = request.cookies.get("access_token")
-    email = decode_token(token) if token else None
-    logged_in = email is not None
+    # Assets and public pages never need the token
+    if path.startswith(PUBLIC_PREFIXES) or path in PUBLIC_PATHS:
+        return await call_next(request)
 
-    # Allow all API routes
+    # API routes enforce auth through dependencies (get_current_user)
     if path.startswith("/api"):
         return await call_next(request)
 
-    # Public UI routes
-    if path in PUBLIC_PATHS or any(path.startswith(p) for p in PUBLIC_PREFIXES):
-        if logged_in and path == "/":
+    # Verified once (cached per token) and left on request.state, so
+    # get_current_user doesn't verify it again
+    logged_in = resolve_identity(request) is not None
+
+    if path == "/":
+        if logged_in:
             return RedirectResponse("/dashboard", status_code=303)
         return await call_next(request)
 
@@ -140,14 +171,103 @@ async def authentication_guard(request: Request, call_next):
     return response
 
 
+# =====================================================
+# ERROR HANDLERS
+# =====================================================
+@app.exception_handler(hashing.HashingBusy)
+async def hashing_busy(request: Request, exc: hashing.HashingBusy):
+    # Form routes catch this themselves and flash the message instead
+    return JSONResponse(
+        {"detail": str(exc)},
+        status_code=503,
+        headers={"Retry-After": str(hashing.RETRY_AFTER_SECONDS)},
+    )
+
+
 # =====================================================
 # STARTUP INITIALIZATION
 # =====================================================
-@app.on_event("startup")
 def initialize():
     """
     Governance initialization:
+    • Ensures required indexes exist
+    • Seeds the dashboard counters on first start
     • Ensures default admin exists
     • System ready for secure operation
     """
+    ensure_indexes()
+    if INDEX_REPORT:
+        report_unindexed()
+
+    metrics.seed()
     ensure_default_admin()
+
+
+# =====================================================
+# BACKGROUND JOBS
+# =====================================================
+import os
+from app.jobs import scheduler
+
+# 0 disables the popular-question precompute job
+PRECOMPUTE_INTERVAL_MINUTES = float(os.getenv("PRECOMPUTE_INTERVAL_MINUTES", "360"))
+ANSWER_CACHE_RELOAD_MINUTES = float(os.getenv("ANSWER_CACHE_RELOAD_MINUTES", "10"))
+METRICS_RECONCILE_MINUTES = float(os.getenv("METRICS_RECONCILE_MINUTES", "15"))
+ARCHIVE_INTERVAL_MINUTES = float(os.getenv("CONVERSATION_ARCHIVE_INTERVAL_MINUTES", "60"))
+USAGE_ROLLUP_MINUTES = float(os.getenv("USAGE_ROLLUP_MINUTES", "10"))
+
+
+async def start_jobs():
+    from app.services import answer_cache
+
+    try:
+        print(f"✅ Answer cache loaded ({answer_cache.reload()} entries)")
+    except Exception as e:
+        print(f"⚠ Answer cache not loaded: {e}")
+
+    if PRECOMPUTE_INTERVAL_MINUTES > 0:
+        from app.jobs.popular_questions import precompute
+
+        # One worker recomputes; every worker picks up its results
+        scheduler.schedule(
+            "popular_questions", precompute,
+            interval=PRECOMPUTE_INTERVAL_MINUTES * 60,
+            leader_only=True, delay=60,
+        )
+        scheduler.schedule(
+            "answer_cache_reload", answer_cache.reload,
+            interval=ANSWER_CACHE_RELOAD_MINUTES * 60,
+            delay=ANSWER_CACHE_RELOAD_MINUTES * 60,
+        )
+
+    if METRICS_RECONCILE_MINUTES > 0:
+        from app.services.metrics import reconcile
+
+        scheduler.schedule(
+            "metrics_reconcile", reconcile,
+            interval=METRICS_RECONCILE_MINUTES * 60,
+            leader_only=True,
+        )
+
+    if USAGE_ROLLUP_MINUTES > 0:
+        from app.services.usage_rollups import rollup
+
+        scheduler.schedule(
+            "usage_rollups", rollup,
+            interval=USAGE_ROLLUP_MINUTES * 60,
+            leader_only=True, delay=30,
+        )
+
+    from app.jobs import conversation_archive
+
+    if ARCHIVE_INTERVAL_MINUTES > 0 and conversation_archive.ARCHIVE_AFTER_DAYS > 0:
+        # Must keep up with the TTL monitor on conversations.created_at
+        scheduler.schedule(
+            "conversation_archive", conversation_archive.archive,
+            interval=ARCHIVE_INTERVAL_MINUTES * 60,
+            leader_only=True, delay=120,
+        )
+
+
+async def stop_jobs():
+    await scheduler.stop()
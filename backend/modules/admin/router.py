@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Request, Form, Depends
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, Request, Form, Depends, HTTPException, Query
+from fastapi.responses import RedirectResponse, StreamingResponse
 from datetime import datetime
-
-from app.core.config import users_collection, role_history_collection
-from app.core.dependencies import admin_required, get_current_user
+from typing import Literal
+
+from app.db.async_mongo import users_collection, role_history_collection
+from app.core.dependencies import admin_required, get_current_user, invalidate_user
+from app.modules.users.service import list_role_history, list_users
+from app.services import metrics
+from app.services.exports import FORMATS, export_stream
+from app.services.usage_rollups import usage_series
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, stringify_ids
 from app.utils.email_utils import send_role_change_email
 from app.main import templates
 
@@ -22,26 +28,58 @@ api_router = APIRouter(
     dependencies=[Depends(admin_required)],
 )
 
+# =====================================================
+# PAGING HELPERS
+# =====================================================
+def page_links(request: Request, page: dict) -> dict:
+    """Prev / next / first-page URLs that keep the current filters."""
+    def with_cursor(token):
+        return str(request.url.include_query_params(cursor=token)) if token else None
+
+    return {
+        "next_url": with_cursor(page["next_cursor"]),
+        "prev_url": with_cursor(page["prev_cursor"]),
+        "first_url": str(request.url.remove_query_params("cursor")),
+    }
+
+
+async def load_page(loader, **params):
+    """UI pages fall back to the first page on a stale or tampered cursor."""
+    try:
+        return await loader(**params)
+    except ValueError:
+        return await loader(**{**params, "cursor": None})
+
+
 # =====================================================
 # UI: USER & ACCESS MANAGEMENT
 # =====================================================
 @ui_router.get("/admin/users", include_in_schema=False)
 async def admin_users_page(
     request: Request,
+    q: str = None,
+    role: str = None,
+    status: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
     admin_email: str = Depends(get_current_user),
 ):
     """
-    Displays all platform users with roles & status.
+    Displays platform users with roles & status, one page at a time.
     Used for governance and access control.
     """
-    users = list(users_collection.find({}, {"password": 0}))
+    page = await load_page(
+        list_users, q=q, role=role, status=status, limit=limit, cursor=cursor
+    )
     flash = request.cookies.get("flash")
 
     response = templates.TemplateResponse(
-        "admin/users.html",
+        "admin_users.html",
         {
             "request": request,
-            "users": users,
+            "users": page["items"],
+            "filters": {"q": q or "", "role": role or "", "status": status or ""},
+            **page_links(request, page),
             "active_page": "users",
             "is_admin": True,
             "flash": flash,
@@ -67,8 +105,10 @@ async def update_user_role(
     Updates user role.
     Records audit history and notifies user via email.
     """
+    # Emails are stored lowercase; history filters match them that way
+    user_email_target = user_email_target.strip().lower()
 
-    user = users_collection.find_one({"email": user_email_target})
+    user = await users_collection.find_one({"email": user_email_target})
     if not user:
         resp = RedirectResponse("/admin/users", status_code=303)
         resp.set_cookie("flash", "User not found", max_age=4)
@@ -76,14 +116,15 @@ async def update_user_role(
 
     old_role = user.get("role", "User")
 
-    users_collection.update_one(
+    await users_collection.update_one(
         {"email": user_email_target},
         {"$set": {"role": new_role}},
     )
+    invalidate_user(user_email_target)
 
     # ---- AUDIT + EMAIL (only if changed) ----
     if old_role != new_role:
-        role_history_collection.insert_one(
+        await role_history_collection.insert_one(
             {
                 "target_user": user_email_target,
                 "changed_by": admin_email,
@@ -122,17 +163,20 @@ async def update_user_status(
     Enables or disables user access.
     Used for security & compliance.
     """
+    email = email.strip().lower()
 
-    user = users_collection.find_one({"email": email})
+    user = await users_collection.find_one({"email": email})
     if not user:
         resp = RedirectResponse("/admin/users", status_code=303)
         resp.set_cookie("flash", "User not found", max_age=4)
         return resp
 
-    users_collection.update_one(
+    await users_collection.update_one(
         {"email": email},
         {"$set": {"status": status}},
     )
+    invalidate_user(email)
+    await metrics.record_user_status_change(user.get("status"), status)
 
     resp = RedirectResponse("/admin/users", status_code=303)
     resp.set_cookie("flash", "User status updated", max_age=4)
@@ -145,18 +189,21 @@ async def update_user_status(
 @ui_router.get("/admin/role-history", include_in_schema=False)
 async def role_history_page(
     request: Request,
+    user: str = None,
+    role: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
     admin_email: str = Depends(get_current_user),
 ):
     """
-    Displays role change history.
+    Displays role change history, newest first, one page at a time.
     This is part of MedExplain's governance & audit trail.
     """
 
-    history = list(
-        role_history_collection
-        .find({}, {"_id": 0})
-        .sort("timestamp", -1)
+    page = await load_page(
+        list_role_history, user=user, role=role, limit=limit, cursor=cursor
     )
+    history = page["items"]
 
     # Format timestamps for UI
     for item in history:
@@ -168,10 +215,12 @@ async def role_history_page(
     flash = request.cookies.get("flash")
 
     response = templates.TemplateResponse(
-        "admin/role_history.html",
+        "role_history.html",
         {
             "request": request,
             "history": history,
+            "filters": {"user": user or "", "role": role or ""},
+            **page_links(request, page),
             "active_page": "role_history",
             "is_admin": True,
             "flash": flash,
@@ -188,15 +237,26 @@ async def role_history_page(
 # API: LIST USERS (JSON)
 # =====================================================
 @api_router.get("/users")
-async def api_list_users():
+async def api_list_users(
+    q: str = None,
+    role: str = None,
+    status: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+):
     """
-    Returns all users (excluding passwords).
+    Returns one page of users (excluding passwords).
     Used by dashboards or admin tooling.
     """
+    try:
+        page = await list_users(q, role, status, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     return {
-        "users": list(
-            users_collection.find({}, {"password": 0})
-        )
+        "users": stringify_ids(page["items"]),
+        "next_cursor": page["next_cursor"],
+        "prev_cursor": page["prev_cursor"],
     }
 
 
@@ -204,13 +264,80 @@ async def api_list_users():
 # API: ROLE HISTORY (JSON)
 # =====================================================
 @api_router.get("/role-history")
-async def api_role_history():
+async def api_role_history(
+    user: str = None,
+    role: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+):
     """
-    Returns role change audit history.
+    Returns one page of role change audit history, newest first.
     """
-    history = list(
-        role_history_collection
-        .find({}, {"_id": 0})
-        .sort("timestamp", -1)
+    try:
+        page = await list_role_history(user, role, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "history": stringify_ids(page["items"]),
+        "next_cursor": page["next_cursor"],
+        "prev_cursor": page["prev_cursor"],
+    }
+
+
+# =====================================================
+# API: BULK EXPORT (STREAMED)
+# =====================================================
+@api_router.get("/export/{dataset}")
+async def api_export(
+    dataset: Literal["conversations", "role_history", "audit_logs"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: datetime = None,
+    end: datetime = None,
+    user: str = None,
+    gzip: bool = False,
+    include_archive: bool = False,
+):
+    """
+    Streams every matching record, oldest first, as NDJSON or CSV.
+    Rows are read from a cursor and written as they arrive, so memory
+    stays flat whatever the export size. include_archive=true adds
+    conversations already moved to the cold archive.
+    """
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    filename = f"{dataset}_{datetime.utcnow():%Y%m%d_%H%M%S}.{format}"
+    media_type = FORMATS[format]
+    if gzip:
+        # Delivered as a .gz file, not transparently decoded by the client
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        export_stream(
+            dataset, format, start, end, user,
+            gzip=gzip, include_archive=include_archive,
+        ),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+        },
     )
-    return {"history": history}
+
+
+# =====================================================
+# API: ASSISTANT USAGE (FROM ROLLUPS)
+# =====================================================
+@api_router.get("/usage")
+async def api_usage(
+    granularity: Literal["hour", "day"] = "day",
+    periods: int = Query(30, ge=1, le=366),
+):
+    """
+    Assistant usage per hour or day: queries, emergency rate, answer
+    cache hits, average / p95 latency and top sources.
+    Reads the precomputed rollups only.
+    """
+    return await usage_series(granularity, periods)
@@ -1,13 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+import time
 from datetime import datetime
 
 from app.core.dependencies import get_current_user
-from app.db.mongo import conversations_collection
+from app.db.async_mongo import conversations_collection
+from app.services import answer_cache, metrics
 from app.services.emergency import detect_emergency
 from app.services.llm import generate_response
 
-from app.rag.retriever import retrieve_context
+from app.rag.retriever import available_sources, retrieve_context, unknown_sources
 from app.rag.prompt import build_rag_prompt
 
 api_router = APIRouter(
@@ -20,6 +23,8 @@ api_router = APIRouter(
 # =========================
 class ChatRequest(BaseModel):
     message: str
+    # Restrict retrieval, e.g. ["MedQuAD"] or ["BioASQ | 2_GARD_QA"]
+    sources: list[str] | None = None
 
 class ChatResponse(BaseModel):
     reply: str
@@ -28,9 +33,25 @@ class ChatResponse(BaseModel):
     sources: list[str]
 
 
+# =========================
+# RETRIEVAL SOURCES
+# =========================
+@api_router.get("/sources")
+async def list_sources(user_email: str = Depends(get_current_user)):
+    """Source partitions that can be passed as `sources` to /chat."""
+    return {"sources": await run_in_threadpool(available_sources)}
+
+
 # =========================
 # CHAT ENDPOINT (MEDQUAD CSV RAG)
 # =========================
+def answer(message: str, sources, retrieval: dict):
+    """Blocking RAG pipeline: retrieval (CPU) and the Ollama call (HTTP)."""
+    context, cited = retrieve_context(message, sources=sources, trace=retrieval)
+    prompt = build_rag_prompt(message, context)
+    return generate_response(prompt), cited
+
+
 @api_router.post("/chat", response_model=ChatResponse)
 async def chat(
     payload: ChatRequest,
@@ -40,28 +61,58 @@ async def chat(
     if not message:
         raise HTTPException(status_code=400, detail="Message cannot be empty")
 
+    if payload.sources:
+        unknown = await run_in_threadpool(unknown_sources, payload.sources)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown sources: {', '.join(unknown)} (see /api/assistant/sources)",
+            )
+
+    started = time.perf_counter()
+
     # 🚨 Emergency detection
     emergency = detect_emergency(message)
 
-    # 🔍 Retrieve MedQuAD context
-    context, sources = retrieve_context(message)
+    question_norm = answer_cache.normalize_question(message)
 
-    # 🧠 Build safe RAG prompt
-    prompt = build_rag_prompt(message, context)
+    # ⚡ Precomputed answer for a popular question (unfiltered only)
+    cached = None if payload.sources else answer_cache.lookup(message)
+
+    if cached:
+        reply = cached["reply"]
+        sources = cached["sources"]
+        # The trace is from when the answer was computed: keep what was
+        # retrieved, drop its timings
+        retrieval = {
+            **{k: v for k, v in cached.get("retrieval", {}).items() if k != "rerank"},
+            "cached": True,
+        }
+        pipeline = "precomputed_answer"
+    else:
+        # 🔍 Retrieve → 🧠 prompt → 🤖 LLM, off the event loop
+        retrieval = {}
+        reply, sources = await run_in_threadpool(
+            answer, message, payload.sources, retrieval
+        )
+        pipeline = "rag_medquad_csv"
 
-    # 🤖 LLM inference
-    reply = generate_response(prompt)
+    latency_ms = round((time.perf_counter() - started) * 1000, 1)
 
     # 🗃️ Mongo audit log
-    conversations_collection.insert_one({
+    await conversations_collection.insert_one({
         "user_email": user_email,
         "question": message,
+        "question_norm": question_norm,
         "reply": reply,
         "sources": sources,
         "emergency": emergency,
+        "retrieval": retrieval,
         "created_at": datetime.utcnow(),
-        "pipeline": "rag_medquad_csv",
+        "pipeline": pipeline,
+        "latency_ms": latency_ms,
     })
+    await metrics.record_conversation()
 
     return {
         "reply": reply,
@@ -1,17 +1,23 @@
 from fastapi import APIRouter, Request, Form, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
 from datetime import datetime
+from pymongo.errors import DuplicateKeyError
 
 from app.main import templates
-from app.core.config import users_collection
+from app.db.async_mongo import users_collection
 from app.core.security import (
-    hash_password,
-    verify_password,
     create_access_token,
     decode_token,
     validate_password,
 )
-from app.core.dependencies import get_current_user, is_admin
+from app.core.hashing import (
+    RETRY_AFTER_SECONDS,
+    HashingBusy,
+    hash_password_async,
+    verify_password_async,
+)
+from app.core.dependencies import get_user_context, is_admin, load_user, resolve_identity
+from app.services import metrics
 from app.utils.email_utils import (
     send_account_created_email,
     send_reset_password_email,
@@ -32,8 +38,15 @@ def flash_redirect(url: str, message: str):
     return response
 
 
-def redirect_user(email: str):
-    return "/dashboard" if is_admin(email) else "/home"
+def busy_redirect(url: str, message: str):
+    """Flash for a form posted while the hashing queue is full."""
+    response = flash_redirect(url, message)
+    response.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return response
+
+
+def redirect_user(user: dict):
+    return "/dashboard" if is_admin(user) else "/home"
 
 
 # =====================================================
@@ -48,11 +61,11 @@ api_router = APIRouter(prefix="/api/auth", tags=["Auth"])
 # =====================================================
 @ui_router.get("/", response_class=HTMLResponse, include_in_schema=False)
 async def landing(request: Request):
-    token = request.cookies.get("access_token")
-    email = decode_token(token) if token else None
+    email = resolve_identity(request)
+    user = await load_user(email) if email else None
 
-    if email:
-        return RedirectResponse(redirect_user(email), status_code=303)
+    if user:
+        return RedirectResponse(redirect_user(user), status_code=303)
 
     flash = request.cookies.get("flash")
     response = templates.TemplateResponse(
@@ -89,15 +102,20 @@ async def login(
     password: str = Form(...),
 ):
     email = email.strip().lower()
-    user = users_collection.find_one({"email": email})
+    user = await users_collection.find_one({"email": email})
 
-    if not user or not verify_password(password, user["password"]):
+    try:
+        valid = bool(user) and await verify_password_async(password, user["password"])
+    except HashingBusy as e:
+        return busy_redirect("/login", str(e))
+
+    if not valid:
         return flash_redirect("/login", "Invalid email or password")
 
     token = create_access_token(email)
 
     response = RedirectResponse(
-        redirect_user(email),
+        redirect_user(user),
         status_code=303,
     )
     response.set_cookie(
@@ -144,17 +162,27 @@ async def signup(
     if not validate_password(password):
         return flash_redirect("/signup", "Weak password")
 
-    if users_collection.find_one({"email": email}):
+    if await users_collection.find_one({"email": email}):
         return flash_redirect("/signup", "Email already registered")
 
-    users_collection.insert_one({
-        "name": fullname,
-        "email": email,
-        "password": hash_password(password),
-        "role": "User",
-        "status": "Active",
-        "created_at": datetime.utcnow(),
-    })
+    try:
+        hashed = await hash_password_async(password)
+    except HashingBusy as e:
+        return busy_redirect("/signup", str(e))
+
+    try:
+        await users_collection.insert_one({
+            "name": fullname,
+            "email": email,
+            "password": hashed,
+            "role": "User",
+            "status": "Active",
+            "created_at": datetime.utcnow(),
+        })
+    except DuplicateKeyError:
+        # A concurrent signup for the same email won the unique index
+        return flash_redirect("/signup", "Email already registered")
+    await metrics.record_user_created("Active")
 
     send_account_created_email(email, fullname, password)
 
@@ -192,7 +220,7 @@ async def forgot_password_page(request: Request):
 @ui_router.post("/forgot-password", include_in_schema=False)
 async def forgot_password(email: str = Form(...)):
     email = email.strip().lower()
-    user = users_collection.find_one({"email": email})
+    user = await users_collection.find_one({"email": email})
 
     if not user:
         return flash_redirect("/forgot-password", "Email not found")
@@ -244,9 +272,14 @@ async def reset_password(
             "Weak password",
         )
 
-    users_collection.update_one(
+    try:
+        hashed = await hash_password_async(password)
+    except HashingBusy as e:
+        return busy_redirect(f"/reset-password?token={token}", str(e))
+
+    await users_collection.update_one(
         {"email": email},
-        {"$set": {"password": hash_password(password)}},
+        {"$set": {"password": hashed}},
     )
 
     return flash_redirect("/login", "Password reset successful!")
@@ -256,9 +289,6 @@ async def reset_password(
 # AUTH API
 # =====================================================
 @api_router.get("/me")
-async def me(user_email: str = Depends(get_current_user)):
-    user = users_collection.find_one(
-        {"email": user_email},
-        {"password": 0},
-    )
-    return {"user": user}
+async def me(user: dict = Depends(get_user_context)):
+    # The context is shared through the cache; don't mutate it
+    return {"user": {**user, "_id": str(user["_id"])}}
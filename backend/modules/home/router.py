@@ -4,12 +4,9 @@ from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
 from datetime import datetime
 
-from app.core.config import (
-    users_collection,
-    reports_collection,
-    conversations_collection,
-)
-from app.core.dependencies import get_current_user, is_admin
+from app.core.dependencies import get_current_user, get_user_context, is_admin
+from app.modules.home.service import admin_metrics, user_metrics
+from app.services.usage_rollups import usage_series
 from app.main import templates
 
 
@@ -29,19 +26,18 @@ api_router = APIRouter(
 @ui_router.get("/home", response_class=HTMLResponse, include_in_schema=False)
 async def home(
     request: Request,
-    user_email: str = Depends(get_current_user),
+    user: dict = Depends(get_user_context),
 ):
     """
     Home page after login.
     Lightweight overview + navigation.
     """
     flash = request.cookies.get("flash")
-    user = users_collection.find_one({"email": user_email})
-    is_admin_user = is_admin(user_email)
+    is_admin_user = is_admin(user)
 
     context = {
         "request": request,
-        "user": user.get("name") if user else user_email,
+        "user": user.get("name") or user["email"],
         "active_page": "home",
         "is_admin": is_admin_user,
         "flash": flash,
@@ -59,7 +55,7 @@ async def home(
 @ui_router.get("/dashboard", response_class=HTMLResponse, include_in_schema=False)
 async def dashboard(
     request: Request,
-    user_email: str = Depends(get_current_user),
+    user: dict = Depends(get_user_context),
 ):
     """
     Main dashboard.
@@ -68,65 +64,29 @@ async def dashboard(
     """
 
     flash = request.cookies.get("flash")
-    user = users_collection.find_one({"email": user_email})
-    is_admin_user = is_admin(user_email)
+    user_email = user["email"]
+    is_admin_user = is_admin(user)
 
     # ---------------- ADMIN METRICS ----------------
     if is_admin_user:
-        total_reports = reports_collection.count_documents({})
-        analyzed_reports = reports_collection.count_documents(
-            {"status": "Analyzed"}
-        )
-        active_users = users_collection.count_documents(
-            {"status": "Active"}
-        )
-        assistant_queries = conversations_collection.count_documents({})
-
-        recent_activity = list(
-            reports_collection
-            .find({}, {"_id": 0})
-            .sort("created_at", -1)
-            .limit(5)
-        )
-
         context = {
             "request": request,
             "active_page": "dashboard",
             "is_admin": True,
-            "user": user.get("name") if user else user_email,
-            "total_reports": total_reports,
-            "analyzed_reports": analyzed_reports,
-            "active_users": active_users,
-            "assistant_queries": assistant_queries,
-            "recent_activity": recent_activity,
+            "user": user.get("name") or user_email,
+            **await admin_metrics(),
+            "usage": await usage_series("day", 30),
             "flash": flash,
         }
 
     # ---------------- USER METRICS ----------------
     else:
-        my_reports = list(
-            reports_collection
-            .find({"user_email": user_email}, {"_id": 0})
-            .sort("created_at", -1)
-        )
-
-        my_reports_count = len(my_reports)
-        my_analyzed_reports = len(
-            [r for r in my_reports if r.get("status") == "Analyzed"]
-        )
-        my_pending_reports = len(
-            [r for r in my_reports if r.get("status") != "Analyzed"]
-        )
-
         context = {
             "request": request,
             "active_page": "dashboard",
             "is_admin": False,
-            "user": user.get("name") if user else user_email,
-            "my_reports": my_reports,
-            "my_reports_count": my_reports_count,
-            "my_analyzed_reports": my_analyzed_reports,
-            "my_pending_reports": my_pending_reports,
+            "user": user.get("name") or user_email,
+            **await user_metrics(user_email),
             "flash": flash,
         }
 
@@ -141,40 +101,25 @@ async def dashboard(
 # =====================================================
 @api_router.get("/summary")
 async def dashboard_summary(
-    user_email: str = Depends(get_current_user),
+    user: dict = Depends(get_user_context),
 ):
     """
     Lightweight JSON summary.
     Useful for charts / async UI widgets.
     """
-    is_admin_user = is_admin(user_email)
+    user_email = user["email"]
 
-    if is_admin_user:
-        return {
-            "role": "Admin",
-            "total_reports": reports_collection.count_documents({}),
-            "analyzed_reports": reports_collection.count_documents(
-                {"status": "Analyzed"}
-            ),
-            "active_users": users_collection.count_documents(
-                {"status": "Active"}
-            ),
-            "assistant_queries": conversations_collection.count_documents({}),
-        }
-
-    user_reports = list(
-        reports_collection.find({"user_email": user_email})
-    )
+    if is_admin(user):
+        metrics = await admin_metrics(recent=0)
+        metrics.pop("recent_activity")
+        return {"role": "Admin", **metrics}
 
+    metrics = await user_metrics(user_email, with_reports=False)
     return {
         "role": "User",
-        "my_reports": len(user_reports),
-        "my_analyzed_reports": len(
-            [r for r in user_reports if r.get("status") == "Analyzed"]
-        ),
-        "my_pending_reports": len(
-            [r for r in user_reports if r.get("status") != "Analyzed"]
-        ),
+        "my_reports": metrics["my_reports_count"],
+        "my_analyzed_reports": metrics["my_analyzed_reports"],
+        "my_pending_reports": metrics["my_pending_reports"],
     }
 
 
@@ -184,7 +129,7 @@ async def dashboard_summary(
 @ui_router.get("/assistant", response_class=HTMLResponse, include_in_schema=False)
 async def assistant_page(
     request: Request,
-    user_email: str = Depends(get_current_user),
+    user: dict = Depends(get_user_context),
 ):
     """
     AI Medical Assistant chat interface.
@@ -196,6 +141,6 @@ async def assistant_page(
         {
             "request": request,
             "active_page": "assistant",
-            "is_admin": is_admin(user_email),
+            "is_admin": is_admin(user),
         }
     )
@@ -0,0 +1,91 @@
+# app/modules/home/service.py
+"""
+Dashboard metrics.
+
+Admin counters come from the incrementally maintained counter document
+(app.services.metrics); the per-user view is one aggregation round trip.
+The user pipeline is a plain builder so the sync benchmark
+(app.benchmarks.dashboard_metrics) runs exactly what the route runs.
+"""
+
+import os
+
+from app.db.async_mongo import reports_collection
+from app.services import metrics
+
+ANALYZED = "Analyzed"
+RECENT_ACTIVITY = 5
+
+# Latest reports listed on the user dashboard; the counts cover them all
+RECENT_REPORTS = int(os.getenv("DASHBOARD_RECENT_REPORTS", "20"))
+
+# Only what the dashboard templates render is transferred
+RECENT_FIELDS = {"_id": 0, "type": 1, "description": 1, "timestamp": 1}
+REPORT_ROW_FIELDS = {"_id": 0, "report_id": 1, "report_type": 1, "status": 1, "created_at": 1}
+
+
+# =====================================================
+# PIPELINES (on medical_reports)
+# =====================================================
+def user_metrics_pipeline(user_email: str, with_reports: bool = True,
+                          reports: int = RECENT_REPORTS):
+    facets = {"by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]}
+    if with_reports:
+        facets["reports"] = [
+            {"$sort": {"created_at": -1}},
+            {"$limit": reports},
+            {"$project": REPORT_ROW_FIELDS},
+        ]
+
+    return [
+        {"$match": {"user_email": user_email}},
+        {"$facet": facets},
+    ]
+
+
+# =====================================================
+# RESULT SHAPING
+# =====================================================
+def _status_counts(doc):
+    counts = {row["_id"]: row["count"] for row in doc.get("by_status", [])}
+    total = sum(counts.values())
+    return total, counts.get(ANALYZED, 0)
+
+
+def user_metrics_from(doc) -> dict:
+    total, analyzed = _status_counts(doc)
+    return {
+        "my_reports": doc.get("reports", []),
+        "my_reports_count": total,
+        "my_analyzed_reports": analyzed,
+        "my_pending_reports": total - analyzed,
+    }
+
+
+# =====================================================
+# ASYNC ENTRY POINTS
+# =====================================================
+async def _single(pipeline):
+    docs = await reports_collection.aggregate(pipeline).to_list(1)
+    return docs[0] if docs else {}
+
+
+async def admin_metrics(recent: int = RECENT_ACTIVITY) -> dict:
+    counters = dict(await metrics.dashboard_counters())
+
+    # Index-backed (created_at) and projected, so also O(1)
+    counters["recent_activity"] = await (
+        reports_collection
+        .find({}, RECENT_FIELDS)
+        .sort("created_at", -1)
+        .limit(recent)
+        .to_list(recent)
+    ) if recent else []
+
+    return counters
+
+
+async def user_metrics(user_email: str, with_reports: bool = True) -> dict:
+    return user_metrics_from(
+        await _single(user_metrics_pipeline(user_email, with_reports))
+    )
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Request, Form, Depends, HTTPException
+from fastapi import APIRouter, Request, Form, Depends
 from fastapi.responses import RedirectResponse
 
-from app.core.config import users_collection
-from app.core.security import hash_password
-from app.core.dependencies import get_current_user, is_admin_by_email
+from app.db.async_mongo import users_collection
+from app.core.hashing import RETRY_AFTER_SECONDS, HashingBusy, hash_password_async
+from app.core.dependencies import (
+    get_current_user,
+    get_user_context,
+    invalidate_user,
+    is_admin,
+)
 from app.main import templates
 
 
@@ -24,25 +29,18 @@ api_router = APIRouter(
 @ui_router.get("/profile", include_in_schema=False)
 async def profile_page(
     request: Request,
-    user_email: str = Depends(get_current_user),
+    user: dict = Depends(get_user_context),
 ):
     """
     Render profile page for logged-in user.
     """
     flash = request.cookies.get("flash")
 
-    user = users_collection.find_one(
-        {"email": user_email},
-        {"password": 0},
-    )
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     context = {
         "request": request,
         "user": user,
         "active_page": "profile",
-        "is_admin": is_admin_by_email(user_email),
+        "is_admin": is_admin(user),
         "flash": flash,
     }
 
@@ -70,12 +68,19 @@ async def update_profile_ui(
     }
 
     if new_password and new_password.strip():
-        update_fields["password"] = hash_password(new_password)
-
-    users_collection.update_one(
+        try:
+            update_fields["password"] = await hash_password_async(new_password)
+        except HashingBusy as e:
+            response = RedirectResponse("/profile", status_code=303)
+            response.set_cookie("flash", str(e), max_age=3)
+            response.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+            return response
+
+    await users_collection.update_one(
         {"email": user_email},
         {"$set": update_fields},
     )
+    invalidate_user(user_email)
 
     response = RedirectResponse("/profile", status_code=303)
     response.set_cookie("flash", "Profile updated successfully", max_age=3)
@@ -87,19 +92,12 @@ async def update_profile_ui(
 # =====================================================
 @api_router.get("/")
 async def get_profile_api(
-    user_email: str = Depends(get_current_user),
+    user: dict = Depends(get_user_context),
 ):
     """
     Fetch authenticated user's profile.
     """
-    user = users_collection.find_one(
-        {"email": user_email},
-        {"password": 0},
-    )
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    return {"user": user}
+    return {"user": {**user, "_id": str(user["_id"])}}
 
 
 # =====================================================
@@ -119,11 +117,12 @@ async def update_profile_api(
     }
 
     if new_password and new_password.strip():
-        update_fields["password"] = hash_password(new_password)
+        update_fields["password"] = await hash_password_async(new_password)
 
-    users_collection.update_one(
+    await users_collection.update_one(
         {"email": user_email},
         {"$set": update_fields},
     )
+    invalidate_user(user_email)
 
     return {"message": "Profile updated successfully"}
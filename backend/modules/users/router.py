@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Form
-from app.core.config import users_collection
-from app.core.dependencies import admin_required
+from fastapi import APIRouter, Depends, HTTPException, Form, Query
+from pymongo import ReturnDocument
+
+from app.db.async_mongo import users_collection
+from app.core.dependencies import admin_required, invalidate_user
+from app.modules.users.service import list_users as list_users_page
+from app.services import metrics
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, stringify_ids
 
 
 # =====================================================
@@ -17,13 +22,27 @@ api_router = APIRouter(
 # LIST ALL USERS
 # =====================================================
 @api_router.get("/")
-async def list_users():
+async def list_users(
+    q: str = None,
+    role: str = None,
+    status: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+):
     """
-    Returns all registered users.
-    Password hashes are excluded.
+    Returns one page of registered users.
+    Password hashes are excluded; pass `next_cursor` back as `cursor`.
     """
-    users = list(users_collection.find({}, {"password": 0}))
-    return {"users": users}
+    try:
+        page = await list_users_page(q, role, status, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "users": stringify_ids(page["items"]),
+        "next_cursor": page["next_cursor"],
+        "prev_cursor": page["prev_cursor"],
+    }
 
 
 # =====================================================
@@ -34,7 +53,7 @@ async def get_user(email: str):
     """
     Fetch a single user by email.
     """
-    user = users_collection.find_one(
+    user = await users_collection.find_one(
         {"email": email},
         {"password": 0},
     )
@@ -64,14 +83,20 @@ async def update_status(
             detail=f"Invalid status. Allowed: {allowed_status}",
         )
 
-    result = users_collection.update_one(
+    previous = await users_collection.find_one_and_update(
         {"email": email},
         {"$set": {"status": status}},
+        projection={"status": 1},
+        return_document=ReturnDocument.BEFORE,
     )
 
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="User not found")
 
+    invalidate_user(email)
+
+    await metrics.record_user_status_change(previous.get("status"), status)
+
     return {
         "message": "User status updated successfully",
         "email": email,
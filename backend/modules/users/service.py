@@ -0,0 +1,62 @@
+# app/modules/users/service.py
+"""
+User and role-history listings shared by the admin UI and the APIs.
+"""
+
+import re
+
+from app.db.async_mongo import role_history_collection, users_collection
+from app.utils.pagination import paginate
+
+USER_SORT = [("_id", 1)]
+HISTORY_SORT = [("timestamp", -1), ("_id", -1)]
+
+
+def user_query(q: str = None, role: str = None, status: str = None) -> dict:
+    """
+    Server-side filter. `q` matches an email prefix (emails are stored
+    lowercase, so the unique email index serves it) or any part of the name.
+    """
+    query = {}
+    if role:
+        query["role"] = role
+    if status:
+        query["status"] = status
+
+    q = (q or "").strip()
+    if q:
+        query["$or"] = [
+            {"email": {"$regex": "^" + re.escape(q.lower())}},
+            {"name": {"$regex": re.escape(q), "$options": "i"}},
+        ]
+    return query
+
+
+def history_query(user: str = None, role: str = None) -> dict:
+    query = {}
+    if user:
+        query["target_user"] = user.strip().lower()
+    if role:
+        query["new_role"] = role
+    return query
+
+
+async def list_users(q=None, role=None, status=None, limit=None, cursor=None) -> dict:
+    return await paginate(
+        users_collection,
+        user_query(q, role, status),
+        USER_SORT,
+        limit=limit,
+        cursor=cursor,
+        projection={"password": 0},
+    )
+
+
+async def list_role_history(user=None, role=None, limit=None, cursor=None) -> dict:
+    return await paginate(
+        role_history_collection,
+        history_query(user, role),
+        HISTORY_SORT,
+        limit=limit,
+        cursor=cursor,
+    )
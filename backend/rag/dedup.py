@@ -0,0 +1,206 @@
+# app/rag/dedup.py
+"""
+Ingest-time duplicate collapsing.
+
+Two stages, both keep the first document seen as the canonical one:
+    exact  normalized-text key (case, punctuation and spacing ignored);
+           caught before embedding, so exact repeats cost nothing
+    near   cosine similarity ≥ threshold against canonical vectors that
+           share a random-projection (LSH) bucket with the document
+
+Every collapsed document is kept as an attribution of its canonical
+document, so no source disappears from the answer citations.
+
+The near stage compares each document with the canonical rows in its
+DEDUP_LSH_TABLES buckets (DEDUP_LSH_BITS hyperplanes each) instead of
+all of them, so the cost per document stays roughly constant as the
+store grows. It is approximate: with the defaults a pair at cosine 0.97
+shares a bucket about 97% of the time, 0.99 about 99.9%. More tables
+raise recall (and memory, 4 bytes per row per table); more bits make
+buckets smaller and recall lower.
+"""
+
+import os
+import re
+import hashlib
+from array import array
+from collections import defaultdict
+
+import numpy as np
+
+DEDUP_THRESHOLD = float(os.getenv("INGEST_DEDUP_THRESHOLD", "0.97"))
+
+DEDUP_LSH_TABLES = int(os.getenv("INGEST_DEDUP_LSH_TABLES", "8"))
+DEDUP_LSH_BITS = int(os.getenv("INGEST_DEDUP_LSH_BITS", "12"))
+
+# Fixed, so reruns bucket the same vectors the same way
+LSH_SEED = 0
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def exact_key(text: str) -> str:
+    normalized = _NON_WORD.sub(" ", text.lower()).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def attribution(doc: dict) -> dict:
+    return {"id": doc["id"], "source": doc["source"]}
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class Deduplicator:
+    """
+    Sits in front of a StoreWriter and only lets canonical documents
+    through. `threshold` ≥ 1 disables the near-duplicate stage.
+    """
+
+    def __init__(self, writer, threshold: float = DEDUP_THRESHOLD):
+        self.writer = writer
+        self.threshold = threshold
+
+        self._exact = {}        # exact key → canonical id
+        self._members = {}      # canonical id → [attribution, …]
+        self._row_ids = []      # store row → canonical id
+        self._pending_dups = {}  # first occurrence id → exact repeats in batch
+
+        self._planes = None     # (tables, bits, dim) random hyperplanes
+        self._buckets = [defaultdict(lambda: array("i")) for _ in range(DEDUP_LSH_TABLES)]
+
+        self.exact_hits = 0
+        self.near_hits = 0
+
+    # ---------------------------------------------------------
+    def _bucket_keys(self, unit: np.ndarray) -> np.ndarray:
+        """(n, tables) bucket key of each unit vector in each table."""
+        if self._planes is None:
+            rng = np.random.default_rng(LSH_SEED)
+            self._planes = rng.standard_normal(
+                (DEDUP_LSH_TABLES, DEDUP_LSH_BITS, unit.shape[1])
+            ).astype(np.float32)
+
+        signs = np.einsum("tbd,nd->ntb", self._planes, unit) > 0
+        return signs @ (1 << np.arange(DEDUP_LSH_BITS))
+
+    def _candidates(self, keys) -> np.ndarray:
+        rows = [
+            np.frombuffer(self._buckets[t][int(key)], dtype=np.int32)
+            for t, key in enumerate(keys)
+            if int(key) in self._buckets[t]
+        ]
+        return np.unique(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int32)
+
+    def _write(self, docs, embeddings, members=None):
+        if self.threshold < 1 and len(docs):
+            first_row = len(self._row_ids)
+            for i, keys in enumerate(self._bucket_keys(_normalize(embeddings))):
+                for t, key in enumerate(keys):
+                    self._buckets[t][int(key)].append(first_row + i)
+
+        for i, doc in enumerate(docs):
+            self._exact.setdefault(exact_key(doc["text"]), doc["id"])
+            self._members[doc["id"]] = (
+                members[i] if members else [attribution(doc)]
+            )
+            self._row_ids.append(doc["id"])
+
+        self.writer.append(docs, embeddings)
+
+    def add_existing(self, docs, embeddings, members):
+        """Canonical rows carried over from the previous store."""
+        self._write(docs, embeddings, members)
+
+    # ---------------------------------------------------------
+    def filter_exact(self, docs):
+        """Attributes exact repeats and returns the documents left to embed."""
+        remaining = []
+        batch_keys = {}
+
+        for doc in docs:
+            key = exact_key(doc["text"])
+            canonical = self._exact.get(key)
+
+            if canonical is not None:
+                self._members[canonical].append(attribution(doc))
+                self.exact_hits += 1
+            elif key in batch_keys:
+                batch_keys[key]["dups"].append(doc)
+                self.exact_hits += 1
+            else:
+                batch_keys[key] = {"doc": doc, "dups": []}
+                remaining.append(doc)
+
+        # Repeats inside this batch follow their first occurrence
+        self._pending_dups = {
+            entry["doc"]["id"]: entry["dups"] for entry in batch_keys.values()
+        }
+        return remaining
+
+    def add(self, docs, embeddings):
+        """Writes the documents that are not near-duplicates of a canonical one."""
+        if not docs:
+            return
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        target = [None] * len(docs)
+
+        if self.threshold < 1:
+            unit = _normalize(embeddings)
+
+            # Against canonical rows on disk that share a bucket
+            written = self.writer.written_embeddings()
+            for i, keys in enumerate(self._bucket_keys(unit)):
+                rows = self._candidates(keys)
+                if not len(rows):
+                    continue
+                sims = _normalize(written[rows]) @ unit[i]
+                best = int(sims.argmax())
+                if sims[best] >= self.threshold:
+                    target[i] = self._row_ids[rows[best]]
+
+            # Against earlier documents of the same batch
+            sims = unit @ unit.T
+            for i in range(len(docs)):
+                if target[i] is not None:
+                    continue
+                for j in range(i):
+                    if sims[i, j] >= self.threshold and target[j] is None:
+                        target[i] = docs[j]["id"]
+                        break
+
+        keep = [i for i, t in enumerate(target) if t is None]
+        if keep:
+            self._write([docs[i] for i in keep], embeddings[keep])
+
+        for i, canonical in enumerate(target):
+            if canonical is not None:
+                self._members[canonical].append(attribution(docs[i]))
+                self.near_hits += 1
+
+        for doc, canonical in zip(docs, target):
+            for dup in self._pending_dups.get(doc["id"], []):
+                self._members[canonical or doc["id"]].append(attribution(dup))
+
+    # ---------------------------------------------------------
+    def attributed_rows(self) -> dict:
+        """Source → store rows whose canonical document absorbed one of its documents."""
+        rows = {}
+        for row, doc_id in enumerate(self._row_ids):
+            members = self._members[doc_id]
+            if len(members) > 1:
+                for source in {m["source"] for m in members}:
+                    rows.setdefault(source, []).append(row)
+        return rows
+
+    def attributions(self) -> dict:
+        """Only clusters that actually absorbed duplicates."""
+        return {
+            doc_id: members
+            for doc_id, members in self._members.items()
+            if len(members) > 1
+        }
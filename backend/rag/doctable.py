@@ -0,0 +1,141 @@
+# app/rag/doctable.py
+"""
+Compact, memory-mappable document table.
+
+Columns (all in the store directory):
+    texts.bin / texts.idx   UTF-8 blob + uint64 offsets (count + 1)
+    ids.bin   / ids.idx     same layout for document ids
+    source_codes.u16        interned source per row
+    sources.json            code → source name
+
+A row costs 8 + 8 + 2 bytes of index plus its raw UTF-8, instead of a
+dict with three str objects, and the pages are shared between worker
+processes through the OS page cache.
+"""
+
+import os
+import json
+import numpy as np
+
+TEXTS_BLOB = "texts.bin"
+TEXTS_INDEX = "texts.idx"
+IDS_BLOB = "ids.bin"
+IDS_INDEX = "ids.idx"
+SOURCE_CODES = "source_codes.u16"
+SOURCE_NAMES = "sources.json"
+
+OFFSET_DTYPE = np.uint64
+CODE_DTYPE = np.uint16
+
+
+# ===============================
+# WRITER
+# ===============================
+class _BlobColumn:
+    def __init__(self, path: str, blob: str, index: str):
+        self._blob = open(os.path.join(path, blob), "wb")
+        self._index = open(os.path.join(path, index), "wb")
+        self._offset = 0
+        self._index.write(np.array([0], dtype=OFFSET_DTYPE).tobytes())
+
+    def append(self, values):
+        ends = []
+        for value in values:
+            data = value.encode("utf-8")
+            self._blob.write(data)
+            self._offset += len(data)
+            ends.append(self._offset)
+        self._index.write(np.array(ends, dtype=OFFSET_DTYPE).tobytes())
+
+    def close(self):
+        self._blob.close()
+        self._index.close()
+
+
+class DocTableWriter:
+    """Appends documents (dicts with id / text / source) column by column."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._texts = _BlobColumn(path, TEXTS_BLOB, TEXTS_INDEX)
+        self._ids = _BlobColumn(path, IDS_BLOB, IDS_INDEX)
+        self._codes = open(os.path.join(path, SOURCE_CODES), "wb")
+        self._source_codes = {}
+
+    def _code(self, source: str) -> int:
+        code = self._source_codes.get(source)
+        if code is None:
+            code = len(self._source_codes)
+            if code > np.iinfo(CODE_DTYPE).max:
+                raise ValueError("too many distinct sources for the doc table")
+            self._source_codes[source] = code
+        return code
+
+    def append(self, documents):
+        self._texts.append(d["text"] for d in documents)
+        self._ids.append(d["id"] for d in documents)
+        self._codes.write(
+            np.array([self._code(d["source"]) for d in documents],
+                     dtype=CODE_DTYPE).tobytes()
+        )
+
+    def close(self):
+        self._texts.close()
+        self._ids.close()
+        self._codes.close()
+
+        with open(os.path.join(self.path, SOURCE_NAMES), "w", encoding="utf-8") as f:
+            json.dump(list(self._source_codes), f, ensure_ascii=False)
+
+
+# ===============================
+# READER
+# ===============================
+def _map(path: str, name: str, dtype):
+    full_path = os.path.join(path, name)
+    if os.path.getsize(full_path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(full_path, dtype=dtype, mode="r")
+
+
+class DocTable:
+    """O(1) row lookup; only the requested rows are decoded."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+        self._texts = _map(path, TEXTS_BLOB, np.uint8)
+        self._text_offsets = _map(path, TEXTS_INDEX, OFFSET_DTYPE)
+        self._ids = _map(path, IDS_BLOB, np.uint8)
+        self._id_offsets = _map(path, IDS_INDEX, OFFSET_DTYPE)
+        self.source_codes = _map(path, SOURCE_CODES, CODE_DTYPE)
+
+        with open(os.path.join(path, SOURCE_NAMES), encoding="utf-8") as f:
+            self.source_names = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self.source_codes)
+
+    @staticmethod
+    def _slice(blob, offsets, i: int) -> str:
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        return blob[start:end].tobytes().decode("utf-8")
+
+    def text(self, i: int) -> str:
+        return self._slice(self._texts, self._text_offsets, i)
+
+    def doc_id(self, i: int) -> str:
+        return self._slice(self._ids, self._id_offsets, i)
+
+    def source(self, i: int) -> str:
+        return self.source_names[self.source_codes[i]]
+
+    def texts(self, indices):
+        return [self.text(i) for i in indices]
+
+    def document(self, i: int) -> dict:
+        return {"id": self.doc_id(i), "text": self.text(i), "source": self.source(i)}
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.document(i)
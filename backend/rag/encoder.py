@@ -0,0 +1,246 @@
+# app/rag/encoder.py
+"""
+Query encoder backends.
+
+    torch      SentenceTransformer (reference; what ingest uses for the store)
+    onnx       exported ONNX graph on ONNX Runtime + the same fast
+               tokenizer; no torch import at serving time
+    onnx-int8  the same, int8-quantized
+
+Both return L2-normalized float32 rows. The ONNX model is exported with
+`python -m app.rag.encoder export [--quantize]` and must pass
+`python -m app.rag.encoder verify` before it is used: verify re-encodes
+documents sampled from the store and compares them with the vectors
+ingest stored for them (torch model).
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+
+EMBED_MODEL = "all-MiniLM-L6-v2"
+
+ENCODER_BACKEND = os.getenv("RAG_ENCODER_BACKEND", "torch").lower()
+ONNX_PATH = os.getenv("RAG_ONNX_PATH", "/app/data/encoder")
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+CONFIG_FILE = "encoder.json"
+
+# Minimum cosine between stored (torch) and ONNX embeddings of the same text
+TOLERANCE = {"fp32": 0.9999, "int8": 0.99}
+
+_encoder = None
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+# ===============================
+# BACKENDS
+# ===============================
+class TorchEncoder:
+    name = "torch"
+
+    def __init__(self, model: str = EMBED_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self._model = SentenceTransformer(model)
+
+    def encode(self, texts):
+        return _normalize(self._model.encode(list(texts), convert_to_numpy=True))
+
+
+class OnnxEncoder:
+    """Mean pooling over the last hidden state, as in all-MiniLM-L6-v2."""
+
+    def __init__(self, path: str = ONNX_PATH, quantized: bool = False):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.name = "onnx-int8" if quantized else "onnx"
+
+        with open(os.path.join(path, CONFIG_FILE), encoding="utf-8") as f:
+            config = json.load(f)
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(path, TOKENIZER_FILE))
+        self._tokenizer.enable_truncation(max_length=config["max_seq_length"])
+        self._tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            os.path.join(path, QUANTIZED_FILE if quantized else MODEL_FILE),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._inputs = {i.name for i in self._session.get_inputs()}
+
+    def encode(self, texts):
+        encodings = self._tokenizer.encode_batch(list(texts))
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feed = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self._session.run(
+            None, {k: v for k, v in feed.items() if k in self._inputs}
+        )[0]
+
+        weights = mask[:, :, None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return _normalize(pooled)
+
+
+def create(backend: str = None):
+    backend = (backend or ENCODER_BACKEND).lower()
+
+    if backend == "torch":
+        return TorchEncoder()
+    if backend == "onnx":
+        return OnnxEncoder()
+    if backend == "onnx-int8":
+        return OnnxEncoder(quantized=True)
+
+    raise ValueError(f"Unknown encoder backend: {backend}")
+
+
+def get_encoder():
+    """Process-wide encoder selected by RAG_ENCODER_BACKEND."""
+    global _encoder
+
+    if _encoder is None:
+        _encoder = create()
+        print(f"✅ Query encoder: {_encoder.name}")
+
+    return _encoder
+
+
+# ===============================
+# EXPORT / VERIFY
+# ===============================
+def export(output_path: str = ONNX_PATH, quantize: bool = False, opset: int = 14):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(EMBED_MODEL)
+    transformer = st_model[0]
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids,
+            )[0]
+
+    os.makedirs(output_path, exist_ok=True)
+    transformer.tokenizer.save_pretrained(output_path)
+
+    with open(os.path.join(output_path, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "model": EMBED_MODEL,
+            "max_seq_length": transformer.max_seq_length,
+            "pooling": "mean",
+        }, f)
+
+    sample = transformer.tokenizer(["export sample"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    axes = {0: "batch", 1: "tokens"}
+
+    torch.onnx.export(
+        LastHiddenState(transformer.auto_model).eval(),
+        tuple(sample[n] for n in names),
+        os.path.join(output_path, MODEL_FILE),
+        input_names=names,
+        output_names=["last_hidden_state"],
+        dynamic_axes={n: axes for n in names + ["last_hidden_state"]},
+        opset_version=opset,
+    )
+    print(f"✅ Exported {EMBED_MODEL} to {output_path}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            os.path.join(output_path, MODEL_FILE),
+            os.path.join(output_path, QUANTIZED_FILE),
+            weight_type=QuantType.QInt8,
+        )
+        print(f"✅ Quantized model written ({QUANTIZED_FILE})")
+
+
+def verify(path: str = None, samples: int = 500, quantized: bool = False,
+           tolerance: float = None, candidate=None) -> bool:
+    """
+    Encodes documents sampled from the store at `path` with the ONNX
+    backend (or `candidate`) and checks each cosine against the vector
+    the store holds for that row, against the tolerance for that precision.
+    """
+    from app.rag import store
+
+    path = path or store.STORE_PATH
+    tolerance = tolerance or TOLERANCE["int8" if quantized else "fp32"]
+
+    model = store.read_meta(path).get("model")
+    if model != EMBED_MODEL:
+        print(f"❌ Store was built with {model!r}, not {EMBED_MODEL}")
+        return False
+
+    documents = store.open_documents(path)
+    rows = np.sort(np.random.default_rng(0).choice(
+        len(documents), min(samples, len(documents)), replace=False
+    ))
+
+    reference = _normalize(store.load_embeddings(path)[rows])
+    candidate = candidate or OnnxEncoder(quantized=quantized)
+    vectors = candidate.encode(documents.texts(rows))
+
+    cosines = np.sum(reference * vectors, axis=1)
+    max_diff = float(np.abs(reference - vectors).max())
+    ok = bool(cosines.min() >= tolerance)
+
+    print(f"{'✅' if ok else '❌'} {len(rows)} stored rows: min cosine {cosines.min():.6f} "
+          f"(tolerance {tolerance}), mean {cosines.mean():.6f}, max |Δ| {max_diff:.2e}")
+    return ok
+
+
+# ===============================
+# CLI
+# ===============================
+def main():
+    parser = argparse.ArgumentParser(description="ONNX query encoder")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="export the ONNX model")
+    export_cmd.add_argument("--output", default=ONNX_PATH)
+    export_cmd.add_argument("--quantize", action="store_true", help="also write int8")
+    export_cmd.add_argument("--opset", type=int, default=14)
+
+    verify_cmd = commands.add_parser("verify", help="compare against the stored vectors")
+    verify_cmd.add_argument("--store", help="store path (default: RAG store)")
+    verify_cmd.add_argument("--samples", type=int, default=500,
+                            help="documents sampled from the store")
+    verify_cmd.add_argument("--quantized", action="store_true")
+    verify_cmd.add_argument("--tolerance", type=float)
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export(args.output, args.quantize, args.opset)
+    else:
+        ok = verify(args.store, args.samples, args.quantized, args.tolerance)
+        raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
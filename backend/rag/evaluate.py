@@ -0,0 +1,272 @@
+# app/rag/evaluate.py
+"""
+Offline retrieval evaluation: quality vs. speed per configuration.
+
+The corpus is its own test set: the question of each sampled document
+is the query, and every row carrying the same answer is relevant.
+Each configuration runs in a fresh process with its environment
+overrides (RAG_* variables), so latency and RSS are measured in
+isolation, and the results are printed as a Pareto table:
+a row is marked * unless another configuration is at least as good on
+MRR, p99 latency and RSS, and strictly better on one of them.
+
+Run: python -m app.rag.evaluate [--samples 1000] [--configs configs.json]
+                                [--output results.json] [--baseline old.json]
+
+configs.json: [{"name": "…", "env": {"RAG_MIN_SCORE": "0.4"},
+                "adaptive": true, "top_k": 3}, …]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+import numpy as np
+
+# Ranking depth for recall@k / MRR
+EVAL_DEPTH = 10
+RECALL_AT = (1, 3, 10)
+
+PRESETS = [
+    {"name": "baseline", "env": {}},
+    {"name": "fixed-k", "env": {}, "adaptive": False},
+    {"name": "strict-threshold", "env": {"RAG_MIN_SCORE": "0.45"}},
+    {"name": "rerank", "env": {"RAG_RERANK": "true"}},
+    {"name": "onnx", "env": {"RAG_ENCODER_BACKEND": "onnx"}},
+    {"name": "onnx-int8", "env": {"RAG_ENCODER_BACKEND": "onnx-int8"}},
+]
+
+
+# ===============================
+# TEST SET
+# ===============================
+def split_document(text: str):
+    """Splits the "Q: …\\nA: …" document text into (question, answer)."""
+    question, _, answer = text.partition("\nA: ")
+    return question.removeprefix("Q: ").strip(), answer.strip()
+
+
+def build_queries(store_path: str, samples: int, seed: int = 0):
+    """[{"query", "relevant": [rows]}, …] sampled from the store."""
+    from app.rag import store
+
+    documents = store.open_documents(store_path)
+
+    rows_by_answer = {}
+    questions = []
+    for row in range(len(documents)):
+        question, answer = split_document(documents.text(row))
+        rows_by_answer.setdefault(answer, []).append(row)
+        questions.append((question, answer))
+
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(questions), min(samples, len(questions)), replace=False)
+
+    return [
+        {"query": questions[row][0], "relevant": rows_by_answer[questions[row][1]]}
+        for row in sorted(picked.tolist())
+        if questions[row][0]
+    ]
+
+
+# ===============================
+# ONE CONFIGURATION (child process)
+# ===============================
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def evaluate_config(config: dict, queries, store_path: str) -> dict:
+    from app.rag import retriever
+
+    retriever.STORE_PATH = store_path
+
+    top_k = config.get("top_k", 3)
+    adaptive = config.get("adaptive", True)
+
+    retriever.rank(queries[0]["query"], EVAL_DEPTH)  # load + warm-up
+
+    hits = {k: 0 for k in RECALL_AT}
+    reciprocal_ranks = 0.0
+    context_hits = 0
+    context_docs = 0
+    timings = []
+
+    for q in queries:
+        started = time.perf_counter()
+        rows, scores, eligible, _ = retriever.rank(
+            q["query"], max(EVAL_DEPTH, top_k), adaptive=adaptive
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+
+        relevant = set(q["relevant"])
+        ranked = [int(r) for r in rows[:EVAL_DEPTH]]
+
+        for k in RECALL_AT:
+            hits[k] += any(r in relevant for r in ranked[:k])
+
+        first = next((i for i, r in enumerate(ranked) if r in relevant), None)
+        if first is not None:
+            reciprocal_ranks += 1 / (first + 1)
+
+        # What the LLM would actually see
+        k = min(top_k, eligible)
+        context_hits += any(r in relevant for r in ranked[:k])
+        context_docs += k
+
+    n = len(queries)
+    return {
+        "name": config["name"],
+        "config": config,
+        **{f"recall@{k}": hits[k] / n for k in RECALL_AT},
+        "mrr": reciprocal_ranks / n,
+        "context_recall": context_hits / n,
+        "avg_k": context_docs / n,
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "rss_mb": _rss_mb(),
+    }
+
+
+def run_config(config: dict, queries_path: str, store_path: str) -> dict:
+    """Runs one configuration in a fresh interpreter with its env overrides."""
+    env = {**os.environ, **{k: str(v) for k, v in config.get("env", {}).items()}}
+
+    result = subprocess.run(
+        [sys.executable, "-m", "app.rag.evaluate",
+         "--child", json.dumps(config), "--queries", queries_path,
+         "--store", store_path],
+        env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return {"name": config["name"], "config": config, "error": error}
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# ===============================
+# REPORT
+# ===============================
+def pareto_front(results):
+    """Names of configurations not dominated on (MRR↑, p99↓, RSS↓)."""
+    def key(r):
+        return (r["mrr"], -r["p99_ms"], -r["rss_mb"])
+
+    front = set()
+    for r in results:
+        dominated = any(
+            all(a >= b for a, b in zip(key(o), key(r))) and key(o) != key(r)
+            for o in results
+        )
+        if not dominated:
+            front.add(r["name"])
+    return front
+
+
+def print_table(results, baseline=None):
+    ok = [r for r in results if "error" not in r]
+    front = pareto_front(ok)
+    previous = {r["name"]: r for r in (baseline or {}).get("results", []) if "error" not in r}
+
+    header = " ".join(f"{f'R@{k}':>6}" for k in RECALL_AT)
+    print(f"\n  {'config':<18} {header} {'MRR':>6} {'ctxR':>6} {'avg k':>5} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'RSS MB':>7}")
+
+    for r in sorted(ok, key=lambda r: -r["mrr"]):
+        recalls = " ".join(f"{r[f'recall@{k}']:>6.3f}" for k in RECALL_AT)
+        mark = "*" if r["name"] in front else " "
+        print(f"{mark} {r['name']:<18} {recalls} {r['mrr']:>6.3f} "
+              f"{r['context_recall']:>6.3f} {r['avg_k']:>5.2f} "
+              f"{r['p50_ms']:>7.2f} {r['p99_ms']:>7.2f} {r['rss_mb']:>7.0f}")
+
+        old = previous.get(r["name"])
+        if old:
+            print(f"  {'  vs baseline':<18} ΔMRR {r['mrr'] - old['mrr']:+.3f}  "
+                  f"Δp99 {r['p99_ms'] - old['p99_ms']:+.2f} ms  "
+                  f"ΔRSS {r['rss_mb'] - old['rss_mb']:+.0f} MB")
+
+    for r in results:
+        if "error" in r:
+            print(f"  {r['name']:<18} failed: {r['error']}")
+
+    print("\n* Pareto-optimal on MRR / p99 latency / RSS")
+
+
+# ===============================
+# CLI
+# ===============================
+def main():
+    from app.rag import store
+
+    parser = argparse.ArgumentParser(description="Retrieval quality vs. speed")
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--configs", help="JSON list of configurations (default: presets)")
+    parser.add_argument("--only", nargs="+", help="run only these configuration names")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="previous --output to compare against")
+    parser.add_argument("--store", default=store.STORE_PATH)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--queries", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = json.load(f)
+        print(json.dumps(evaluate_config(json.loads(args.child), queries, args.store)))
+        return
+
+    configs = PRESETS
+    if args.configs:
+        with open(args.configs, encoding="utf-8") as f:
+            configs = json.load(f)
+    if args.only:
+        configs = [c for c in configs if c["name"] in args.only]
+
+    queries = build_queries(args.store, args.samples, args.seed)
+    if not queries:
+        print("No documents to evaluate.")
+        return
+    print(f"📋 {len(queries)} queries from {args.store}")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False,
+                                     encoding="utf-8") as f:
+        json.dump(queries, f)
+        queries_path = f.name
+
+    try:
+        results = []
+        for config in configs:
+            print(f"⏱ {config['name']} …")
+            results.append(run_config(config, queries_path, args.store))
+    finally:
+        os.unlink(queries_path)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "evaluated_at": datetime.utcnow().isoformat(),
+                "store": store.read_meta(args.store),
+                "samples": len(queries),
+                "seed": args.seed,
+                "results": results,
+            }, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
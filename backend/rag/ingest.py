@@ -1,112 +1,374 @@
+"""
+Build / update the RAG store from the registered sources.
+
+Run: python -m app.rag.ingest [--sources bioasq medquad] [--workers 8]
+                              [--batch-size 512] [--encode-threads 4]
+"""
+
 import os
 import json
-import csv
-from sentence_transformers import SentenceTransformer
-from xml.etree import ElementTree as ET
+import time
+import argparse
+import tempfile
+from itertools import islice
+
+from app.rag import store as rag_store
+from app.rag.dedup import DEDUP_THRESHOLD, Deduplicator, attribution
+from app.rag.parallel import ParseReport, map_files
+from app.rag.sources import BASE_DATA_PATH, LOADERS, file_hash, get_loaders
+from app.rag.store import StoreWriter
 
 # ===============================
-# CONTAINER-SAFE PATHS
+# CONFIG
 # ===============================
-BASE_DATA_PATH = "/app/data"
-BIOASQ_PATH = os.path.join(BASE_DATA_PATH, "bioasq")
-MEDQUAD_PATH = os.path.join(BASE_DATA_PATH, "medquad", "medDataset_processed.csv")
-OUTPUT_PATH = os.path.join(BASE_DATA_PATH, "embeddings.json")
+OUTPUT_PATH = os.path.join(BASE_DATA_PATH, "store")
 
 EMBED_MODEL = "all-MiniLM-L6-v2"
 
+# Documents encoded and flushed to disk per step; bounds peak memory
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "512"))
+
+# Files at least this large (e.g. the MedQuAD CSV) are parsed in the
+# parent and streamed to the spool; a worker would hold every document
+# and pickle the whole list back
+LARGE_FILE_BYTES = int(os.getenv("INGEST_LARGE_FILE_MB", "16")) * 2**20
+
+
+def batched(iterable, size: int):
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
 
 # ===============================
-# BioASQ XML Loader
+# CHANGE DETECTION
 # ===============================
-def load_bioasq():
-    docs = []
-    idx = 0
+def read_source_file(job):
+    """
+    Pool worker: hashes one source file and parses it unless its hash
+    matches the previous run. Returns (sha1, documents or None).
+    """
+    path, source_name, prev_sha1 = job
 
-    for root_dir, _, files in os.walk(BIOASQ_PATH):
-        for file in files:
-            if not file.lower().endswith(".xml"):
-                continue
+    digest = file_hash(path)
+    if digest == prev_sha1:
+        return digest, None
+
+    return digest, list(LOADERS[source_name].parse(path))
+
+
+def stream_source_file(job):
+    """read_source_file for large files, run in-process: documents stay a generator."""
+    path, source_name, prev_sha1 = job
+
+    digest = file_hash(path)
+    if digest == prev_sha1:
+        return digest, None
+
+    return digest, LOADERS[source_name].parse(path)
+
+
+def is_large(path: str) -> bool:
+    try:
+        return os.path.getsize(path) >= LARGE_FILE_BYTES
+    except OSError:
+        # Reported by the worker that fails to read it
+        return False
+
+
+def scan_sources(previous, spool, loaders, workers: int = None,
+                 chunksize: int = None):
+    """
+    Compares every file of the selected sources against the previous
+    manifest.
+
+    Small files are hashed and parsed in parallel; large ones are
+    streamed in this process while the pool works. Results are merged
+    in file order. New or changed documents are spooled to `spool`
+    (JSON lines) for embedding; unchanged ones are only recorded in the
+    returned `keep` set so their vectors can be copied from the old
+    store. Sources that were not selected keep everything from the last
+    run; entries without a source (older manifests) count as selected.
+    Returns (manifest, keep, added, parsed).
+    """
+    old_files = previous["files"] if previous else {}
+    old_docs = previous["documents"] if previous else {}
+
+    manifest = {"model": EMBED_MODEL, "files": {}, "documents": {}}
+    keep = set()
+    added = 0
+    parsed = 0
+
+    def keep_previous(key, entry):
+        manifest["files"][key] = entry
+        for doc_id in entry["docs"]:
+            keep.add(doc_id)
+            manifest["documents"][doc_id] = old_docs[doc_id]
+
+    def spool_changed(docs):
+        """Spools new/changed docs; returns ({id: hash}, unchanged ids, spooled count)."""
+        file_docs, unchanged, spooled = {}, set(), 0
+        for doc in docs:
+            file_docs[doc["id"]] = doc["hash"]
+
+            if old_docs.get(doc["id"]) == doc["hash"]:
+                unchanged.add(doc["id"])
+            else:
+                spool.write(json.dumps(doc, ensure_ascii=False) + "\n")
+                spooled += 1
+        return file_docs, unchanged, spooled
+
+    selected = {loader.name for loader in loaders}
+    for key, entry in old_files.items():
+        if "source" in entry and entry["source"] not in selected:
+            keep_previous(key, entry)
+
+    keys = []
+    jobs = []
+    for loader in loaders:
+        for key, path in loader.files():
+            prev = old_files.get(key)
+            keys.append((key, loader.name))
+            jobs.append((path, loader.name, prev["sha1"] if prev else None))
+
+    large = [is_large(job[0]) for job in jobs]
+    small_jobs = [job for job, big in zip(jobs, large) if not big]
+
+    def label(job):
+        return os.path.relpath(job[0], BASE_DATA_PATH)
+
+    report = ParseReport("Sources")
+    pooled = map_files(
+        read_source_file,
+        small_jobs,
+        # A single file gains nothing from a process hop
+        workers=workers if len(small_jobs) > 1 else 1,
+        chunksize=chunksize,
+        report=report,
+        label=label,
+    )
+
+    try:
+        for (key, source_name), job, big in zip(keys, jobs, large):
+            prev = old_files.get(key)
+            mark = spool.tell()
 
             try:
-                tree = ET.parse(os.path.join(root_dir, file))
-                root = tree.getroot()
-
-                for qa in root.iter("QAPair"):
-                    q = qa.findtext("Question")
-                    a = qa.findtext("Answer")
-
-                    if q and a:
-                        docs.append({
-                            "id": f"bioasq_{idx}",
-                            "text": f"Q: {q}\nA: {a}",
-                            "source": "BioASQ"
-                        })
-                        idx += 1
-            except Exception:
+                if big:
+                    result, error = stream_source_file(job), None
+                else:
+                    _, result, error = next(pooled)
+
+                if error is None and result[1] is not None:
+                    file_docs, unchanged, spooled = spool_changed(result[1])
+            except Exception as e:
+                # A large file failed mid-stream: drop what it spooled
+                error = f"{type(e).__name__}: {e}"
+                spool.seek(mark)
+                spool.truncate()
+
+            if big:
+                report.record(label(job), error)
+
+            # Failed file → keep what the previous run had, retry next time
+            if error is not None:
+                if prev:
+                    keep_previous(key, prev)
+                continue
+
+            digest, docs = result
+
+            # Unchanged file → reuse every document without parsing
+            if docs is None:
+                keep_previous(key, prev)
                 continue
 
-    print(f"✅ BioASQ loaded: {len(docs)}")
-    return docs
+            parsed += len(file_docs)
+            keep |= unchanged
+            added += spooled
+
+            manifest["files"][key] = {
+                "source": source_name,
+                "sha1": digest,
+                "docs": list(file_docs),
+            }
+            manifest["documents"].update(file_docs)
+    finally:
+        pooled.close()
+
+    report.print_summary()
+    return manifest, keep, added, parsed
+
+
+def respool_orphans(orphans, manifest, spool):
+    """
+    Re-reads documents whose canonical document disappeared. Their files
+    are unchanged (so they were not parsed) but they have no vector of
+    their own in the old store, so they must be embedded again.
+    """
+    for key, entry in manifest["files"].items():
+        wanted = orphans.intersection(entry["docs"])
+        if not wanted:
+            continue
+
+        loader = LOADERS[entry["source"]]
+        try:
+            for doc in loader.parse(os.path.join(BASE_DATA_PATH, key)):
+                if doc["id"] in wanted:
+                    spool.write(json.dumps(doc, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"⚠ Failed to re-read {key}: {e}")
+
+
+def _rate(count: int, seconds: float) -> str:
+    per_second = count / seconds if seconds else 0
+    return f"{count} docs in {seconds:.1f}s ({per_second:.0f} docs/s)"
 
 
 # ===============================
-# MedQuAD CSV Loader
+# INGEST
 # ===============================
-def load_medquad():
-    docs = []
-    idx = 0
+def ingest(sources=None, batch_size: int = BATCH_SIZE, workers: int = None,
+           chunksize: int = None, encode_threads: int = None,
+           rebuild: bool = False, output_path: str = OUTPUT_PATH,
+           dedup_threshold: float = DEDUP_THRESHOLD):
+    loaders = get_loaders(sources)
+
+    previous = None
+    if not rebuild and rag_store.exists(output_path):
+        previous = rag_store.read_manifest(output_path)
+        if previous and previous.get("model") != EMBED_MODEL:
+            print("♻ Embedding model changed — full rebuild")
+            previous = None
+        elif previous and any("source" not in entry for entry in previous["files"].values()):
+            # Predates per-source manifests: stored rows carry stale labels
+            print("♻ Manifest has no source names — full rebuild")
+            previous = None
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        started = time.perf_counter()
+        manifest, keep, added, parsed = scan_sources(
+            previous, spool, loaders, workers, chunksize
+        )
+        parse_seconds = time.perf_counter() - started
 
-    print("📄 MedQuAD path:", MEDQUAD_PATH)
-    print("📄 Exists:", os.path.exists(MEDQUAD_PATH))
+        old_ids = set(previous["documents"]) if previous else set()
+        dropped = len(old_ids - manifest["documents"].keys())
 
-    with open(MEDQUAD_PATH, encoding="utf-8", errors="ignore") as f:
-        reader = csv.reader(f)
-        rows = list(reader)
+        print(f"📚 Documents: {len(manifest['documents'])} "
+              f"(unchanged {len(keep)}, new/changed {added}, dropped {dropped})")
+        print(f"⏱ Parse: {_rate(parsed, parse_seconds)}")
 
-    headers = [h.lower() for h in rows[0]]
-    print("📄 Headers:", headers)
+        up_to_date = (
+            previous and not added and len(keep) == len(old_ids)
+            and rag_store.read_meta(output_path).get("version") == rag_store.FORMAT_VERSION
+        )
+        if up_to_date:
+            print("✅ RAG store is up to date")
+            return
 
-    q_idx = headers.index("question")
-    a_idx = headers.index("answer")
+        embed_seconds = 0.0
+        embedded = 0
 
-    for row in rows[1:]:
-        q = row[q_idx].strip()
-        a = row[a_idx].strip()
-        if q and a:
-            docs.append({
-                "id": f"medquad_{idx}",
-                "text": f"Q: {q}\nA: {a}",
-                "source": "MedQuAD"
-            })
-            idx += 1
+        with StoreWriter(output_path, model=EMBED_MODEL) as store:
+            dedup = Deduplicator(store, dedup_threshold)
+            orphans = set()
 
-    print(f"✅ MedQuAD loaded: {len(docs)}")
-    return docs
+            # Unchanged canonical documents: copy rows + vectors from the
+            # old store, together with their surviving duplicates
+            if keep:
+                old_embeddings = rag_store.load_embeddings(output_path)
+                old_attributions = rag_store.read_attributions(output_path)
+
+                def kept_rows():
+                    for row, doc in enumerate(rag_store.iter_documents(output_path)):
+                        members = [
+                            m for m in old_attributions.get(doc["id"], [attribution(doc)])
+                            if m["id"] in keep
+                        ]
+                        if doc["id"] in keep:
+                            yield row, doc, members
+                        else:
+                            orphans.update(m["id"] for m in members)
+
+                for batch in batched(kept_rows(), batch_size):
+                    dedup.add_existing(
+                        [doc for _, doc, _ in batch],
+                        old_embeddings[[row for row, _, _ in batch]],
+                        [members for _, _, members in batch],
+                    )
+                del old_embeddings
+
+            if orphans:
+                respool_orphans(orphans, manifest, spool)
+                added += len(orphans)
+
+            # New or changed documents: collapse duplicates, embed the rest
+            if added:
+                if encode_threads:
+                    import torch
+                    torch.set_num_threads(encode_threads)
+
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(EMBED_MODEL)
+                spool.seek(0)
+                for batch in batched(map(json.loads, spool), batch_size):
+                    batch = dedup.filter_exact(batch)
+                    if not batch:
+                        continue
+
+                    started = time.perf_counter()
+                    embeddings = model.encode(
+                        [d["text"] for d in batch],
+                        convert_to_numpy=True,
+                    )
+                    embed_seconds += time.perf_counter() - started
+                    embedded += len(batch)
+
+                    dedup.add(batch, embeddings)
+                    print(f"📦 Stored {store.count} documents", end="\r")
+
+            store.manifest = manifest
+            store.attributions = dedup.attributions()
+            store.attributed_rows = dedup.attributed_rows()
+
+    print(f"\n🧬 Dedup: {dedup.exact_hits} exact and {dedup.near_hits} near "
+          f"duplicates collapsed into {len(store.attributions)} canonical documents")
+    print(f"⏱ Embed: {_rate(embedded, embed_seconds)}")
+    print(f"✅ RAG store written to {output_path} ({store.count} documents)")
 
 
 # ===============================
-# MAIN
+# CLI
 # ===============================
 def main():
-    documents = []
-    documents.extend(load_bioasq())
-    documents.extend(load_medquad())
-
-    print(f"📚 Total documents: {len(documents)}")
-
-    model = SentenceTransformer(EMBED_MODEL)
-    embeddings = model.encode(
-        [d["text"] for d in documents],
-        show_progress_bar=True
+    parser = argparse.ArgumentParser(description="Build / update the RAG store")
+    parser.add_argument(
+        "--sources", nargs="+", choices=sorted(LOADERS),
+        help="sources to (re)scan; others keep their previous documents",
     )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, help="parser processes (default: CPUs)")
+    parser.add_argument("--chunksize", type=int, help="files per parser task")
+    parser.add_argument("--encode-threads", type=int, help="torch threads for encoding")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the manifest")
+    parser.add_argument(
+        "--dedup-threshold", type=float, default=DEDUP_THRESHOLD,
+        help="cosine similarity for near-duplicates (≥ 1 disables)",
+    )
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
 
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump({
-            "documents": documents,
-            "embeddings": embeddings.tolist()
-        }, f)
-
-    print(f"✅ embeddings.json created at {OUTPUT_PATH}")
+    ingest(
+        sources=args.sources,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        encode_threads=args.encode_threads,
+        rebuild=args.rebuild,
+        output_path=args.output,
+        dedup_threshold=args.dedup_threshold,
+    )
 
 
 if __name__ == "__main__":
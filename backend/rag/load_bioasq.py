@@ -1,14 +1,20 @@
-from pathlib import Path
+from app.rag.parallel import ParseReport, map_files
+from app.rag.sources import BIOASQ_PATH, bioasq_files
 from app.rag.xml_parser import parse_bioasq_xml
 
-def load_all_bioasq(base_path="app/data/bioasq"):
+def load_all_bioasq(base_path=BIOASQ_PATH, workers=None, chunksize=None):
     documents = []
+    report = ParseReport("BioASQ")
 
-    for xml_file in Path(base_path).rglob("*.xml"):
-        qa_pairs = parse_bioasq_xml(str(xml_file))
-        for qa in qa_pairs:
-            qa["source"] = f"BioASQ | {xml_file.parent.name}"
-            documents.append(qa)
+    # Sorted so merged results come out in the same order every run
+    xml_files = [path for _, path in bioasq_files(base_path)]
+
+    for _, qa_pairs, error in map_files(
+        parse_bioasq_xml, xml_files, workers, chunksize, report
+    ):
+        if not error:
+            documents.extend(qa_pairs)
 
     print(f"BioASQ loaded: {len(documents)} QA pairs")
+    report.print_summary()
     return documents
@@ -0,0 +1,119 @@
+# app/rag/parallel.py
+"""
+Process-pool fan-out for per-file parsing.
+
+XML parsing is CPU-bound and holds the GIL, so files are parsed on a
+ProcessPoolExecutor. Results come back in input order, which keeps doc
+order (and therefore store row order) deterministic across runs.
+
+Only a bounded window of chunks is in flight at once, so parsed
+documents are handed to the consumer as it catches up instead of
+accumulating for the whole corpus.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Parser processes (0 → one per CPU) and files handed to each per task
+WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or os.cpu_count() or 1
+CHUNKSIZE = int(os.getenv("INGEST_CHUNKSIZE", "32"))
+
+# Chunks submitted ahead of the consumer, per worker
+PREFETCH_CHUNKS = 2
+
+# Failures listed individually in the summary; the rest are only counted
+MAX_REPORTED_FAILURES = 10
+
+
+class ParseReport:
+    """Counts parsed / failed files instead of silently skipping errors."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.parsed = 0
+        self.failures = []
+
+    def record(self, item, error):
+        if error is None:
+            self.parsed += 1
+        else:
+            self.failures.append((item, error))
+
+    def print_summary(self):
+        print(f"✅ {self.label}: {self.parsed} files parsed")
+
+        if not self.failures:
+            return
+
+        print(f"⚠ {self.label}: {len(self.failures)} files failed")
+        for item, error in self.failures[:MAX_REPORTED_FAILURES]:
+            print(f"   • {item}: {error}")
+        if len(self.failures) > MAX_REPORTED_FAILURES:
+            print(f"   • … {len(self.failures) - MAX_REPORTED_FAILURES} more")
+
+
+def _guarded(func, item):
+    try:
+        return func(item), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _guarded_chunk(func, chunk):
+    return [_guarded(func, item) for item in chunk]
+
+
+def _chunks(items, size: int):
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _pooled(pool, func, items, chunksize: int, window: int):
+    """(item, (result, error)) in input order, at most `window` chunks in flight."""
+    chunks = _chunks(items, chunksize)
+    pending = deque()
+
+    for chunk in islice(chunks, window):
+        pending.append((chunk, pool.submit(_guarded_chunk, func, chunk)))
+
+    while pending:
+        chunk, future = pending.popleft()
+        results = future.result()
+
+        following = next(chunks, None)
+        if following is not None:
+            pending.append((following, pool.submit(_guarded_chunk, func, following)))
+
+        yield from zip(chunk, results)
+
+
+def map_files(func, items, workers: int = None, chunksize: int = None,
+              report: ParseReport = None, label=None):
+    """
+    Applies `func` to every item on a process pool.
+
+    Yields (item, result, error) in input order; `error` is None on
+    success. `func` must be a module-level (picklable) function.
+    `label(item)` names the item in the failure report.
+    """
+    workers = workers or WORKERS
+    chunksize = chunksize or CHUNKSIZE
+
+    if workers <= 1:
+        results = ((item, _guarded(func, item)) for item in items)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = _pooled(pool, func, items, chunksize, workers * PREFETCH_CHUNKS)
+
+    try:
+        for item, (result, error) in results:
+            if report is not None:
+                report.record(label(item) if label else item, error)
+            yield item, result, error
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
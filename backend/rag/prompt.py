@@ -1,4 +1,22 @@
 def build_rag_prompt(user_query: str, context: str):
+    # No relevant reference found → skip the context block entirely
+    if not context:
+        return f"""
+You are MediExplain AI.
+
+STRICT MEDICAL SAFETY RULES:
+- Educational information only
+- No diagnosis or prescriptions
+- No medical reference context matched this question
+- Answer only with well-established general knowledge, or say so
+- Recommend professional care if symptoms sound serious
+
+User Question:
+{user_query}
+
+Respond clearly, cautiously, and factually.
+"""
+
     return f"""
 You are MediExplain AI.
 
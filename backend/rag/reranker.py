@@ -0,0 +1,82 @@
+# app/rag/reranker.py
+"""
+Cascade cross-encoder reranking.
+
+The bi-encoder shortlist is only reranked when its ranking is ambiguous
+(top-1 / top-2 score margin below RERANK_MARGIN), and the cross-encoder
+runs in small batches under a hard per-request time budget. If the
+budget would be exceeded, the bi-encoder order is kept as is.
+"""
+
+import os
+import time
+import numpy as np
+
+RERANK_ENABLED = os.getenv("RAG_RERANK", "false").lower() in ("1", "true", "yes")
+RERANK_MODEL = os.getenv("RAG_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+# Shortlist size fetched from the bi-encoder when reranking is enabled
+RERANK_CANDIDATES = int(os.getenv("RAG_RERANK_CANDIDATES", "20"))
+RERANK_MARGIN = float(os.getenv("RAG_RERANK_MARGIN", "0.05"))
+RERANK_BUDGET_MS = float(os.getenv("RAG_RERANK_BUDGET_MS", "150"))
+
+# Pairs scored per predict() call; the budget is checked between batches
+RERANK_BATCH = 4
+
+_cross_encoder = None
+
+
+def load():
+    """Loads the cross-encoder up front so loading never eats the budget."""
+    global _cross_encoder
+
+    if _cross_encoder is None:
+        from sentence_transformers import CrossEncoder
+        _cross_encoder = CrossEncoder(RERANK_MODEL)
+
+    return _cross_encoder
+
+
+def is_ambiguous(ranked_scores, margin: float = None) -> bool:
+    margin = RERANK_MARGIN if margin is None else margin
+    return len(ranked_scores) > 1 and ranked_scores[0] - ranked_scores[1] < margin
+
+
+def rerank(query: str, texts, budget_ms: float = None):
+    """
+    Scores (query, text) pairs with the cross-encoder.
+
+    Returns (order, stats): `order` is the new best-first permutation of
+    `texts`, or None if the budget ran out before every pair was scored.
+    A batch is not started unless the previous one fits in what is left.
+    """
+    budget_ms = RERANK_BUDGET_MS if budget_ms is None else budget_ms
+    model = load()
+
+    started = time.perf_counter()
+    scores = []
+    batch_ms = 0.0
+
+    for i in range(0, len(texts), RERANK_BATCH):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        # Nothing left (checked before the first batch too), or the
+        # next batch, timed like the last one, would overrun
+        if elapsed_ms >= budget_ms or elapsed_ms + batch_ms > budget_ms:
+            return None, {
+                "fired": True,
+                "completed": False,
+                "ms": round(elapsed_ms, 1),
+                "scored": len(scores),
+            }
+
+        batch_started = time.perf_counter()
+        pairs = [(query, text) for text in texts[i:i + RERANK_BATCH]]
+        scores.extend(np.asarray(model.predict(pairs)).ravel().tolist())
+        batch_ms = (time.perf_counter() - batch_started) * 1000
+
+    return np.argsort(-np.asarray(scores)), {
+        "fired": True,
+        "completed": True,
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+        "scored": len(scores),
+    }
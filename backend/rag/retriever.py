@@ -1,58 +1,342 @@
 import os
-import json
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from concurrent.futures import ThreadPoolExecutor
+
+from app.rag import encoder, reranker, store
 
 # ===============================
 # CONFIG
 # ===============================
-EMBED_MODEL = "all-MiniLM-L6-v2"
-EMBEDDINGS_PATH = "/app/data/embeddings.json"
+EMBED_MODEL = encoder.EMBED_MODEL
+STORE_PATH = store.STORE_PATH
+
+# Adaptive top-k: documents below MIN_SCORE are never used as context,
+# and the ranked list is cut at the first drop larger than SCORE_GAP.
+MIN_SCORE = float(os.getenv("RAG_MIN_SCORE", "0.35"))
+SCORE_GAP = float(os.getenv("RAG_SCORE_GAP", "0.08"))
+
+# Sharded exact search: the scanned rows are split into shards that are
+# scored on a thread pool (NumPy releases the GIL inside the matmul).
+# Below MIN_SHARD_ROWS per shard the thread hand-off costs more than it saves.
+SEARCH_SHARDS = int(os.getenv("RAG_SEARCH_SHARDS", "0")) or min(os.cpu_count() or 1, 8)
+MIN_SHARD_ROWS = int(os.getenv("RAG_MIN_SHARD_ROWS", "50000"))
 
 _model = None
 _documents = None
 _embeddings = None
+_attributions = None
+_partitions = None
+_attributed = None
+_pools = {}
+
+
+def _build_partitions(source_codes) -> dict:
+    """
+    Source name → [(start, stop), …] row runs.
+
+    Ingest writes sources in blocks, so most sources are one contiguous
+    run; a filtered search slices the memory-mapped matrix run by run
+    and never touches rows of other sources.
+    """
+    partitions = {}
+    if len(source_codes) == 0:
+        return partitions
+
+    bounds = np.flatnonzero(np.diff(source_codes)) + 1
+    starts = np.concatenate(([0], bounds))
+    stops = np.concatenate((bounds, [len(source_codes)]))
+
+    for start, stop in zip(starts, stops):
+        name = _documents.source_names[source_codes[start]]
+        partitions.setdefault(name, []).append((int(start), int(stop)))
+
+    return partitions
 
 
 def _load_store():
-    global _model, _documents, _embeddings
+    global _model, _documents, _embeddings, _attributions, _partitions, _attributed
 
     if _documents is not None:
         return
 
-    if not os.path.exists(EMBEDDINGS_PATH):
+    if not store.exists(STORE_PATH):
         raise RuntimeError(
-            "❌ embeddings.json not found. "
+            "❌ RAG store not found. "
             "Run: python -m app.rag.ingest"
         )
 
-    with open(EMBEDDINGS_PATH, encoding="utf-8") as f:
-        store = json.load(f)
+    _documents = store.open_documents(STORE_PATH)
+    _embeddings = store.load_embeddings(STORE_PATH)
+    _attributions = store.read_attributions(STORE_PATH)
+    _partitions = _build_partitions(_documents.source_codes)
+    _attributed = {
+        name: np.asarray(rows, dtype=np.int64)
+        for name, rows in store.read_attributed_rows(STORE_PATH).items()
+    }
+    _model = encoder.get_encoder()
+
+    if reranker.RERANK_ENABLED:
+        reranker.load()
+
+    print(f"✅ RAG store loaded ({len(_partitions)} source partitions)")
+
+
+# ===============================
+# SOURCE FILTER
+# ===============================
+def available_sources():
+    _load_store()
+    return sorted(set(_partitions) | set(_attributed))
+
+
+def _source_matches(name: str, wanted: str) -> bool:
+    """A family name like "BioASQ" selects every "BioASQ | <topic>" partition."""
+    name, wanted = name.lower(), wanted.strip().lower()
+    return name == wanted or name.startswith(f"{wanted} |")
 
-    _documents = store["documents"]
-    _embeddings = np.array(store["embeddings"])
-    _model = SentenceTransformer(EMBED_MODEL)
 
-    print("✅ RAG store loaded")
+def unknown_sources(sources):
+    """Requested names that select no partition (a typo would search nothing)."""
+    _load_store()
+    names = set(_partitions) | set(_attributed)
+    return [
+        wanted for wanted in sources
+        if not any(_source_matches(name, wanted) for name in names)
+    ]
+
+
+def _selected(name: str, sources) -> bool:
+    return any(_source_matches(name, s) for s in sources)
+
+
+def _runs_for(sources):
+    if not sources:
+        return [(0, len(_documents))]
+
+    runs = [
+        run
+        for name, name_runs in _partitions.items()
+        if _selected(name, sources)
+        for run in name_runs
+    ]
+    return sorted(runs)
+
+
+def _attributed_rows_for(sources):
+    """
+    Rows outside the selected partitions whose canonical document stands
+    in for a collapsed duplicate from a selected source (dedup keeps one
+    copy, possibly under another source's partition).
+    """
+    if not sources:
+        return np.zeros(0, dtype=np.int64)
+
+    rows = [r for name, r in _attributed.items() if _selected(name, sources)]
+    if not rows:
+        return np.zeros(0, dtype=np.int64)
+
+    rows = np.unique(np.concatenate(rows))
+    own_selected = np.array([
+        _selected(name, sources) for name in _documents.source_names
+    ], dtype=bool)
+    return rows[~own_selected[_documents.source_codes[rows]]]
+
+
+# ===============================
+# ADAPTIVE K
+# ===============================
+def select_k(ranked_scores, max_k: int,
+             min_score: float = None, score_gap: float = None) -> int:
+    """
+    Number of leading documents worth sending to the LLM.
+
+    `ranked_scores` must be sorted best-first. Returns 0 when even
+    the best match is below the absolute threshold (off-topic query).
+    """
+    min_score = MIN_SCORE if min_score is None else min_score
+    score_gap = SCORE_GAP if score_gap is None else score_gap
+
+    k = 0
+    for i, score in enumerate(ranked_scores[:max_k]):
+        if score < min_score:
+            break
+        if i > 0 and ranked_scores[i - 1] - score > score_gap:
+            break
+        k += 1
+
+    return k
+
+
+# ===============================
+# SEARCH
+# ===============================
+def _top_k(scores, k: int):
+    if len(scores) <= k:
+        return np.arange(len(scores))
+    return np.argpartition(scores, -k)[-k:]
+
+
+def _score_shard(query_vec, shard, k: int):
+    rows, scores = [], []
+
+    for start, stop in shard:
+        run_scores = _embeddings[start:stop] @ query_vec
+        best = _top_k(run_scores, k)
+        rows.append(best + start)
+        scores.append(run_scores[best])
+
+    return rows, scores
+
+
+def _split_shards(runs, shards: int):
+    """Cuts the row runs into at most `shards` groups of similar size."""
+    total = sum(stop - start for start, stop in runs)
+    shard_rows = max(-(-total // shards), MIN_SHARD_ROWS)
+
+    groups, current, size = [], [], 0
+    for start, stop in runs:
+        while start < stop:
+            take = min(stop - start, shard_rows - size)
+            current.append((start, start + take))
+            size += take
+            start += take
+            if size == shard_rows:
+                groups.append(current)
+                current, size = [], 0
+
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _get_pool(workers: int) -> ThreadPoolExecutor:
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="rag-search"
+        )
+    return pool
+
+
+def _search(query_vec, runs, k: int, shards: int = None):
+    """
+    Exact top-k over the given row runs → (rows, scores), best first.
+    Each shard keeps its own top-k; the partial lists are merged here.
+    """
+    shards = shards or SEARCH_SHARDS
+    groups = _split_shards(runs, shards)
+
+    if len(groups) <= 1:
+        partials = [_score_shard(query_vec, g, k) for g in groups]
+    else:
+        pool = _get_pool(shards)
+        partials = list(pool.map(lambda g: _score_shard(query_vec, g, k), groups))
+
+    rows = [r for shard_rows, _ in partials for r in shard_rows]
+    scores = [s for _, shard_scores in partials for s in shard_scores]
+
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    rows = np.concatenate(rows)
+    scores = np.concatenate(scores)
+    order = np.argsort(-scores)[:k]
+    return rows[order], scores[order]
+
+
+def _search_filtered(query_vec, sources, k: int):
+    """_search over the selected partitions plus their attributed rows."""
+    rows, scores = _search(query_vec, _runs_for(sources), k)
+
+    extra = _attributed_rows_for(sources)
+    if not len(extra):
+        return rows, scores
+
+    extra_scores = _embeddings[extra] @ query_vec
+    rows = np.concatenate((rows, extra))
+    scores = np.concatenate((scores, extra_scores))
+    order = np.argsort(-scores)[:k]
+    return rows[order], scores[order]
 
 
 # ===============================
 # RETRIEVER
 # ===============================
-def retrieve_context(query: str, top_k: int = 3):
+def rank(query: str, k: int, sources=None, adaptive: bool = True):
+    """
+    Best-first (rows, bi-encoder scores, eligible, rerank stats).
+
+    With `adaptive`, `eligible` is select_k over the bi-encoder scores
+    (MIN_SCORE and the score-gap cut): how many rows to use. The
+    reranker reorders the whole shortlist above MIN_SCORE, so it can
+    bring up a row the gap cut left out, but never one below MIN_SCORE.
+    Scores are reordered together with their rows.
+    """
     _load_store()
 
-    query_vec = _model.encode([query])
-    scores = cosine_similarity(query_vec, _embeddings)[0]
+    query_vec = _model.encode([query])[0]
+
+    # Over-fetch a shortlist when the reranking cascade is on
+    fetch = max(k, reranker.RERANK_CANDIDATES) if reranker.RERANK_ENABLED else k
+    candidates, scores = _search_filtered(query_vec, sources, fetch)
+
+    eligible = select_k(scores, len(scores)) if adaptive else len(scores)
 
-    top_indices = scores.argsort()[-top_k:][::-1]
+    # Scores are sorted, so the rows above MIN_SCORE are a prefix
+    pool = int(np.count_nonzero(scores >= MIN_SCORE)) if adaptive else len(scores)
+
+    rerank_stats = {"fired": False}
+    if (
+        reranker.RERANK_ENABLED
+        and eligible
+        and pool > 1
+        and reranker.is_ambiguous(scores[:pool])
+    ):
+        order, rerank_stats = reranker.rerank(query, _documents.texts(candidates[:pool]))
+        if order is not None:
+            candidates = np.concatenate((candidates[:pool][order], candidates[pool:]))
+            scores = np.concatenate((scores[:pool][order], scores[pool:]))
+
+    return candidates, scores, eligible, rerank_stats
+
+
+def retrieve_context(query: str, top_k: int = 3, adaptive: bool = True,
+                     sources=None, trace: dict = None):
+    """
+    `sources` restricts the search to the named partitions
+    (e.g. ["MedQuAD"], ["BioASQ | 2_GARD_QA"], or ["BioASQ"] for all topics).
+    `trace`, if given, is filled with retrieval details for the audit log.
+    """
+    candidates, scores, eligible, rerank_stats = rank(query, top_k, sources, adaptive)
+
+    # select_k sets how many rows are used; the (possibly reranked)
+    # order sets which
+    k = min(top_k, eligible, len(candidates))
+    top_score = float(scores.max()) if len(scores) else 0.0
+    top_indices = candidates[:k]
+
+    if adaptive:
+        print(f"🔍 RAG adaptive k={k}/{top_k} (top score {top_score:.3f})")
+
+    if trace is not None:
+        trace.update({
+            "k": k,
+            "top_score": round(top_score, 4),
+            "sources": sources,
+            "rerank": rerank_stats,
+        })
 
     contexts = []
-    sources = set()
+    cited = set()
 
     for idx in top_indices:
-        contexts.append(_documents[idx]["text"])
-        sources.add(_documents[idx]["source"])
+        contexts.append(_documents.text(idx))
+
+        # Collapsed duplicates keep their citation
+        members = _attributions.get(_documents.doc_id(idx))
+        if members:
+            cited.update(m["source"] for m in members)
+        else:
+            cited.add(_documents.source(idx))
 
-    return "\n\n".join(contexts), list(sources)
+    return "\n\n".join(contexts), list(cited)
@@ -0,0 +1,167 @@
+# app/rag/sources.py
+"""
+Source-loader registry.
+
+Every corpus registers one loader: a `files()` generator of
+(manifest key, path) pairs and a `parse(path)` generator of documents.
+Ingest discovers sources here, so adding a corpus means adding one
+decorated parser to this module — `ingest.main()` stays untouched.
+
+Document convention (shared by every loader):
+    id      stable across runs, unique across sources
+    text    "Q: …\\nA: …"
+    source  display name ("MedQuAD", "BioASQ | <topic folder>")
+    hash    SHA-1 of source + text, drives incremental ingest
+"""
+
+import os
+import csv
+import hashlib
+from xml.etree import ElementTree as ET
+
+# ===============================
+# CONTAINER-SAFE PATHS
+# ===============================
+BASE_DATA_PATH = "/app/data"
+BIOASQ_PATH = os.path.join(BASE_DATA_PATH, "bioasq")
+MEDQUAD_PATH = os.path.join(BASE_DATA_PATH, "medquad", "medDataset_processed.csv")
+
+
+# ===============================
+# REGISTRY
+# ===============================
+class SourceLoader:
+    def __init__(self, name: str, files, parse):
+        self.name = name
+        self.files = files
+        self.parse = parse
+
+
+LOADERS = {}
+
+
+def register_source(name: str, files):
+    """Decorator: registers `parse` together with its file lister."""
+    def decorator(parse):
+        LOADERS[name] = SourceLoader(name, files, parse)
+        return parse
+    return decorator
+
+
+def get_loaders(names=None):
+    if not names:
+        return list(LOADERS.values())
+
+    unknown = [n for n in names if n not in LOADERS]
+    if unknown:
+        raise ValueError(
+            f"Unknown source(s): {', '.join(unknown)}. "
+            f"Available: {', '.join(LOADERS)}"
+        )
+    return [LOADERS[n] for n in names]
+
+
+# ===============================
+# HASHING
+# ===============================
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def make_document(doc_id: str, question: str, answer: str, source: str):
+    text = f"Q: {question}\nA: {answer}"
+    return {
+        "id": doc_id,
+        "text": text,
+        "source": source,
+        "hash": content_hash(f"{source}\n{text}"),
+    }
+
+
+def manifest_key(path: str) -> str:
+    return os.path.relpath(path, BASE_DATA_PATH)
+
+
+# ===============================
+# BioASQ XML
+# ===============================
+def bioasq_files(base_path: str = BIOASQ_PATH):
+    """(manifest key, path) for every BioASQ XML file, in stable order."""
+    for root_dir, dirs, files in os.walk(base_path):
+        dirs.sort()
+        for file in sorted(files):
+            if file.lower().endswith(".xml"):
+                path = os.path.join(root_dir, file)
+                yield manifest_key(path), path
+
+
+@register_source("bioasq", files=bioasq_files)
+def parse_bioasq(path: str):
+    """
+    Yields QA documents one by one; each parsed QAPair is freed at once.
+    Ids are derived from topic folder, file and pair number, so they
+    survive re-ingestion and changes elsewhere in the corpus.
+    """
+    folder = os.path.basename(os.path.dirname(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    source = f"BioASQ | {folder}"
+
+    for n, (_, elem) in enumerate(
+        e for e in ET.iterparse(path) if e[1].tag == "QAPair"
+    ):
+        q = elem.findtext("Question")
+        a = elem.findtext("Answer")
+        pid = elem.get("pid") or str(n)
+        elem.clear()
+
+        if q and a:
+            yield make_document(f"bioasq_{folder}_{stem}_{pid}", q, a, source)
+
+
+# ===============================
+# MedQuAD CSV
+# ===============================
+def medquad_files():
+    if os.path.exists(MEDQUAD_PATH):
+        yield manifest_key(MEDQUAD_PATH), MEDQUAD_PATH
+    else:
+        print("⚠ MedQuAD CSV not found:", MEDQUAD_PATH)
+
+
+@register_source("medquad", files=medquad_files)
+def parse_medquad(path: str):
+    """
+    Yields QA documents while reading the CSV row by row.
+    Rows carry no id, so the id is a hash of the question text
+    (suffixed for repeated questions).
+    """
+    seen = {}
+
+    with open(path, encoding="utf-8", errors="ignore", newline="") as f:
+        reader = csv.reader(f)
+
+        headers = [h.lower() for h in next(reader)]
+        q_idx = headers.index("question")
+        a_idx = headers.index("answer")
+
+        for row in reader:
+            if len(row) <= max(q_idx, a_idx):
+                continue
+
+            q = row[q_idx].strip()
+            a = row[a_idx].strip()
+            if q and a:
+                key = content_hash(q)[:16]
+                dup = seen.get(key, 0)
+                seen[key] = dup + 1
+
+                doc_id = f"medquad_{key}" + (f"_{dup}" if dup else "")
+                yield make_document(doc_id, q, a, "MedQuAD")
@@ -0,0 +1,223 @@
+# app/rag/store.py
+"""
+On-disk RAG store.
+
+Layout (one directory):
+    meta.json         format version, model, vector dim, count, build time
+    manifest.json     content hashes per source file and per document
+    attributions.json canonical id → every collapsed duplicate's id/source
+    attributed_rows.json  source → rows whose cluster includes that source
+    embeddings.f32    raw float32 matrix, L2-normalized, row i ↔ document i
+    texts.*, ids.*,   columnar document table, see app.rag.doctable
+    source_codes.u16,
+    sources.json
+
+All data files are append-only, so ingest can write batch by batch,
+and the retriever memory-maps them instead of parsing JSON.
+"""
+
+import os
+import json
+import shutil
+import numpy as np
+from datetime import datetime
+
+from app.rag.doctable import DocTable, DocTableWriter
+
+STORE_PATH = "/app/data/store"
+
+META_FILE = "meta.json"
+MANIFEST_FILE = "manifest.json"
+ATTRIBUTIONS_FILE = "attributions.json"
+ATTRIBUTED_ROWS_FILE = "attributed_rows.json"
+EMBEDDINGS_FILE = "embeddings.f32"
+
+# Version 1 kept documents in documents.jsonl; still readable by ingest.
+# Version 3 stores L2-normalized rows (the retriever scores by dot product);
+# version 4 adds attributed_rows.json for source filters.
+FORMAT_VERSION = 4
+LEGACY_DOCUMENTS_FILE = "documents.jsonl"
+
+
+# ===============================
+# WRITER
+# ===============================
+class StoreWriter:
+    """
+    Streams batches into `<path>.tmp` and swaps it into place on close,
+    so a crashed ingest never leaves a half-written store behind.
+    """
+
+    def __init__(self, path: str = STORE_PATH, model: str = ""):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.model = model
+        self.dim = None
+        self.count = 0
+        self.manifest = None
+        self.attributions = None
+        self.attributed_rows = None
+
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+
+        self._docs = DocTableWriter(self.tmp_path)
+        self._vecs = open(os.path.join(self.tmp_path, EMBEDDINGS_FILE), "wb")
+
+    def append(self, documents, embeddings):
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        if len(documents) != len(embeddings):
+            raise ValueError("documents and embeddings length mismatch")
+
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+        elif embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"embedding dim {embeddings.shape[1]} != store dim {self.dim}"
+            )
+
+        # Unit rows: cosine similarity becomes a plain dot product
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        self._docs.append(documents)
+        self._vecs.write(embeddings.tobytes())
+
+        self.count += len(documents)
+
+    def written_embeddings(self) -> np.ndarray:
+        """Read-only view of every row appended so far."""
+        self._vecs.flush()
+        if self.count == 0:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+
+        return np.memmap(
+            os.path.join(self.tmp_path, EMBEDDINGS_FILE),
+            dtype=np.float32,
+            mode="r",
+            shape=(self.count, self.dim),
+        )
+
+    def close(self):
+        self._docs.close()
+        self._vecs.close()
+
+        with open(os.path.join(self.tmp_path, META_FILE), "w") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "model": self.model,
+                "dim": self.dim or 0,
+                "count": self.count,
+                "built_at": datetime.utcnow().isoformat(),
+            }, f)
+
+        if self.manifest is not None:
+            with open(os.path.join(self.tmp_path, MANIFEST_FILE), "w") as f:
+                json.dump(self.manifest, f)
+
+        if self.attributions is not None:
+            with open(os.path.join(self.tmp_path, ATTRIBUTIONS_FILE), "w") as f:
+                json.dump(self.attributions, f, ensure_ascii=False)
+
+        if self.attributed_rows is not None:
+            with open(os.path.join(self.tmp_path, ATTRIBUTED_ROWS_FILE), "w") as f:
+                json.dump(self.attributed_rows, f, ensure_ascii=False)
+
+        old_path = f"{self.path}.old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(self.path):
+            os.rename(self.path, old_path)
+        os.rename(self.tmp_path, self.path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def abort(self):
+        self._docs.close()
+        self._vecs.close()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# ===============================
+# READERS
+# ===============================
+def exists(path: str = STORE_PATH) -> bool:
+    return os.path.exists(os.path.join(path, META_FILE))
+
+
+def read_meta(path: str = STORE_PATH) -> dict:
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_manifest(path: str = STORE_PATH):
+    """Manifest of the last ingest run, or None for a fresh/legacy store."""
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_attributions(path: str = STORE_PATH) -> dict:
+    """Canonical id → attributions, only for documents that absorbed duplicates."""
+    attributions_path = os.path.join(path, ATTRIBUTIONS_FILE)
+    if not os.path.exists(attributions_path):
+        return {}
+
+    with open(attributions_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_attributed_rows(path: str = STORE_PATH) -> dict:
+    """Source → rows of canonical documents that absorbed a duplicate from it."""
+    rows_path = os.path.join(path, ATTRIBUTED_ROWS_FILE)
+    if not os.path.exists(rows_path):
+        return {}
+
+    with open(rows_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def open_documents(path: str = STORE_PATH) -> DocTable:
+    if read_meta(path).get("version", 1) < FORMAT_VERSION:
+        raise RuntimeError(
+            "❌ RAG store format is outdated. "
+            "Run: python -m app.rag.ingest"
+        )
+    return DocTable(path)
+
+
+def iter_documents(path: str = STORE_PATH):
+    """Documents as dicts in row order (ingest side; also reads version 1)."""
+    legacy_path = os.path.join(path, LEGACY_DOCUMENTS_FILE)
+    if os.path.exists(legacy_path):
+        with open(legacy_path, encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+        return
+
+    yield from DocTable(path)
+
+
+def load_embeddings(path: str = STORE_PATH) -> np.ndarray:
+    """Memory-mapped (count, dim) float32 matrix; pages load on demand."""
+    meta = read_meta(path)
+    if meta["count"] == 0:
+        return np.zeros((0, meta["dim"]), dtype=np.float32)
+
+    return np.memmap(
+        os.path.join(path, EMBEDDINGS_FILE),
+        dtype=np.float32,
+        mode="r",
+        shape=(meta["count"], meta["dim"]),
+    )
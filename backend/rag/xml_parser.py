@@ -1,21 +1,9 @@
-import xml.etree.ElementTree as ET
+from app.rag.sources import parse_bioasq
 
 def parse_bioasq_xml(xml_path: str):
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-
-    records = []
-
-    for qa in root.iter("QAPair"):
-        question = qa.findtext("Question")
-        answer = qa.findtext("Answer")
-
-        if not question or not answer:
-            continue
-
-        records.append({
-            "text": f"Q: {question}\nA: {answer}",
-            "source": "BioASQ"
-        })
-
-    return records
+    """
+    Parses one BioASQ XML file into documents.
+    Thin wrapper over the "bioasq" loader in app.rag.sources, so ids and
+    source names match what ingest writes to the store.
+    """
+    return list(parse_bioasq(xml_path))
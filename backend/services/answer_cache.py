@@ -0,0 +1,56 @@
+# app/services/answer_cache.py
+"""
+In-process lookup table of precomputed answers.
+
+Filled by app.jobs.popular_questions for the most frequent questions.
+Entries are tagged with the RAG store build and LLM model they were
+computed against; only entries for the current pair are loaded, so a
+re-ingest or model switch never serves stale answers.
+"""
+
+import re
+
+from app.db.mongo import precomputed_answers_collection
+from app.rag import store
+from app.services.llm import OLLAMA_MODEL
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+_table = {}
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, punctuation-free, single-spaced form used as the cache key."""
+    text = _PUNCTUATION.sub(" ", text.lower())
+    return _SPACES.sub(" ", text).strip()
+
+
+def current_version() -> str:
+    meta = store.read_meta(store.STORE_PATH)
+    return f"{meta['model']}@{meta.get('built_at', '')}|{OLLAMA_MODEL}"
+
+
+def reload() -> int:
+    """Swaps in a fresh table for the current store/model version."""
+    global _table
+
+    try:
+        version = current_version()
+    except FileNotFoundError:
+        _table = {}
+        return 0
+
+    _table = {
+        entry["key"]: entry
+        for entry in precomputed_answers_collection.find(
+            {"version": version},
+            {"_id": 0, "key": 1, "reply": 1, "sources": 1, "retrieval": 1},
+        )
+    }
+    return len(_table)
+
+
+def lookup(question: str):
+    """Precomputed {reply, sources, retrieval} for this question, or None."""
+    return _table.get(normalize_question(question))
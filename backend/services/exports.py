@@ -0,0 +1,217 @@
+# app/services/exports.py
+"""
+Streaming bulk exports of the audit collections.
+
+Rows are read from a Motor cursor in batches and encoded one at a time,
+so memory stays flat whatever the export size:
+
+    async for chunk in export_stream("conversations", "ndjson", query):
+        ...
+
+Formats: NDJSON (one JSON document per line, nested fields intact) and
+CSV (fixed columns per dataset, nested values JSON-encoded). Either can
+be gzip-compressed on the fly.
+
+Conversations can include the cold archive (app.jobs.conversation_archive):
+archived days are read from the archive files, later ones from Mongo.
+"""
+
+import csv
+import io
+import zlib
+import asyncio
+from itertools import islice
+from datetime import datetime, timezone
+
+from bson import json_util
+
+from app.db import async_mongo
+from app.jobs.conversation_archive import archived_until, iter_archived
+
+BATCH_SIZE = 1000
+
+# Flush compressed/encoded output in chunks of roughly this size
+CHUNK_BYTES = 64 * 1024
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+# =============================
+# DATASETS
+# =============================
+# collection, time field, user field, CSV columns
+EXPORTS = {
+    "conversations": {
+        "collection": async_mongo.conversations_collection,
+        "time_field": "created_at",
+        "user_field": "user_email",
+        "columns": [
+            "_id", "created_at", "user_email", "question", "reply",
+            "sources", "emergency", "pipeline", "latency_ms",
+        ],
+    },
+    "role_history": {
+        "collection": async_mongo.role_history_collection,
+        "time_field": "timestamp",
+        "user_field": "target_user",
+        "columns": [
+            "_id", "timestamp", "target_user", "changed_by", "old_role", "new_role",
+        ],
+    },
+    "audit_logs": {
+        "collection": async_mongo.audit_logs_collection,
+        "time_field": "timestamp",
+        "user_field": "user_email",
+        "columns": ["_id", "timestamp", "user_email", "action", "details"],
+    },
+}
+
+
+def _utc(value: datetime):
+    # Stored timestamps are naive UTC
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def export_query(dataset: str, start: datetime = None, end: datetime = None,
+                 user: str = None) -> dict:
+    """Filter for [start, end) and, optionally, one user."""
+    spec = EXPORTS[dataset]
+    query = {}
+
+    if start or end:
+        window = {}
+        if start:
+            window["$gte"] = start
+        if end:
+            window["$lt"] = end
+        query[spec["time_field"]] = window
+
+    if user:
+        query[spec["user_field"]] = user
+
+    return query
+
+
+# =============================
+# ENCODERS
+# =============================
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json_util.dumps(value)
+    return str(value)
+
+
+async def _ndjson_rows(docs):
+    async for doc in docs:
+        yield json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS) + "\n"
+
+
+async def _csv_rows(docs, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(columns)
+    async for doc in docs:
+        yield line([_csv_value(doc.get(column)) for column in columns])
+
+
+async def _documents(collection, query: dict, sort_field: str):
+    cursor = collection.find(query).sort(sort_field, 1).batch_size(BATCH_SIZE)
+    async for doc in cursor:
+        yield doc
+
+
+async def _archived(start, end, user):
+    """Archive files are read off the event loop, a batch at a time."""
+    rows = iter_archived(start, end, user)
+    while True:
+        batch = await asyncio.to_thread(lambda: list(islice(rows, BATCH_SIZE)))
+        if not batch:
+            return
+        for doc in batch:
+            yield doc
+
+
+async def _with_archive(start, end, user):
+    boundary = await asyncio.to_thread(archived_until)
+
+    if boundary and (start is None or start < boundary):
+        async for doc in _archived(start, min(end, boundary) if end else boundary, user):
+            yield doc
+        # Archived days may still be in the hot window; don't repeat them
+        start = boundary
+
+    if end is None or start is None or start < end:
+        spec = EXPORTS["conversations"]
+        query = export_query("conversations", start, end, user)
+        async for doc in _documents(spec["collection"], query, spec["time_field"]):
+            yield doc
+
+
+async def _encoded(rows):
+    """Groups small encoded rows into ~CHUNK_BYTES writes."""
+    pending, size = [], 0
+    async for row in rows:
+        data = row.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= CHUNK_BYTES:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+async def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# =============================
+# ENTRY POINT
+# =============================
+async def export_stream(dataset: str, fmt: str, start: datetime = None,
+                        end: datetime = None, user: str = None, gzip: bool = False,
+                        include_archive: bool = False):
+    """Async byte stream of `dataset` rows in [start, end), oldest first."""
+    spec = EXPORTS[dataset]
+    start, end = _utc(start), _utc(end)
+    user = user.strip().lower() if user else None
+
+    if include_archive and dataset == "conversations":
+        docs = _with_archive(start, end, user)
+    else:
+        query = export_query(dataset, start, end, user)
+        docs = _documents(spec["collection"], query, spec["time_field"])
+
+    if fmt == "csv":
+        rows = _csv_rows(docs, spec["columns"])
+    else:
+        rows = _ndjson_rows(docs)
+
+    chunks = _encoded(rows)
+    if gzip:
+        chunks = _gzipped(chunks)
+
+    async for chunk in chunks:
+        yield chunk
@@ -11,6 +11,13 @@ SYSTEM_PROMPT = (
     "Do not diagnose or prescribe treatments."
 )
 
+NO_RESPONSE_REPLY = "I could not generate a response at this time."
+UNAVAILABLE_REPLY = (
+    "The AI service is temporarily unavailable.\n\n"
+    "This assistant provides educational information only "
+    "and is not a medical diagnosis."
+)
+
 def generate_response(prompt: str) -> str:
     try:
         full_prompt = f"{SYSTEM_PROMPT}\n\nUser question:\n{prompt}"
@@ -28,14 +35,8 @@ def generate_response(prompt: str) -> str:
         res.raise_for_status()
         data = res.json()
 
-        return data.get("response", "").strip() or (
-            "I could not generate a response at this time."
-        )
+        return data.get("response", "").strip() or NO_RESPONSE_REPLY
 
     except Exception as e:
         print("LLM ERROR:", e)
-        return (
-            "The AI service is temporarily unavailable.\n\n"
-            "This assistant provides educational information only "
-            "and is not a medical diagnosis."
-        )
+        return UNAVAILABLE_REPLY
@@ -0,0 +1,209 @@
+# app/services/metrics.py
+"""
+Incrementally maintained dashboard counters.
+
+One document in `metrics` holds the system-wide counts shown on the
+admin dashboard. Every write path that changes a count applies an
+atomic $inc; reads go through a short in-process TTL cache, so the
+dashboard costs O(1) whatever the data volume. reconcile() recounts
+from the source collections periodically and corrects any drift
+(crashed requests, manual edits, writes from outside the app).
+
+Only reconcile() creates the document (seed() runs it at startup): an
+$inc on a missing document is dropped (the recount that seeds it
+includes that write). reconcile() never overwrites the counts: it
+snapshots them, recounts, and applies (recount − snapshot) as one more
+$inc. Increments landing meanwhile commute with it and are kept, so the
+correction always applies, however busy the counters are.
+
+conversations_total covers every conversation ever recorded: the
+recount adds the cold archive to what is still in the hot collection,
+so the TTL expiring old conversations does not shrink it.
+
+    {
+        "_id": "dashboard",
+        "reports_total": …,
+        "reports_by_status": {"Analyzed": …, …},
+        "users_active": …,
+        "conversations_total": …,
+        "updated_at": …,
+        "reconciled_at": …,
+    }
+"""
+
+import os
+import time
+from datetime import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+from app.db import async_mongo
+from app.db.mongo import (
+    conversations_collection,
+    metrics_collection,
+    reports_collection,
+    users_collection,
+)
+from app.jobs.conversation_archive import archived_count, archived_until
+
+COUNTERS_ID = "dashboard"
+ACTIVE = "Active"
+
+CACHE_TTL_SECONDS = float(os.getenv("METRICS_CACHE_TTL_SECONDS", "10"))
+
+_cache = None
+_cached_at = 0.0
+
+
+def _status_field(status) -> str:
+    # Statuses become sub-document keys; keep them path-safe
+    name = str(status or "Unknown").replace(".", "_").replace("$", "_")
+    return f"reports_by_status.{name}"
+
+
+def invalidate():
+    global _cache
+    _cache = None
+
+
+# =============================
+# WRITES ($inc)
+# =============================
+async def increment(fields: dict):
+    fields = {k: v for k, v in fields.items() if v}
+    if not fields:
+        return
+
+    # No upsert: a partial document would hide every other counter
+    await async_mongo.metrics_collection.update_one(
+        {"_id": COUNTERS_ID},
+        {"$inc": fields, "$set": {"updated_at": datetime.utcnow()}},
+    )
+    invalidate()
+
+
+async def record_conversation():
+    await increment({"conversations_total": 1})
+
+
+async def record_user_created(status: str = ACTIVE):
+    await increment({"users_active": int(status == ACTIVE)})
+
+
+async def record_user_status_change(old_status, new_status):
+    await increment({"users_active": int(new_status == ACTIVE) - int(old_status == ACTIVE)})
+
+
+async def record_report_created(status):
+    await increment({"reports_total": 1, _status_field(status): 1})
+
+
+async def record_report_status_change(old_status, new_status):
+    if old_status != new_status:
+        await increment({_status_field(old_status): -1, _status_field(new_status): 1})
+
+
+# =============================
+# READS (TTL cache)
+# =============================
+async def dashboard_counters() -> dict:
+    """Counters for the admin dashboard; at most one read per TTL window."""
+    global _cache, _cached_at
+
+    if _cache is not None and time.monotonic() - _cached_at < CACHE_TTL_SECONDS:
+        return _cache
+
+    # Seeded at startup (seed()); zeros until then, never a recount here
+    doc = await async_mongo.metrics_collection.find_one({"_id": COUNTERS_ID}) or {}
+
+    by_status = doc.get("reports_by_status", {})
+    _cache = {
+        "total_reports": doc.get("reports_total", 0),
+        "analyzed_reports": by_status.get("Analyzed", 0),
+        "active_users": doc.get("users_active", 0),
+        "assistant_queries": doc.get("conversations_total", 0),
+    }
+    _cached_at = time.monotonic()
+    return _cache
+
+
+# =============================
+# RECONCILIATION
+# =============================
+def count_conversations() -> int:
+    """Archived plus hot conversations, without counting archived days twice."""
+    boundary = archived_until()
+    if boundary is None:
+        return conversations_collection.count_documents({})
+    return archived_count() + conversations_collection.count_documents(
+        {"created_at": {"$gte": boundary}}
+    )
+
+
+def count_all() -> dict:
+    by_status = {
+        _status_field(row["_id"]).split(".", 1)[1]: row["count"]
+        for row in reports_collection.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+        ])
+    }
+    return {
+        "reports_total": sum(by_status.values()),
+        "reports_by_status": by_status,
+        "users_active": users_collection.count_documents({"status": ACTIVE}),
+        "conversations_total": count_conversations(),
+    }
+
+
+COUNTED = ("reports_total", "users_active", "conversations_total")
+
+
+def _correction(actual: dict, stored: dict) -> dict:
+    """The $inc that turns the stored counters into `actual`."""
+    delta = {key: actual[key] - stored.get(key, 0) for key in COUNTED}
+
+    stored_by_status = stored.get("reports_by_status", {})
+    for name in set(actual["reports_by_status"]) | set(stored_by_status):
+        delta[f"reports_by_status.{name}"] = (
+            actual["reports_by_status"].get(name, 0) - stored_by_status.get(name, 0)
+        )
+
+    return {key: value for key, value in delta.items() if value}
+
+
+def reconcile() -> dict:
+    """
+    Recounts everything and corrects the stored counters by the
+    difference to a snapshot taken just before ($inc); logs any drift.
+    Returns the counters as stored.
+    """
+    snapshot = metrics_collection.find_one({"_id": COUNTERS_ID})
+    actual = count_all()
+    now = datetime.utcnow()
+
+    if snapshot is None:
+        doc = {"_id": COUNTERS_ID, **actual, "updated_at": now, "reconciled_at": now}
+        try:
+            metrics_collection.insert_one(doc)
+        except DuplicateKeyError:
+            # Another worker seeded it meanwhile, from its own recount
+            return metrics_collection.find_one({"_id": COUNTERS_ID})
+        invalidate()
+        return doc
+
+    correction = _correction(actual, snapshot)
+    update = {"$set": {"updated_at": now, "reconciled_at": now}}
+    if correction:
+        update["$inc"] = correction
+        print(f"⚠ Dashboard counters drifted, corrected: {correction}")
+
+    metrics_collection.update_one({"_id": COUNTERS_ID}, update)
+    invalidate()
+    return metrics_collection.find_one({"_id": COUNTERS_ID})
+
+
+def seed():
+    """Startup: builds the counters once if no recount has stored them yet."""
+    doc = metrics_collection.find_one({"_id": COUNTERS_ID}, {"reconciled_at": 1})
+    if doc is None or "reconciled_at" not in doc:
+        reconcile()
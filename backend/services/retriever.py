@@ -1,19 +1,212 @@
-from app.core.config import knowledge_collection
-from sklearn.metrics.pairwise import cosine_similarity
+# app/services/retriever.py
+"""
+Vector search over knowledge_collection.
+
+The collection is mirrored once into an in-process, L2-normalized
+float32 matrix; afterwards only documents whose `updated_at` moved past
+the last watermark are fetched (or, on a replica set with
+KNOWLEDGE_CHANGE_STREAM enabled, changes are applied as they arrive).
+Writers are expected to set `updated_at` on every insert/update and to
+soft-delete with `deleted: true`; a periodic full resync catches hard
+deletes.
+"""
+
+import os
+import time
+import threading
 import numpy as np
 
-def retrieve_context(query_embedding, top_k=3):
-    docs = list(knowledge_collection.find({}))
-    if not docs:
-        return ""
+from app.db.mongo import knowledge_collection
+
+# ===============================
+# CONFIG
+# ===============================
+REFRESH_SECONDS = float(os.getenv("KNOWLEDGE_REFRESH_SECONDS", "30"))
+FULL_RESYNC_SECONDS = float(os.getenv("KNOWLEDGE_FULL_RESYNC_SECONDS", "3600"))
+CHANGE_STREAM = os.getenv("KNOWLEDGE_CHANGE_STREAM", "false").lower() in ("1", "true", "yes")
+
+PROJECTION = {"content": 1, "embedding": 1, "updated_at": 1, "deleted": 1}
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+# ===============================
+# IN-PROCESS INDEX
+# ===============================
+class KnowledgeIndex:
+    """
+    Rows live in a preallocated matrix that grows by doubling; updates
+    overwrite their row, deletes move the last row into the hole.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._matrix = None
+        self._ids = []
+        self._contents = []
+        self._rows = {}
+        self._watermark = None
+        self._last_refresh = 0.0
+        self._last_full = 0.0
+        self._watching = False
+
+    def __len__(self):
+        return len(self._ids)
+
+    # ---------- row maintenance (caller holds the lock) ----------
+    def _upsert(self, doc):
+        if doc.get("deleted") or not doc.get("embedding"):
+            self._remove(doc["_id"])
+            return
+
+        vector = _normalize(doc["embedding"])
+        row = self._rows.get(doc["_id"])
+
+        if self._matrix is None:
+            self._matrix = np.zeros((16, len(vector)), dtype=np.float32)
+        elif len(vector) != self._matrix.shape[1]:
+            print(f"⚠ Skipping knowledge doc {doc['_id']}: embedding dim {len(vector)}")
+            return
+
+        if row is None:
+            row = len(self._ids)
+            if row == len(self._matrix):
+                grown = np.zeros((2 * row, self._matrix.shape[1]), dtype=np.float32)
+                grown[:row] = self._matrix
+                self._matrix = grown
+            self._ids.append(doc["_id"])
+            self._contents.append(doc.get("content", ""))
+            self._rows[doc["_id"]] = row
+        else:
+            self._contents[row] = doc.get("content", "")
+
+        self._matrix[row] = vector
+
+    def _remove(self, doc_id):
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return
+
+        last = len(self._ids) - 1
+        if row != last:
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = self._ids[last]
+            self._contents[row] = self._contents[last]
+            self._rows[self._ids[row]] = row
+
+        self._ids.pop()
+        self._contents.pop()
+
+    def _advance(self, doc):
+        updated_at = doc.get("updated_at")
+        if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+            self._watermark = updated_at
+
+    # ---------- sync ----------
+    def full_sync(self):
+        docs = list(self.collection.find({"deleted": {"$ne": True}}, PROJECTION))
 
-    vectors = np.array([d["embedding"] for d in docs])
-    scores = cosine_similarity([query_embedding], vectors)[0]
+        with self._lock:
+            self._matrix = None
+            self._ids, self._contents, self._rows = [], [], {}
+            self._watermark = None
+            for doc in docs:
+                self._upsert(doc)
+                self._advance(doc)
 
-    top_docs = sorted(
-        zip(scores, docs),
-        key=lambda x: x[0],
-        reverse=True
-    )[:top_k]
+        self._last_full = self._last_refresh = time.monotonic()
+        print(f"✅ Knowledge index loaded ({len(self)} documents)")
+
+    def poll(self):
+        """Applies documents changed since the watermark (inclusive, idempotent)."""
+        query = {}
+        if self._watermark is not None:
+            query = {"updated_at": {"$gte": self._watermark}}
+
+        docs = list(self.collection.find(query, PROJECTION).sort("updated_at", 1))
+
+        with self._lock:
+            for doc in docs:
+                self._upsert(doc)
+                self._advance(doc)
+
+        self._last_refresh = time.monotonic()
+
+    def refresh(self):
+        # One refresh at a time; concurrent requests wait for it
+        with self._sync_lock:
+            now = time.monotonic()
+
+            if not self._last_full:
+                self.full_sync()
+                if CHANGE_STREAM:
+                    self._start_watch()
+            elif now - self._last_full > FULL_RESYNC_SECONDS:
+                self.full_sync()
+            elif not self._watching and now - self._last_refresh > REFRESH_SECONDS:
+                self.poll()
+
+    # ---------- change stream ----------
+    def _start_watch(self):
+        from pymongo.errors import PyMongoError
+
+        try:
+            stream = self.collection.watch(full_document="updateLookup")
+        except PyMongoError as e:
+            print(f"⚠ Knowledge change stream unavailable, polling instead: {e}")
+            return
+
+        def follow():
+            try:
+                for change in stream:
+                    with self._lock:
+                        if change["operationType"] == "delete":
+                            self._remove(change["documentKey"]["_id"])
+                        elif change.get("fullDocument"):
+                            self._upsert(change["fullDocument"])
+                            self._advance(change["fullDocument"])
+            except PyMongoError as e:
+                print(f"⚠ Knowledge change stream stopped, polling instead: {e}")
+            finally:
+                self._watching = False
+
+        self._watching = True
+        threading.Thread(target=follow, name="knowledge-watch", daemon=True).start()
+
+    # ---------- search ----------
+    def search(self, query_embedding, top_k: int):
+        query = _normalize(query_embedding)
+
+        with self._lock:
+            n = len(self._ids)
+            if n == 0:
+                return []
+
+            scores = self._matrix[:n] @ query
+
+            # Partial selection, then sort only the k winners
+            if n > top_k:
+                best = np.argpartition(scores, -top_k)[-top_k:]
+            else:
+                best = np.arange(n)
+            best = best[np.argsort(-scores[best])]
+
+            return [(float(scores[i]), self._contents[i]) for i in best]
+
+
+_index = KnowledgeIndex(knowledge_collection)
+
+
+def retrieve_context(query_embedding, top_k=3):
+    _index.refresh()
+
+    top_docs = _index.search(query_embedding, top_k)
+    if not top_docs:
+        return ""
 
-    return "\n".join(d["content"] for _, d in top_docs)
+    return "\n".join(content for _, content in top_docs)
@@ -0,0 +1,314 @@
+# app/services/usage_rollups.py
+"""
+Precomputed assistant usage analytics.
+
+rollup() folds conversation records into hourly buckets in
+`usage_rollups` and rebuilds the daily buckets they belong to; the
+admin API and dashboard read only these buckets, never raw
+conversations.
+
+    {
+        "_id": "hour:2024-05-17T13",    # or "day:2024-05-17"
+        "granularity": "hour",          # or "day"
+        "start": …,
+        "queries": …,
+        "emergencies": …,
+        "precomputed": …,               # served from the answer cache
+        "sources": [{"source": …, "count": …}, …],
+        "latency_hist": [...],          # counts per LATENCY_BINS_MS bin
+        "latency_sum_ms": …,
+        "latency_count": …,
+    }
+
+Each run recomputes every hour from the last watermark (minus one hour
+for late writes) up to now and overwrites those buckets, so reruns are
+idempotent. Hours in days already archived are read back from the
+cold archive. --rebuild recomputes everything, cold archive included,
+and only then drops buckets outside the rebuilt range.
+
+Run: python -m app.services.usage_rollups [--rebuild]
+"""
+
+import logging
+import argparse
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta
+
+from pymongo import ReplaceOne
+
+from app.db import async_mongo
+from app.db.mongo import conversations_collection, metrics_collection, usage_rollups_collection
+from app.jobs.conversation_archive import archived_until, iter_archived
+from app.jobs.scheduler import log
+
+STATE_ID = "usage_rollup"
+LATE_WRITES = timedelta(hours=1)
+BATCH_SIZE = 1000
+
+# Upper bounds of the latency histogram bins; the last bin is open-ended
+LATENCY_BINS_MS = [100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000]
+
+ROLLUP_FIELDS = {
+    "_id": 0, "created_at": 1, "emergency": 1, "pipeline": 1,
+    "sources": 1, "latency_ms": 1,
+}
+
+
+def _hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _empty_bucket():
+    return {
+        "queries": 0,
+        "emergencies": 0,
+        "precomputed": 0,
+        "sources": Counter(),
+        "latency_hist": [0] * (len(LATENCY_BINS_MS) + 1),
+        "latency_sum_ms": 0.0,
+        "latency_count": 0,
+    }
+
+
+# =============================
+# ACCUMULATE
+# =============================
+def _add_record(bucket, doc):
+    bucket["queries"] += 1
+    bucket["emergencies"] += int(bool(doc.get("emergency")))
+    bucket["precomputed"] += int(doc.get("pipeline") == "precomputed_answer")
+    bucket["sources"].update(doc.get("sources") or [])
+
+    latency = doc.get("latency_ms")
+    if latency is not None:
+        bucket["latency_hist"][bisect_left(LATENCY_BINS_MS, latency)] += 1
+        bucket["latency_sum_ms"] += latency
+        bucket["latency_count"] += 1
+
+
+def _merge(bucket, other):
+    for key in ("queries", "emergencies", "precomputed", "latency_sum_ms", "latency_count"):
+        bucket[key] += other[key]
+    bucket["sources"].update(other["sources"])
+    bucket["latency_hist"] = [a + b for a, b in zip(bucket["latency_hist"], other["latency_hist"])]
+
+
+def _hourly(docs) -> dict:
+    hours = {}
+    for doc in docs:
+        _add_record(hours.setdefault(_hour(doc["created_at"]), _empty_bucket()), doc)
+    return hours
+
+
+def _to_doc(granularity: str, start: datetime, bucket) -> dict:
+    key = f"{start:%Y-%m-%dT%H}" if granularity == "hour" else f"{start:%Y-%m-%d}"
+    return {
+        "_id": f"{granularity}:{key}",
+        "granularity": granularity,
+        "start": start,
+        **bucket,
+        "sources": [
+            {"source": source, "count": count}
+            for source, count in bucket["sources"].most_common()
+        ],
+    }
+
+
+def _from_doc(doc) -> dict:
+    bucket = _empty_bucket()
+    _merge(bucket, {
+        **{key: doc.get(key, 0) for key in
+           ("queries", "emergencies", "precomputed", "latency_sum_ms", "latency_count")},
+        "sources": Counter({row["source"]: row["count"] for row in doc.get("sources", [])}),
+        "latency_hist": doc.get("latency_hist") or bucket["latency_hist"],
+    })
+    return bucket
+
+
+# =============================
+# WRITE
+# =============================
+def _write_hours(hours: dict, since: datetime, until: datetime):
+    """Overwrites every hour bucket in [since, until), empty ones included."""
+    ops = []
+    hour = since
+    while hour < until:
+        doc = _to_doc("hour", hour, hours.get(hour) or _empty_bucket())
+        ops.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+        hour += timedelta(hours=1)
+
+    if ops:
+        usage_rollups_collection.bulk_write(ops, ordered=False)
+
+
+def _write_days(days):
+    """Rebuilds each day bucket from its (at most 24) hour buckets."""
+    ops = []
+    for day in sorted(days):
+        bucket = _empty_bucket()
+        for doc in usage_rollups_collection.find({
+            "granularity": "hour",
+            "start": {"$gte": day, "$lt": day + timedelta(days=1)},
+        }):
+            _merge(bucket, _from_doc(doc))
+
+        doc = _to_doc("day", day, bucket)
+        ops.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+
+    if ops:
+        usage_rollups_collection.bulk_write(ops, ordered=False)
+
+
+def _hot_records(since: datetime = None):
+    query = {"created_at": {"$gte": since}} if since else {}
+    return conversations_collection.find(query, ROLLUP_FIELDS).batch_size(BATCH_SIZE)
+
+
+def _hours_since(since: datetime = None) -> dict:
+    """
+    Hour buckets from `since` on. Archived days are read from the
+    archive (their hot copies may already be gone), later ones from Mongo.
+    """
+    boundary = archived_until()
+    hours = {}
+
+    if boundary and (since is None or since < boundary):
+        hours = _hourly(iter_archived(since, boundary))
+        since = boundary
+
+    for hour, bucket in _hourly(_hot_records(since)).items():
+        _merge(hours.setdefault(hour, _empty_bucket()), bucket)
+    return hours
+
+
+def rollup(rebuild: bool = False) -> int:
+    """Recomputes the buckets touched since the last run; returns hours written."""
+    until = _hour(datetime.utcnow()) + timedelta(hours=1)
+    state = metrics_collection.find_one({"_id": STATE_ID}) or {}
+    rebuild = rebuild or not state.get("rolled_until")
+
+    if rebuild:
+        hours = _hours_since()
+        since = min(hours) if hours else until - timedelta(hours=1)
+    else:
+        since = state["rolled_until"] - LATE_WRITES
+        hours = _hours_since(since)
+
+    _write_hours(hours, since, until)
+
+    days, day = set(), _day(since)
+    while day < until:
+        days.add(day)
+        day += timedelta(days=1)
+    _write_days(days)
+
+    if rebuild:
+        # Only now that the new buckets are in: drop the ones outside them
+        usage_rollups_collection.delete_many({"$or": [
+            {"granularity": "hour", "start": {"$lt": since}},
+            {"granularity": "day", "start": {"$lt": _day(since)}},
+            {"start": {"$gte": until}},
+        ]})
+
+    # The current (partial) hour is recomputed on the next run
+    metrics_collection.update_one(
+        {"_id": STATE_ID},
+        {"$set": {"rolled_until": until - timedelta(hours=1), "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+    written = int((until - since) / timedelta(hours=1))
+    log.info("Usage rollups: %d hour(s) from %s recomputed", written, f"{since:%Y-%m-%d %H:00}")
+    return written
+
+
+# =============================
+# READ (admin API & dashboard)
+# =============================
+def latency_percentile(hist, q: float):
+    """q-quantile interpolated within its histogram bin; None without data."""
+    total = sum(hist)
+    if not total:
+        return None
+
+    rank, seen = q * total, 0
+    for i, count in enumerate(hist):
+        if count and seen + count >= rank:
+            lower = LATENCY_BINS_MS[i - 1] if i else 0
+            if i == len(LATENCY_BINS_MS):
+                return lower
+            return round(lower + (rank - seen) / count * (LATENCY_BINS_MS[i] - lower))
+        seen += count
+    return None
+
+
+def _summary(start, bucket) -> dict:
+    queries = bucket["queries"]
+    return {
+        "start": start,
+        "queries": queries,
+        "emergencies": bucket["emergencies"],
+        "emergency_rate": round(bucket["emergencies"] / queries, 4) if queries else 0.0,
+        "precomputed": bucket["precomputed"],
+        "avg_latency_ms": (
+            round(bucket["latency_sum_ms"] / bucket["latency_count"], 1)
+            if bucket["latency_count"] else None
+        ),
+        "p95_latency_ms": latency_percentile(bucket["latency_hist"], 0.95),
+    }
+
+
+async def usage_series(granularity: str = "day", periods: int = 30, top_sources: int = 5) -> dict:
+    """The last `periods` hour/day buckets plus totals over the window."""
+    step = timedelta(hours=1) if granularity == "hour" else timedelta(days=1)
+    now = datetime.utcnow()
+    since = (_hour(now) if granularity == "hour" else _day(now)) - step * (periods - 1)
+
+    docs = await (
+        async_mongo.usage_rollups_collection
+        .find({"granularity": granularity, "start": {"$gte": since}}, {"_id": 0})
+        .sort("start", 1)
+        .to_list(periods)
+    )
+    by_start = {doc["start"]: _from_doc(doc) for doc in docs}
+
+    series, total = [], _empty_bucket()
+    for i in range(periods):
+        start = since + step * i
+        bucket = by_start.get(start) or _empty_bucket()
+        _merge(total, bucket)
+        series.append(_summary(start, bucket))
+
+    return {
+        "granularity": granularity,
+        "series": series,
+        "total": {
+            **_summary(since, total),
+            "top_sources": [
+                {"source": source, "count": count}
+                for source, count in total["sources"].most_common(top_sources)
+            ],
+        },
+    }
+
+
+# =============================
+# CLI
+# =============================
+def main():
+    parser = argparse.ArgumentParser(description="Roll up assistant usage")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recompute every bucket, cold archive included")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    rollup(rebuild=args.rebuild)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# app/tests/conftest.py
+"""
+Unit tests; no MongoDB server or embedding model. RAG stores are built
+in a temp directory with a stub encoder (build_store).
+
+The code imports itself as `app` (the image copies backend/ to /app/app).
+From a checkout, `app` is mapped onto this directory's parent. Mongo
+clients connect lazily, so a placeholder MONGO_URL is enough.
+
+Endpoint tests go through app.main with the async collections backed
+by fake_mongo (admin_client).
+
+Run: python -m pytest backend/tests
+"""
+
+import os
+import re
+import sys
+import hashlib
+import importlib.util
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+if "app" not in sys.modules and importlib.util.find_spec("app") is None:
+    spec = importlib.util.spec_from_file_location(
+        "app",
+        os.path.join(BACKEND_DIR, "__init__.py"),
+        submodule_search_locations=[BACKEND_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["app"] = module
+    spec.loader.exec_module(module)
+
+# Only importable once `app` resolves
+from app.rag import retriever  # noqa: E402
+from app.rag.dedup import Deduplicator  # noqa: E402
+from app.rag.store import StoreWriter  # noqa: E402
+from fake_mongo import FakeDatabase  # noqa: E402
+
+STUB_DIM = 64
+
+
+class StubEncoder:
+    """Bag of hashed words: identical texts embed identically, no model needed."""
+
+    name = "stub"
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), STUB_DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[i, int(hashlib.md5(word.encode()).hexdigest(), 16) % STUB_DIM] += 1
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+@pytest.fixture
+def build_store(tmp_path, monkeypatch):
+    """
+    build_store(docs) writes a RAG store (with dedup) from dicts with
+    id / text / source and points the retriever at it.
+    """
+    encoder = StubEncoder()
+
+    def build(docs, threshold: float = 0.97):
+        path = str(tmp_path / "store")
+        with StoreWriter(path, model="stub") as writer:
+            dedup = Deduplicator(writer, threshold)
+            docs = dedup.filter_exact(list(docs))
+            dedup.add(docs, encoder.encode([d["text"] for d in docs]))
+            writer.attributions = dedup.attributions()
+            writer.attributed_rows = dedup.attributed_rows()
+
+        monkeypatch.setattr(retriever, "STORE_PATH", path)
+        monkeypatch.setattr(retriever, "_documents", None)
+        monkeypatch.setattr(retriever.encoder, "get_encoder", lambda: encoder)
+        monkeypatch.setattr(retriever.reranker, "RERANK_ENABLED", False)
+        return path
+
+    return build
+
+
+@pytest.fixture
+def admin_client(tmp_path, monkeypatch):
+    """
+    TestClient on app.main, signed in as an admin, with every async
+    collection in an in-memory FakeDatabase (returned as client.db).
+    The lifespan (Mongo connect, jobs) is not run.
+    """
+    from fastapi.testclient import TestClient
+
+    # Templates and static files resolve against app/frontend in the CWD
+    os.makedirs(tmp_path / "app")
+    os.symlink(os.path.join(os.path.dirname(BACKEND_DIR), "frontend"), tmp_path / "app" / "frontend")
+    monkeypatch.chdir(tmp_path)
+
+    from app.main import app
+    from app.core.dependencies import admin_required
+    from app.db import async_mongo
+
+    db = FakeDatabase(asynchronous=True)
+    monkeypatch.setattr(async_mongo, "_db", db)
+    app.dependency_overrides[admin_required] = lambda: {
+        "email": "admin@example.com", "role": "Admin",
+    }
+
+    client = TestClient(app)
+    client.db = db
+    yield client
+
+    app.dependency_overrides.clear()
@@ -0,0 +1,265 @@
+# app/tests/fake_mongo.py
+"""
+In-memory stand-in for the few pymongo / Motor calls the tested code
+makes: find (sort / limit / batch_size / to_list), find_one, insert,
+update_one ($set, $inc, $max, $setOnInsert, $unset), count_documents,
+delete_many and bulk_write with ReplaceOne. Queries support equality
+and $gt / $gte / $lt / $lte / $in / $nin / $ne / $exists / $or / $and.
+
+    db = FakeDatabase()                  # sync, like app.db.mongo.db
+    db = FakeDatabase(asynchronous=True) # Motor-style awaitables
+"""
+
+import copy
+import itertools
+
+from pymongo.errors import DuplicateKeyError
+
+_ids = itertools.count(1)
+
+_MISSING = object()
+
+
+def _get(doc, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set(doc, path: str, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset(doc, path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part, {})
+    doc.pop(parts[-1], None)
+
+
+def _compare(value, op: str, arg) -> bool:
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if op == "$ne":
+        return value != arg
+    if op == "$in":
+        return value in arg or (isinstance(value, list) and any(v in arg for v in value))
+    if op == "$nin":
+        return not _compare(value, "$in", arg)
+    if value is _MISSING or value is None:
+        return False
+    return {
+        "$gt": lambda: value > arg,
+        "$gte": lambda: value >= arg,
+        "$lt": lambda: value < arg,
+        "$lte": lambda: value <= arg,
+    }[op]()
+
+
+def matches(doc, query) -> bool:
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in cond):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, q) for q in cond):
+                return False
+        else:
+            value = _get(doc, key)
+            if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+                if not all(_compare(value, op, arg) for op, arg in cond.items()):
+                    return False
+            elif isinstance(value, list) and not isinstance(cond, list):
+                if cond not in value:
+                    return False
+            elif (None if value is _MISSING else value) != cond:
+                return False
+    return True
+
+
+def _project(doc, projection):
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+
+    included = {k for k, v in projection.items() if v}
+    if included:
+        keep = included | ({"_id"} if projection.get("_id", 1) else set())
+        return {k: v for k, v in doc.items() if k in keep}
+    return {k: v for k, v in doc.items() if k not in projection}
+
+
+class UpdateResult:
+    def __init__(self, matched: int, modified: int, upserted_id=None):
+        self.matched_count = matched
+        self.modified_count = modified
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted: int):
+        self.deleted_count = deleted
+
+
+class InsertResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+# =============================
+# SYNC
+# =============================
+class FakeCursor:
+    def __init__(self, docs, projection=None):
+        self._docs = docs
+        self._projection = projection
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        keys = [(key, direction or 1)] if isinstance(key, str) else list(key)
+        for field, order in reversed(keys):
+            self._docs.sort(key=lambda d: (_get(d, field) is _MISSING, _get(d, field)),
+                            reverse=order < 0)
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    def _results(self):
+        docs = self._docs[:self._limit] if self._limit else self._docs
+        return [_project(d, self._projection) for d in docs]
+
+    def __iter__(self):
+        return iter(self._results())
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = []
+        for doc in docs:
+            self.insert_one(doc)
+
+    def find(self, query=None, projection=None):
+        return FakeCursor([d for d in self.docs if matches(d, query)], projection)
+
+    def find_one(self, query=None, projection=None, sort=None):
+        cursor = self.find(query, projection)
+        if sort:
+            cursor.sort(sort)
+        return next(iter(cursor.limit(1)), None)
+
+    def count_documents(self, query=None):
+        return sum(1 for d in self.docs if matches(d, query))
+
+    def insert_one(self, doc):
+        doc.setdefault("_id", next(_ids))
+        if any(d["_id"] == doc["_id"] for d in self.docs):
+            raise DuplicateKeyError(f"duplicate _id {doc['_id']}")
+        self.docs.append(copy.deepcopy(doc))
+        return InsertResult(doc["_id"])
+
+    def insert_many(self, docs):
+        for doc in docs:
+            self.insert_one(doc)
+
+    def update_one(self, query, update, upsert: bool = False):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return UpdateResult(0, 0)
+            doc = {k: v for k, v in query.items() if not k.startswith("$")}
+            self._apply(doc, update, inserting=True)
+            self.insert_one(doc)
+            return UpdateResult(0, 0, doc["_id"])
+
+        before = copy.deepcopy(doc)
+        self._apply(doc, update, inserting=False)
+        return UpdateResult(1, int(doc != before))
+
+    @staticmethod
+    def _apply(doc, update, inserting: bool):
+        for path, value in update.get("$set", {}).items():
+            _set(doc, path, value)
+        for path, value in update.get("$inc", {}).items():
+            current = _get(doc, path)
+            _set(doc, path, (0 if current is _MISSING else current) + value)
+        for path, value in update.get("$max", {}).items():
+            current = _get(doc, path)
+            _set(doc, path, value if current is _MISSING else max(current, value))
+        for path in update.get("$unset", {}):
+            _unset(doc, path)
+        if inserting:
+            for path, value in update.get("$setOnInsert", {}).items():
+                _set(doc, path, value)
+
+    def replace_one(self, query, doc, upsert: bool = False):
+        self.docs = [d for d in self.docs if not matches(d, query)]
+        self.insert_one(doc)
+
+    def delete_many(self, query):
+        kept = [d for d in self.docs if not matches(d, query)]
+        deleted, self.docs = len(self.docs) - len(kept), kept
+        return DeleteResult(deleted)
+
+    def bulk_write(self, ops, ordered: bool = True):
+        for op in ops:
+            self.replace_one(op._filter, op._doc, upsert=op._upsert)
+
+
+# =============================
+# ASYNC (Motor-style)
+# =============================
+class AsyncFakeCursor(FakeCursor):
+    def __aiter__(self):
+        self._iter = iter(self._results())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        results = self._results()
+        return results[:length] if length else results
+
+
+class AsyncFakeCollection(FakeCollection):
+    def find(self, query=None, projection=None):
+        return AsyncFakeCursor([d for d in self.docs if matches(d, query)], projection)
+
+    async def find_one(self, *args, **kwargs):
+        cursor = FakeCollection.find(self, *args[:2])
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        return next(iter(cursor.limit(1)), None)
+
+    async def count_documents(self, query=None):
+        return FakeCollection.count_documents(self, query)
+
+    async def insert_one(self, doc):
+        return FakeCollection.insert_one(self, doc)
+
+    async def update_one(self, *args, **kwargs):
+        return FakeCollection.update_one(self, *args, **kwargs)
+
+
+class FakeDatabase(dict):
+    def __init__(self, asynchronous: bool = False):
+        super().__init__()
+        self._type = AsyncFakeCollection if asynchronous else FakeCollection
+
+    def __missing__(self, name):
+        collection = self[name] = self._type()
+        return collection
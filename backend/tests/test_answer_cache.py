@@ -0,0 +1,94 @@
+import pytest
+
+from app.jobs import popular_questions
+from app.rag import store
+from app.services import answer_cache
+from app.services.llm import UNAVAILABLE_REPLY
+from fake_mongo import FakeCollection
+
+DOCS = [{"id": "d0", "text": "Q: What is flu\nA: A virus", "source": "MedQuAD"}]
+
+
+@pytest.fixture
+def answers(build_store, monkeypatch):
+    """Precomputed answers collection (fake) for a freshly built store."""
+    monkeypatch.setattr(store, "STORE_PATH", build_store(DOCS))
+    collection = FakeCollection()
+    monkeypatch.setattr(answer_cache, "precomputed_answers_collection", collection)
+    monkeypatch.setattr(popular_questions, "precomputed_answers_collection", collection)
+    monkeypatch.setattr(answer_cache, "_table", {})
+    return collection
+
+
+def entry(key, version, reply="cached reply"):
+    return {"key": key, "version": version, "reply": reply,
+            "sources": ["MedQuAD"], "retrieval": {"k": 1}}
+
+
+def test_normalized_questions_share_a_key():
+    assert answer_cache.normalize_question("  What is FLU?? ") == "what is flu"
+    assert answer_cache.normalize_question("what-is  flu") == "what is flu"
+
+
+def test_lookup_serves_only_the_current_version(answers):
+    version = answer_cache.current_version()
+    answers.insert_many([
+        entry("what is flu", version),
+        entry("what is gout", "older-store|older-model"),
+    ])
+
+    assert answer_cache.reload() == 1
+    assert answer_cache.lookup("What is flu?")["reply"] == "cached reply"
+    assert answer_cache.lookup("What is gout?") is None
+
+
+def test_rebuilt_store_invalidates_every_entry(answers, build_store, monkeypatch):
+    answers.insert_one(entry("what is flu", answer_cache.current_version()))
+    answer_cache.reload()
+
+    meta = store.read_meta(store.STORE_PATH)
+    monkeypatch.setattr(store, "read_meta", lambda path: {**meta, "built_at": "later"})
+
+    assert answer_cache.reload() == 0
+    assert answer_cache.lookup("what is flu") is None
+
+
+def test_missing_store_empties_the_table(answers, monkeypatch):
+    answers.insert_one(entry("what is flu", answer_cache.current_version()))
+    answer_cache.reload()
+
+    monkeypatch.setattr(store, "STORE_PATH", "/nonexistent/store")
+
+    assert answer_cache.reload() == 0
+
+
+def test_precompute_answers_new_questions_and_drops_stale_ones(answers, monkeypatch):
+    version = answer_cache.current_version()
+    answers.insert_many([
+        entry("what is flu", version, reply="kept"),
+        entry("what is gout", version),                    # fell out of the top
+        entry("what is a cold", "older-store|older-model"),
+    ])
+    monkeypatch.setattr(popular_questions, "popular_questions", lambda *args: [
+        ("what is flu", "What is flu?", 9),
+        ("what is a cold", "What is a cold?", 5),
+        ("what is asthma", "What is asthma?", 4),
+    ])
+
+    def retrieve(question, trace):
+        trace.update({"k": 1})
+        return "context", ["MedQuAD"]
+
+    monkeypatch.setattr(popular_questions, "retrieve_context", retrieve)
+    monkeypatch.setattr(popular_questions, "generate_response", lambda prompt: (
+        UNAVAILABLE_REPLY if "asthma" in prompt else "fresh"
+    ))
+
+    popular_questions.precompute()
+
+    assert {(e["key"], e["reply"]) for e in answers.docs} == {
+        ("what is flu", "kept"), ("what is a cold", "fresh"),
+    }
+    assert {e["version"] for e in answers.docs} == {version}
+    assert answer_cache.lookup("What is a cold")["reply"] == "fresh"
+    assert answer_cache.lookup("what is asthma") is None  # failures are never cached
@@ -0,0 +1,42 @@
+import pytest
+
+from app.core.dependencies import get_current_user
+from app.services import answer_cache
+
+CACHED = {
+    "reply": "Flu is a viral infection.",
+    "sources": ["MedQuAD"],
+    "retrieval": {
+        "k": 2, "top_score": 0.81, "sources": None,
+        "rerank": {"fired": True, "completed": True, "ms": 42.0, "scored": 8},
+    },
+}
+
+
+@pytest.fixture
+def chat(admin_client):
+    admin_client.app.dependency_overrides[get_current_user] = lambda: "alice@example.com"
+
+    def post(message, **payload):
+        response = admin_client.post("/api/assistant/chat", json={"message": message, **payload})
+        assert response.status_code == 200, response.text
+        return response.json(), admin_client.db["conversations"].docs[-1]
+
+    return post
+
+
+def test_cached_answer_audit_drops_stale_rerank_timings(chat, monkeypatch):
+    monkeypatch.setattr(answer_cache, "lookup", lambda message: CACHED)
+
+    def no_rag(*args):
+        raise AssertionError("cached answer went through RAG")
+
+    from app.modules.assistant import router as assistant
+    monkeypatch.setattr(assistant, "answer", no_rag)
+
+    body, record = chat("What is flu?")
+
+    assert body["reply"] == CACHED["reply"]
+    assert record["pipeline"] == "precomputed_answer"
+    assert record["retrieval"] == {"k": 2, "top_score": 0.81, "sources": None, "cached": True}
+    assert "rerank" in CACHED["retrieval"]  # the cache entry itself is untouched
@@ -0,0 +1,99 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.jobs import conversation_archive as archive
+from fake_mongo import FakeCollection
+
+TODAY = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def conversation(days_ago: int, hour: int, user: str = "alice@example.com"):
+    return {
+        "_id": ObjectId(),
+        "user_email": user,
+        "question": f"question {days_ago}/{hour}",
+        "created_at": TODAY - timedelta(days=days_ago) + timedelta(hours=hour),
+        "retrieval": {"k": 2, "sources": None},
+    }
+
+
+@pytest.fixture
+def hot(tmp_path, monkeypatch):
+    """Fake hot collection with conversations 5, 4 and 1 days old; archive under tmp_path."""
+    conversations = FakeCollection([
+        conversation(5, 9), conversation(5, 13, "bob@example.com"),
+        conversation(4, 10),
+        conversation(1, 8),
+    ])
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(archive, "conversations_collection", conversations)
+    monkeypatch.setattr(archive, "metrics_collection", FakeCollection())
+    return conversations
+
+
+def test_archive_round_trip_restores_the_documents(hot):
+    assert archive.archive(after_days=2) == 3
+
+    assert archive.archived_days() == [TODAY - timedelta(days=5), TODAY - timedelta(days=4)]
+    assert archive.archived_until() == TODAY - timedelta(days=3)
+
+    restored = list(archive.iter_archived())
+    expected = sorted(
+        (d for d in hot.docs if d["created_at"] < TODAY - timedelta(days=2)),
+        key=lambda d: d["created_at"],
+    )
+    assert restored == expected
+    assert isinstance(restored[0]["_id"], ObjectId)
+    assert isinstance(restored[0]["created_at"], datetime)
+
+
+def test_rerun_is_a_no_op(hot):
+    archive.archive(after_days=2)
+    files = {day: open(archive.day_path(day), "rb").read() for day in archive.archived_days()}
+
+    assert archive.archive(after_days=2) == 0
+    assert {day: open(archive.day_path(day), "rb").read() for day in archive.archived_days()} == files
+
+
+def test_iter_archived_filters_by_window_and_user(hot):
+    archive.archive(after_days=2)
+    day5 = TODAY - timedelta(days=5)
+
+    in_window = list(archive.iter_archived(day5 + timedelta(hours=10), day5 + timedelta(days=2)))
+    assert [d["created_at"].hour for d in in_window] == [13, 10]
+
+    assert [d["user_email"] for d in archive.iter_archived(user="bob@example.com")] == [
+        "bob@example.com"
+    ]
+
+
+def test_archived_count_uses_recorded_counts_and_backfills_missing_ones(hot):
+    archive.archive(after_days=2)
+    assert archive.archived_count() == 3
+
+    archive.metrics_collection.delete_many({})
+    assert archive.archived_count() == 3
+    assert archive.metrics_collection.find_one({"_id": archive.COUNTS_ID})["days"] == {
+        f"{TODAY - timedelta(days=5):%Y-%m-%d}": 2,
+        f"{TODAY - timedelta(days=4):%Y-%m-%d}": 1,
+    }
+
+
+def test_export_with_archive_lists_each_conversation_once(hot, admin_client):
+    archive.archive(after_days=2)
+
+    # The TTL already removed day -5; day -4 is archived but still hot
+    still_hot = [d for d in hot.docs if d["created_at"] >= TODAY - timedelta(days=4)]
+    admin_client.db["conversations"].docs.extend(still_hot)
+
+    response = admin_client.get(
+        "/api/admin/export/conversations", params={"include_archive": "true"}
+    )
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["question"] for r in rows] == [
+        "question 5/9", "question 5/13", "question 4/10", "question 1/8",
+    ]
@@ -0,0 +1,107 @@
+import numpy as np
+
+from app.rag.dedup import Deduplicator, exact_key
+
+
+class MemoryWriter:
+    """The part of StoreWriter the Deduplicator uses."""
+
+    def __init__(self, dim: int = 32):
+        self.docs = []
+        self.rows = np.zeros((0, dim), dtype=np.float32)
+
+    def append(self, docs, embeddings):
+        self.docs.extend(docs)
+        self.rows = np.vstack([self.rows, np.asarray(embeddings, dtype=np.float32)])
+
+    def written_embeddings(self):
+        return self.rows
+
+
+def doc(doc_id, text, source="test"):
+    return {"id": doc_id, "text": text, "source": source}
+
+
+def unit(rng, n, dim=32):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_exact_key_ignores_case_punctuation_and_spacing():
+    assert exact_key("What is  Diabetes?") == exact_key("what is diabetes")
+    assert exact_key("What is diabetes?") != exact_key("What is asthma?")
+
+
+def test_exact_repeats_are_attributed_not_embedded():
+    dedup = Deduplicator(MemoryWriter())
+
+    remaining = dedup.filter_exact([
+        doc("a", "What is diabetes?"),
+        doc("b", "what is DIABETES", source="other"),
+        doc("c", "What is asthma?"),
+    ])
+
+    assert [d["id"] for d in remaining] == ["a", "c"]
+    assert dedup.exact_hits == 1
+
+    dedup.add(remaining, unit(np.random.default_rng(0), 2))
+    assert dedup.attributions() == {
+        "a": [{"id": "a", "source": "test"}, {"id": "b", "source": "other"}],
+    }
+
+
+def test_near_duplicates_collapse_into_the_first_document():
+    rng = np.random.default_rng(1)
+    writer = MemoryWriter()
+    dedup = Deduplicator(writer, threshold=0.97)
+
+    base = unit(rng, 50)
+    docs = [doc(f"d{i}", f"text {i}") for i in range(50)]
+    dedup.add(dedup.filter_exact(docs), base)
+
+    near = base[7] + 0.05 * unit(rng, 1)[0]
+    dedup.add(dedup.filter_exact([doc("n", "reworded text 7")]), near[None, :])
+
+    assert len(writer.docs) == 50
+    assert dedup.near_hits == 1
+    assert [m["id"] for m in dedup.attributions()["d7"]] == ["d7", "n"]
+
+
+def test_near_duplicates_inside_one_batch():
+    rng = np.random.default_rng(2)
+    writer = MemoryWriter()
+    dedup = Deduplicator(writer, threshold=0.97)
+
+    first = unit(rng, 1)[0]
+    batch = np.stack([first, first + 0.01 * unit(rng, 1)[0], unit(rng, 1)[0]])
+    docs = [doc("x", "one"), doc("y", "two"), doc("z", "three")]
+    dedup.add(dedup.filter_exact(docs), batch)
+
+    assert [d["id"] for d in writer.docs] == ["x", "z"]
+    assert [m["id"] for m in dedup.attributions()["x"]] == ["x", "y"]
+
+
+def test_threshold_of_one_disables_the_near_stage():
+    rng = np.random.default_rng(3)
+    writer = MemoryWriter()
+    dedup = Deduplicator(writer, threshold=1.0)
+
+    vector = unit(rng, 1)
+    dedup.add(dedup.filter_exact([doc("a", "one")]), vector)
+    dedup.add(dedup.filter_exact([doc("b", "two")]), vector)
+
+    assert len(writer.docs) == 2
+    assert dedup.near_hits == 0
+
+
+def test_distinct_documents_are_all_kept():
+    rng = np.random.default_rng(4)
+    writer = MemoryWriter(dim=64)
+    dedup = Deduplicator(writer, threshold=0.97)
+
+    for start in range(0, 400, 100):
+        docs = [doc(f"d{i}", f"text {i}") for i in range(start, start + 100)]
+        dedup.add(dedup.filter_exact(docs), unit(rng, 100, dim=64))
+
+    assert len(writer.docs) == 400
+    assert dedup.attributions() == {}
@@ -0,0 +1,56 @@
+import os
+import importlib.util
+
+import numpy as np
+import pytest
+
+from app.rag import encoder, store
+from app.rag.store import StoreWriter
+from conftest import StubEncoder
+
+TEXTS = [f"Q: What is condition {i}\nA: A disease of organ {i % 7}" for i in range(30)]
+
+
+@pytest.fixture
+def stub_store(tmp_path):
+    """A store whose vectors come from StubEncoder, labelled with the real model."""
+    path = str(tmp_path / "store")
+    with StoreWriter(path, model=encoder.EMBED_MODEL) as writer:
+        docs = [{"id": f"d{i}", "text": t, "source": "MedQuAD"} for i, t in enumerate(TEXTS)]
+        writer.append(docs, StubEncoder().encode(TEXTS))
+    return path
+
+
+class NoisyEncoder(StubEncoder):
+    def encode(self, texts):
+        vectors = super().encode(texts)
+        noise = np.random.default_rng(1).normal(0, 0.2, vectors.shape)
+        return encoder._normalize(vectors + noise)
+
+
+def test_matching_encoder_passes(stub_store):
+    assert encoder.verify(stub_store, samples=10, candidate=StubEncoder())
+
+
+def test_drifting_encoder_fails(stub_store):
+    assert not encoder.verify(stub_store, samples=10, candidate=NoisyEncoder())
+
+
+def test_store_from_another_model_fails(build_store):
+    path = build_store([{"id": "d0", "text": TEXTS[0], "source": "MedQuAD"}])
+
+    assert not encoder.verify(path, candidate=StubEncoder())
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("onnxruntime") is None
+    or not os.path.exists(os.path.join(encoder.ONNX_PATH, encoder.MODEL_FILE))
+    or not store.exists(store.STORE_PATH),
+    reason="exported ONNX model or RAG store not available",
+)
+@pytest.mark.parametrize("quantized", [False, True])
+def test_onnx_model_matches_the_stored_vectors(quantized):
+    if quantized and not os.path.exists(os.path.join(encoder.ONNX_PATH, encoder.QUANTIZED_FILE)):
+        pytest.skip("no int8 model exported")
+
+    assert encoder.verify(samples=200, quantized=quantized)
@@ -0,0 +1,80 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+from app.services import exports
+
+T0 = datetime(2024, 5, 17, 9, 0)
+
+
+def _conversations(db, count: int):
+    for i in range(count):
+        db["conversations"].docs.append({
+            "_id": f"c{i:04d}",
+            "created_at": T0 + timedelta(minutes=count - i),  # stored newest first
+            "user_email": "alice@example.com" if i % 2 else "bob@example.com",
+            "question": f"question {i}",
+            "reply": f"reply {i}",
+            "sources": ["MedQuAD"],
+            "emergency": False,
+        })
+
+
+def test_ndjson_export_streams_every_row_oldest_first(admin_client, monkeypatch):
+    # Several encoded chunks, so the response really is streamed
+    monkeypatch.setattr(exports, "CHUNK_BYTES", 256)
+    _conversations(admin_client.db, 50)
+
+    response = admin_client.get("/api/admin/export/conversations")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "conversations_" in response.headers["content-disposition"]
+    assert response.headers["cache-control"] == "no-store"
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 50
+    assert [r["_id"] for r in rows] == [f"c{i:04d}" for i in reversed(range(50))]
+
+
+def test_csv_export_filters_by_user_and_window(admin_client):
+    _conversations(admin_client.db, 10)
+
+    response = admin_client.get("/api/admin/export/conversations", params={
+        "format": "csv",
+        "user": " Alice@Example.com ",
+        "start": (T0 + timedelta(minutes=3)).isoformat(),
+        "end": (T0 + timedelta(minutes=8)).isoformat(),
+    })
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == exports.EXPORTS["conversations"]["columns"]
+    # minutes 3..7 → i = 7, 5, 3 for alice (odd i), oldest first
+    assert [r["_id"] for r in rows] == ["c0007", "c0005", "c0003"]
+    assert {r["user_email"] for r in rows} == {"alice@example.com"}
+    assert rows[0]["sources"] == '["MedQuAD"]'
+
+
+def test_gzip_export_is_a_gz_attachment(admin_client):
+    _conversations(admin_client.db, 5)
+
+    response = admin_client.get(
+        "/api/admin/export/conversations", params={"gzip": "true"}
+    )
+
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.ndjson.gz"')
+    lines = gzip.decompress(response.content).decode().splitlines()
+    assert len(lines) == 5
+
+
+def test_export_rejects_empty_window_and_unknown_dataset(admin_client):
+    response = admin_client.get("/api/admin/export/conversations", params={
+        "start": T0.isoformat(), "end": T0.isoformat(),
+    })
+    assert response.status_code == 400
+
+    assert admin_client.get("/api/admin/export/users").status_code == 422
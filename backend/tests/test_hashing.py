@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import hashing
+
+
+@pytest.fixture(autouse=True)
+def fresh_executor():
+    hashing.shutdown()
+    yield
+    hashing.shutdown()
+
+
+def test_calls_beyond_the_queue_limit_are_rejected(monkeypatch):
+    monkeypatch.setattr(hashing, "HASH_QUEUE_LIMIT", 2)
+    release = threading.Event()
+
+    def slow(value):
+        release.wait(5)
+        return value
+
+    async def burst():
+        running = [asyncio.ensure_future(hashing._run(slow, i)) for i in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(hashing.HashingBusy):
+            await hashing._run(slow, 99)
+
+        release.set()
+        return await asyncio.gather(*running)
+
+    assert asyncio.run(burst()) == [0, 1]
+    assert hashing._pending == 0
+
+
+def test_slots_are_released_on_errors(monkeypatch):
+    monkeypatch.setattr(hashing, "HASH_QUEUE_LIMIT", 1)
+
+    def broken():
+        raise RuntimeError("boom")
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await hashing._run(broken)
+        return await hashing._run(len, "ok")
+
+    assert asyncio.run(run()) == 2
+    assert hashing._pending == 0
+
+
+def test_async_wrappers_round_trip():
+    async def run():
+        hashed = await hashing.hash_password_async("Secret@1")
+        return (
+            await hashing.verify_password_async("Secret@1", hashed),
+            await hashing.verify_password_async("wrong", hashed),
+        )
+
+    assert asyncio.run(run()) == (True, False)
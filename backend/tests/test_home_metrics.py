@@ -0,0 +1,28 @@
+from app.modules.home.service import RECENT_REPORTS, user_metrics_from, user_metrics_pipeline
+
+
+def facets(pipeline):
+    return next(stage["$facet"] for stage in pipeline if "$facet" in stage)
+
+
+def test_report_rows_are_bounded_like_recent_activity():
+    reports = facets(user_metrics_pipeline("a@example.com"))["reports"]
+
+    assert {"$limit": RECENT_REPORTS} in reports
+    assert reports.index({"$sort": {"created_at": -1}}) < reports.index({"$limit": RECENT_REPORTS})
+
+
+def test_counts_cover_every_report_not_just_the_listed_ones():
+    doc = {
+        "by_status": [{"_id": "Analyzed", "count": 40}, {"_id": "Pending", "count": 2}],
+        "reports": [{"report_id": f"R{i}"} for i in range(RECENT_REPORTS)],
+    }
+
+    result = user_metrics_from(doc)
+
+    assert len(result["my_reports"]) == RECENT_REPORTS
+    assert (result["my_reports_count"], result["my_pending_reports"]) == (42, 2)
+
+
+def test_without_reports_only_counts_are_computed():
+    assert list(facets(user_metrics_pipeline("a@example.com", with_reports=False))) == ["by_status"]
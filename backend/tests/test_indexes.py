@@ -0,0 +1,108 @@
+import pytest
+from pymongo import DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.db import indexes
+
+
+class IndexedCollection:
+    """Index bookkeeping with MongoDB's conflict rule: same name, other options → 85."""
+
+    def __init__(self):
+        self.indexes = {}
+
+    def index_information(self):
+        return {name: dict(info) for name, info in self.indexes.items()}
+
+    def create_indexes(self, models):
+        for model in models:
+            spec = model.document
+            current = self.indexes.get(spec["name"])
+            if current is not None and current != self._info(spec):
+                raise OperationFailure(f"Index {spec['name']} exists with different options",
+                                       code=indexes.INDEX_OPTIONS_CONFLICT)
+        for model in models:
+            self.indexes[model.document["name"]] = self._info(model.document)
+        return [model.document["name"] for model in models]
+
+    def drop_index(self, name):
+        del self.indexes[name]
+
+    @staticmethod
+    def _info(spec):
+        return {"key": list(spec["key"].items()),
+                **{k: v for k, v in spec.items() if k not in ("key", "name")}}
+
+
+class IndexedDatabase(dict):
+    def __missing__(self, name):
+        collection = self[name] = IndexedCollection()
+        return collection
+
+    def command(self, name, collection, index):
+        assert name == "collMod"
+        self[collection].indexes[index["name"]]["expireAfterSeconds"] = index["expireAfterSeconds"]
+
+
+def conversations_ttl(days):
+    return {"conversations": [
+        IndexModel([("created_at", DESCENDING)], name="created_at", **indexes._ttl(days)),
+    ]}
+
+
+@pytest.fixture
+def database():
+    return IndexedDatabase()
+
+
+def ttl_days(database):
+    seconds = database["conversations"].indexes["created_at"].get("expireAfterSeconds")
+    return seconds // 86400 if seconds is not None else None
+
+
+def test_registry_is_applied_and_idempotent(database):
+    total = sum(len(models) for models in indexes.INDEXES.values())
+
+    assert indexes.ensure_indexes(database) == total
+    assert indexes.ensure_indexes(database) == total
+    assert database["users"].indexes["email_unique"]["unique"] is True
+
+
+def test_every_query_shape_has_a_registered_collection():
+    assert {collection for collection, _, _ in indexes.QUERY_SHAPES} <= set(indexes.INDEXES)
+
+
+def test_changed_retention_is_applied_in_place(database, monkeypatch):
+    monkeypatch.setattr(indexes, "INDEXES", conversations_ttl(30))
+    indexes.ensure_indexes(database)
+
+    monkeypatch.setattr(indexes, "INDEXES", conversations_ttl(90))
+    indexes.ensure_indexes(database)
+
+    assert ttl_days(database) == 90
+
+
+def test_retention_back_to_zero_removes_the_ttl(database, monkeypatch):
+    monkeypatch.setattr(indexes, "INDEXES", conversations_ttl(30))
+    indexes.ensure_indexes(database)
+
+    monkeypatch.setattr(indexes, "INDEXES", conversations_ttl(0))
+    indexes.ensure_indexes(database)
+
+    assert "created_at" in database["conversations"].indexes
+    assert ttl_days(database) is None
+
+
+def test_other_conflicts_are_reported_not_fatal(database, monkeypatch, capsys):
+    database["users"].indexes["email_unique"] = {"key": [("email", 1)]}  # not unique
+    monkeypatch.setattr(indexes, "INDEXES", {"users": indexes.INDEXES["users"]})
+
+    indexes.ensure_indexes(database)
+
+    assert "Index setup failed on users" in capsys.readouterr().out
+
+
+def test_stages_walk_the_sbe_query_plan():
+    plan = {"queryPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}
+
+    assert set(indexes._stages(plan)) == {"FETCH", "IXSCAN"}
@@ -0,0 +1,146 @@
+import io
+import json
+from itertools import islice
+
+import pytest
+
+from app.rag import ingest
+from app.rag.sources import SourceLoader, manifest_key, parse_medquad
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """A registered "test" source reading MedQuAD-style CSV files under tmp_path."""
+    monkeypatch.setattr(ingest, "BASE_DATA_PATH", str(tmp_path))
+    monkeypatch.setattr("app.rag.sources.BASE_DATA_PATH", str(tmp_path))
+
+    def write(name, rows):
+        path = tmp_path / name
+        path.write_text(
+            "question,answer\n" + "".join(f"{q},{a}\n" for q, a in rows),
+            encoding="utf-8",
+        )
+        return path
+
+    def files():
+        for path in sorted(tmp_path.glob("*.csv")):
+            yield manifest_key(str(path)), str(path)
+
+    loader = SourceLoader("test", files, parse_medquad)
+    monkeypatch.setitem(ingest.LOADERS, "test", loader)
+    return write, loader
+
+
+def scan(previous, loader):
+    spool = io.StringIO()
+    manifest, keep, added, parsed = ingest.scan_sources(previous, spool, [loader], workers=1)
+    spooled = [json.loads(line)["id"] for line in spool.getvalue().splitlines()]
+    return manifest, keep, added, spooled
+
+
+def test_first_run_spools_everything(corpus):
+    write, loader = corpus
+    write("a.csv", [("What is flu", "A virus"), ("What is a cold", "Also a virus")])
+
+    manifest, keep, added, spooled = scan(None, loader)
+
+    assert added == 2 and len(spooled) == 2 and not keep
+    assert manifest["files"]["a.csv"]["source"] == "test"
+    assert set(manifest["documents"]) == set(spooled)
+
+
+def test_unchanged_files_are_kept_without_parsing(corpus):
+    write, loader = corpus
+    write("a.csv", [("What is flu", "A virus")])
+    previous, _, _, _ = scan(None, loader)
+
+    manifest, keep, added, spooled = scan(previous, loader)
+
+    assert added == 0 and not spooled
+    assert keep == set(previous["documents"])
+    assert manifest == previous
+
+
+def test_only_changed_documents_are_spooled(corpus):
+    write, loader = corpus
+    write("a.csv", [("What is flu", "A virus"), ("What is a cold", "Also a virus")])
+    previous, _, _, _ = scan(None, loader)
+
+    write("a.csv", [("What is flu", "An influenza virus"), ("What is a cold", "Also a virus")])
+    manifest, keep, added, spooled = scan(previous, loader)
+
+    assert added == 1 and len(keep) == 1
+    assert manifest["documents"][spooled[0]] != previous["documents"][spooled[0]]
+
+
+def test_removed_files_drop_their_documents(corpus, tmp_path):
+    write, loader = corpus
+    write("a.csv", [("What is flu", "A virus")])
+    write("b.csv", [("What is gout", "A kind of arthritis")])
+    previous, _, _, _ = scan(None, loader)
+
+    (tmp_path / "b.csv").unlink()
+    manifest, keep, added, _ = scan(previous, loader)
+
+    assert list(manifest["files"]) == ["a.csv"]
+    assert len(manifest["documents"]) == 1 and added == 0
+
+
+def test_unselected_sources_are_carried_over(corpus):
+    write, loader = corpus
+    write("a.csv", [("What is flu", "A virus")])
+    previous, _, _, _ = scan(None, loader)
+    previous["files"]["other/x.xml"] = {"source": "other", "sha1": "0", "docs": ["x1"]}
+    previous["documents"]["x1"] = "hash"
+
+    manifest, keep, _, _ = scan(previous, loader)
+
+    assert manifest["files"]["other/x.xml"]["source"] == "other"
+    assert "x1" in keep
+
+
+def test_legacy_entries_without_source_are_not_carried_over(corpus):
+    write, loader = corpus
+    write("a.csv", [("What is flu", "A virus")])
+    previous, _, _, _ = scan(None, loader)
+    previous["files"]["old/x.xml"] = {"sha1": "0", "docs": ["x1"]}
+    previous["documents"]["x1"] = "hash"
+
+    manifest, keep, _, _ = scan(previous, loader)
+
+    assert "old/x.xml" not in manifest["files"]
+    assert "x1" not in keep and "x1" not in manifest["documents"]
+
+
+def test_large_files_stream_in_process(corpus, monkeypatch):
+    write, loader = corpus
+    write("a.csv", [("What is flu", "A virus"), ("What is a cold", "Also a virus")])
+    expected = scan(None, loader)
+
+    monkeypatch.setattr(ingest, "LARGE_FILE_BYTES", 0)
+
+    def no_worker(job):
+        raise AssertionError("large file sent to a worker")
+
+    monkeypatch.setattr(ingest, "read_source_file", no_worker)
+
+    assert scan(None, loader) == expected
+
+
+def test_large_file_failing_mid_stream_spools_nothing(corpus, monkeypatch):
+    write, loader = corpus
+    write("a.csv", [("What is flu", "A virus")])
+    previous, _, _, _ = scan(None, loader)
+    write("a.csv", [("What is flu", "A new virus"), ("What is a cold", "Also a virus")])
+
+    def broken(path):
+        yield from islice(parse_medquad(path), 1)
+        raise ValueError("truncated file")
+
+    monkeypatch.setattr(ingest, "LARGE_FILE_BYTES", 0)
+    monkeypatch.setattr(loader, "parse", broken)
+
+    manifest, keep, added, spooled = scan(previous, loader)
+
+    assert added == 0 and not spooled
+    assert manifest == previous and keep == set(previous["documents"])
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.services import retriever
+from app.services.retriever import KnowledgeIndex
+from fake_mongo import FakeCollection
+
+T0 = datetime(2024, 5, 17)
+DIM = 8
+
+
+def vector(seed: int):
+    return np.random.default_rng(seed).normal(size=DIM).tolist()
+
+
+def doc(i: int, minutes: int = 0, **fields):
+    return {"_id": f"k{i}", "content": f"doc {i}", "embedding": vector(i),
+            "updated_at": T0 + timedelta(minutes=minutes), **fields}
+
+
+@pytest.fixture
+def knowledge():
+    return FakeCollection(doc(i) for i in range(40))
+
+
+def brute_force(collection, query, top_k):
+    live = [d for d in collection.docs if not d.get("deleted")]
+    scores = [float(np.dot(retriever._normalize(d["embedding"]), retriever._normalize(query)))
+              for d in live]
+    order = np.argsort(scores)[::-1][:top_k]
+    return [live[i]["content"] for i in order]
+
+
+def assert_consistent(index, collection):
+    live = {d["_id"]: d for d in collection.docs if not d.get("deleted")}
+    assert set(index._rows) == set(live) and len(index) == len(live)
+    for doc_id, row in index._rows.items():
+        assert index._ids[row] == doc_id
+        assert index._contents[row] == live[doc_id]["content"]
+        np.testing.assert_allclose(index._matrix[row], retriever._normalize(live[doc_id]["embedding"]),
+                                   rtol=1e-6)
+
+
+def test_full_sync_searches_like_brute_force(knowledge):
+    index = KnowledgeIndex(knowledge)
+    index.full_sync()
+
+    assert len(index) == 40 and len(index._matrix) == 64  # grown by doubling
+    query = vector(1000)
+    assert [c for _, c in index.search(query, 5)] == brute_force(knowledge, query, 5)
+
+
+def test_poll_applies_updates_inserts_and_soft_deletes(knowledge):
+    index = KnowledgeIndex(knowledge)
+    index.full_sync()
+
+    knowledge.update_one({"_id": "k3"}, {"$set": {
+        "content": "doc 3 v2", "embedding": vector(300), "updated_at": T0 + timedelta(minutes=1),
+    }})
+    knowledge.update_one({"_id": "k5"}, {"$set": {
+        "deleted": True, "updated_at": T0 + timedelta(minutes=2),
+    }})
+    knowledge.insert_one(doc(99, minutes=3))
+    index.poll()
+
+    assert_consistent(index, knowledge)
+    assert index._watermark == T0 + timedelta(minutes=3)
+    query = vector(300)
+    assert index.search(query, 1)[0][1] == "doc 3 v2"
+    assert [c for _, c in index.search(query, 10)] == brute_force(knowledge, query, 10)
+
+
+def test_removing_rows_keeps_the_matrix_packed(knowledge):
+    index = KnowledgeIndex(knowledge)
+    index.full_sync()
+
+    for i in (0, 39, 17):
+        knowledge.update_one({"_id": f"k{i}"}, {"$set": {"deleted": True, "updated_at": T0}})
+    index.poll()
+
+    assert_consistent(index, knowledge)
+    assert sorted(index._rows.values()) == list(range(37))
+
+
+def test_mismatched_dimension_is_skipped(knowledge):
+    knowledge.insert_one({"_id": "bad", "content": "bad", "embedding": [1.0, 0.0], "updated_at": T0})
+    index = KnowledgeIndex(knowledge)
+    index.full_sync()
+
+    assert "bad" not in index._rows and len(index) == 40
+
+
+def test_refresh_polls_only_after_the_interval(knowledge, monkeypatch):
+    monkeypatch.setattr(retriever, "CHANGE_STREAM", False)
+    monkeypatch.setattr(retriever, "REFRESH_SECONDS", 3600)
+    index = KnowledgeIndex(knowledge)
+    index.refresh()
+
+    knowledge.insert_one(doc(99, minutes=1))
+    index.refresh()
+    assert "k99" not in index._rows
+
+    monkeypatch.setattr(retriever, "REFRESH_SECONDS", 0)
+    index.refresh()
+    assert "k99" in index._rows
+
+
+def test_empty_index_returns_nothing():
+    index = KnowledgeIndex(FakeCollection())
+    index.full_sync()
+
+    assert index.search(vector(0), 3) == []
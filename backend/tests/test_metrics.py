@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.db import async_mongo
+from app.services import metrics
+from fake_mongo import FakeCollection, FakeDatabase
+
+COUNTS = {
+    "reports_total": 5,
+    "reports_by_status": {"Analyzed": 3, "Pending": 2},
+    "users_active": 4,
+    "conversations_total": 10,
+}
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    """Fake metrics collection; count_all() returns COUNTS (or .actual)."""
+    collection = FakeCollection()
+    monkeypatch.setattr(metrics, "metrics_collection", collection)
+    monkeypatch.setattr(metrics, "count_all", lambda: collection.actual)
+    collection.actual = COUNTS
+    return collection
+
+
+class AsyncCollection:
+    """Async view of a sync fake, so record_*() and reconcile() share it."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def update_one(self, *args, **kwargs):
+        return self.collection.update_one(*args, **kwargs)
+
+
+def stored(collection):
+    return collection.find_one({"_id": metrics.COUNTERS_ID})
+
+
+def test_reconcile_seeds_missing_counters(counters):
+    metrics.reconcile()
+
+    doc = stored(counters)
+    assert doc["conversations_total"] == 10
+    assert doc["reports_by_status"] == {"Analyzed": 3, "Pending": 2}
+    assert "reconciled_at" in doc
+
+
+def test_reconcile_corrects_drift_by_the_difference(counters):
+    metrics.reconcile()
+    counters.update_one({"_id": metrics.COUNTERS_ID}, {"$inc": {
+        "users_active": 2, "reports_by_status.Failed": 1,
+    }})
+
+    metrics.reconcile()
+
+    doc = stored(counters)
+    assert doc["users_active"] == 4
+    assert doc["reports_by_status"] == {"Analyzed": 3, "Pending": 2, "Failed": 0}
+
+
+def test_reconcile_keeps_increments_that_land_while_counting(counters, monkeypatch):
+    metrics.reconcile()
+
+    def busy_count():
+        # 12 conversations counted, then two more recorded before the correction
+        for _ in range(2):
+            asyncio.run(metrics.record_conversation())
+        return {**COUNTS, "conversations_total": 12}
+
+    monkeypatch.setattr(async_mongo, "_db", {"metrics": AsyncCollection(counters)})
+    monkeypatch.setattr(metrics, "count_all", busy_count)
+    metrics.reconcile()
+
+    assert stored(counters)["conversations_total"] == 14
+
+
+def test_seed_runs_once(counters):
+    metrics.seed()
+    counters.actual = {**COUNTS, "users_active": 99}
+    metrics.seed()
+
+    assert stored(counters)["users_active"] == 4
+
+
+def test_dashboard_never_recounts_on_a_cache_miss(counters, monkeypatch):
+    monkeypatch.setattr(async_mongo, "_db", FakeDatabase(asynchronous=True))
+    monkeypatch.setattr(metrics, "count_all", pytest.fail)
+    metrics.invalidate()
+
+    result = asyncio.run(metrics.dashboard_counters())
+
+    assert result == {
+        "total_reports": 0, "analyzed_reports": 0,
+        "active_users": 0, "assistant_queries": 0,
+    }
+    metrics.invalidate()
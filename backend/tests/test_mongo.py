@@ -0,0 +1,7 @@
+from app.db import mongo
+
+
+def test_sync_client_keeps_its_own_min_pool_size():
+    assert mongo.client.options.pool_options.min_pool_size == mongo.SYNC_CLIENT_OPTIONS["minPoolSize"]
+    assert mongo.SYNC_CLIENT_OPTIONS["minPoolSize"] == 0
+    assert mongo.SYNC_CLIENT_OPTIONS["maxPoolSize"] == mongo.CLIENT_OPTIONS["maxPoolSize"]
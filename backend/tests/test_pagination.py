@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.utils.pagination import _keyset_filter, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip_keeps_bson_types():
+    keys = [datetime(2024, 5, 17, 13, 0, 5), ObjectId("6650a1b2c3d4e5f601234567")]
+
+    token = encode_cursor(keys, "next")
+
+    assert "=" not in token
+    assert decode_cursor(token) == ("next", keys)
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "e30", encode_cursor([1], "sideways")])
+def test_foreign_cursors_are_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_keyset_filter_ascending():
+    sort = [("name", 1), ("_id", 1)]
+
+    assert _keyset_filter(sort, ["bob", 7]) == {"$or": [
+        {"name": {"$gt": "bob"}},
+        {"name": "bob", "_id": {"$gt": 7}},
+    ]}
+
+
+def test_keyset_filter_mixed_directions():
+    sort = [("created_at", -1), ("status", 1), ("_id", -1)]
+    when = datetime(2024, 1, 1)
+
+    assert _keyset_filter(sort, [when, "Active", 3]) == {"$or": [
+        {"created_at": {"$lt": when}},
+        {"created_at": when, "status": {"$gt": "Active"}},
+        {"created_at": when, "status": "Active", "_id": {"$lt": 3}},
+    ]}
@@ -0,0 +1,113 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.rag import reranker, retriever
+
+DOCS = [
+    {"id": "d0", "text": "Q: What is flu\nA: A virus", "source": "MedQuAD"},
+    {"id": "d1", "text": "Q: What is a cold\nA: A mild virus", "source": "MedQuAD"},
+    {"id": "d2", "text": "Q: What is gout\nA: A kind of arthritis", "source": "MedQuAD"},
+    {"id": "d3", "text": "Q: What is asthma\nA: An airway disease", "source": "MedQuAD"},
+]
+
+
+class FakeCrossEncoder:
+    """Scores a pair by its text's position in `preferred` (first = best)."""
+
+    def __init__(self, preferred=(), delay: float = 0.0):
+        self.preferred = list(preferred)
+        self.delay = delay
+        self.seen = []
+
+    def predict(self, pairs):
+        time.sleep(self.delay)
+        self.seen.extend(text for _, text in pairs)
+        return [
+            -self.preferred.index(text) if text in self.preferred else -100
+            for _, text in pairs
+        ]
+
+
+@pytest.fixture
+def cross_encoder(monkeypatch):
+    def install(**kwargs):
+        model = FakeCrossEncoder(**kwargs)
+        monkeypatch.setattr(reranker, "_cross_encoder", model)
+        return model
+    return install
+
+
+# =============================
+# BUDGET
+# =============================
+def test_no_budget_scores_nothing(cross_encoder):
+    model = cross_encoder()
+
+    order, stats = reranker.rerank("q", ["a", "b", "c"], budget_ms=0)
+
+    assert order is None and not model.seen
+    assert stats == {"fired": True, "completed": False, "ms": stats["ms"], "scored": 0}
+
+
+def test_stops_when_the_next_batch_would_overrun(cross_encoder, monkeypatch):
+    monkeypatch.setattr(reranker, "RERANK_BATCH", 2)
+    cross_encoder(delay=0.03)
+
+    order, stats = reranker.rerank("q", ["a", "b", "c", "d", "e", "f"], budget_ms=50)
+
+    assert order is None
+    assert stats["scored"] == 2 and not stats["completed"]
+
+
+def test_completes_within_budget(cross_encoder):
+    cross_encoder(preferred=["c", "a", "b"])
+
+    order, stats = reranker.rerank("q", ["a", "b", "c"], budget_ms=10_000)
+
+    assert list(order) == [2, 0, 1]
+    assert stats["completed"] and stats["scored"] == 3
+
+
+# =============================
+# CASCADE IN rank()
+# =============================
+@pytest.fixture
+def shortlist(build_store, monkeypatch):
+    """Rows 0..3 with fixed bi-encoder scores; reranking on and always ambiguous."""
+    build_store(DOCS, threshold=1.0)
+    retriever._load_store()
+
+    rows = np.arange(4)
+    scores = np.array([0.80, 0.78, 0.60, 0.20], dtype=np.float32)
+    monkeypatch.setattr(retriever, "_search_filtered", lambda vec, sources, k: (rows, scores))
+    monkeypatch.setattr(retriever, "MIN_SCORE", 0.35)
+    monkeypatch.setattr(retriever, "SCORE_GAP", 0.08)
+    monkeypatch.setattr(reranker, "RERANK_ENABLED", True)
+    monkeypatch.setattr(reranker, "RERANK_MARGIN", 0.05)
+    monkeypatch.setattr(reranker, "RERANK_BUDGET_MS", 10_000)
+    return [retriever._documents.text(row) for row in rows]
+
+
+def test_rerank_covers_the_pool_beyond_the_gap_cut(shortlist, cross_encoder):
+    # select_k keeps 2 rows (gap after 0.78); row 2 (0.60) is still above MIN_SCORE
+    model = cross_encoder(preferred=[shortlist[3], shortlist[2], shortlist[0]])
+
+    rows, scores, eligible, stats = retriever.rank("gout", 3)
+
+    assert stats["completed"] and eligible == 2
+    assert model.seen == shortlist[:3]  # below MIN_SCORE is never scored
+    assert list(rows[:eligible]) == [2, 0]
+    assert list(rows) == [2, 0, 1, 3]
+    assert scores[0] == pytest.approx(0.60)
+
+
+def test_unambiguous_shortlist_is_not_reranked(shortlist, cross_encoder, monkeypatch):
+    monkeypatch.setattr(reranker, "RERANK_MARGIN", 0.01)
+    model = cross_encoder(preferred=[shortlist[2]])
+
+    rows, _, eligible, stats = retriever.rank("flu", 3)
+
+    assert not stats["fired"] and not model.seen
+    assert list(rows[:eligible]) == [0, 1]
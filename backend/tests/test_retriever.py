@@ -0,0 +1,25 @@
+from app.rag.retriever import select_k
+
+
+def test_select_k_keeps_scores_above_threshold():
+    assert select_k([0.9, 0.88, 0.85, 0.83], 10, min_score=0.35, score_gap=0.08) == 4
+
+
+def test_select_k_stops_at_min_score():
+    assert select_k([0.6, 0.55, 0.3, 0.29], 10, min_score=0.35, score_gap=0.5) == 2
+
+
+def test_select_k_stops_at_first_large_gap():
+    assert select_k([0.9, 0.88, 0.7, 0.69], 10, min_score=0.35, score_gap=0.08) == 2
+
+
+def test_select_k_off_topic_query_gets_nothing():
+    assert select_k([0.2, 0.19], 10, min_score=0.35, score_gap=0.08) == 0
+
+
+def test_select_k_respects_max_k():
+    assert select_k([0.9] * 8, 3, min_score=0.35, score_gap=0.08) == 3
+
+
+def test_select_k_empty():
+    assert select_k([], 5) == 0
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from app.rag import retriever
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    rng = np.random.default_rng(7)
+    matrix = rng.normal(size=(5000, 32)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    monkeypatch.setattr(retriever, "_embeddings", matrix)
+    monkeypatch.setattr(retriever, "MIN_SHARD_ROWS", 100)
+    return matrix
+
+
+def query(matrix, seed: int):
+    vec = np.random.default_rng(seed).normal(size=matrix.shape[1]).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+@pytest.mark.parametrize("runs", [
+    [(0, 5000)],
+    [(0, 700), (1200, 1300), (2000, 4999)],  # a filtered search: several partitions
+])
+@pytest.mark.parametrize("shards", [2, 3, 8])
+def test_sharded_search_matches_a_single_shard(embeddings, runs, shards):
+    for seed in range(5):
+        vec = query(embeddings, seed)
+
+        rows, scores = retriever._search(vec, runs, 10, shards=shards)
+        single_rows, single_scores = retriever._search(vec, runs, 10, shards=1)
+
+        assert list(rows) == list(single_rows)
+        np.testing.assert_allclose(scores, single_scores)
+
+
+def test_search_is_the_exact_top_k(embeddings):
+    vec = query(embeddings, 0)
+    rows, scores = retriever._search(vec, [(0, 5000)], 10, shards=4)
+
+    expected = np.argsort(-(embeddings @ vec))[:10]
+    assert list(rows) == list(expected)
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_shards_cover_every_row_once(monkeypatch):
+    monkeypatch.setattr(retriever, "MIN_SHARD_ROWS", 100)
+    runs = [(0, 700), (1200, 1300), (2000, 4999)]
+
+    groups = retriever._split_shards(runs, 4)
+
+    covered = [row for group in groups for start, stop in group for row in range(start, stop)]
+    assert covered == [row for start, stop in runs for row in range(start, stop)]
+    assert 1 < len(groups) <= 4
@@ -0,0 +1,24 @@
+from pymongo.errors import DuplicateKeyError
+
+FORM = {
+    "fullname": "Alice",
+    "email": "Alice@Example.com",
+    "password": "Secret@123",
+    "confirm_password": "Secret@123",
+}
+
+
+def test_concurrent_signup_shows_already_registered(admin_client, monkeypatch):
+    users = admin_client.db["users"]
+
+    async def lost_race(doc):
+        # The other request inserted the same email after our find_one
+        raise DuplicateKeyError("E11000 duplicate key error index: email_unique")
+
+    monkeypatch.setattr(users, "insert_one", lost_race)
+
+    response = admin_client.post("/signup", data=FORM, follow_redirects=False)
+
+    assert response.status_code == 303
+    assert response.headers["location"] == "/signup"
+    assert "Email already registered" in response.headers["set-cookie"]
@@ -0,0 +1,50 @@
+import pytest
+
+from app.rag import retriever
+
+GARD = "BioASQ | 2_GARD_QA"
+
+
+def qa(doc_id, question, answer, source):
+    return {"id": doc_id, "text": f"Q: {question}\nA: {answer}", "source": source}
+
+
+@pytest.fixture(autouse=True)
+def overlapping_store(build_store):
+    # MedQuAD's copy of a GARD answer collapses into the BioASQ row
+    build_store([
+        qa("gard_1", "What is Fabry disease", "A lysosomal storage disorder", GARD),
+        qa("gard_2", "What causes Alport syndrome", "Mutations in collagen genes", GARD),
+        qa("mq_1", "What is Fabry disease", "A lysosomal storage disorder", "MedQuAD"),
+        qa("mq_2", "How is asthma treated", "Inhalers and avoiding triggers", "MedQuAD"),
+    ])
+
+
+def test_filter_finds_a_collapsed_duplicate_of_the_source():
+    context, cited = retriever.retrieve_context(
+        "What is Fabry disease", sources=["MedQuAD"], adaptive=False, top_k=1,
+    )
+
+    assert "lysosomal storage disorder" in context
+    assert set(cited) == {GARD, "MedQuAD"}
+
+
+def test_filter_still_excludes_other_sources():
+    context, _ = retriever.retrieve_context(
+        "What causes Alport syndrome", sources=["MedQuAD"], adaptive=False, top_k=2,
+    )
+
+    assert "collagen" not in context
+
+
+def test_family_name_selects_every_topic():
+    context, _ = retriever.retrieve_context(
+        "What causes Alport syndrome", sources=["bioasq"], adaptive=False, top_k=1,
+    )
+
+    assert "collagen" in context
+
+
+def test_unknown_sources():
+    retriever._load_store()
+    assert retriever.unknown_sources(["MedQuAD", "BioASQ", "medquadd"]) == ["medquadd"]
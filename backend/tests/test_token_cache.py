@@ -0,0 +1,84 @@
+import time
+import importlib.util
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+
+from app.core import security, token_cache
+
+
+def token_for(email, expires_in: float):
+    payload = {"sub": email, "exp": datetime.utcnow() + timedelta(seconds=expires_in)}
+    return jwt.encode(payload, security.SECRET_KEY, algorithm=security.ALGORITHM)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+def test_valid_token_is_cached_until_its_exp(monkeypatch):
+    token = token_for("a@example.com", 60)
+    assert token_cache.verify_token(token) == "a@example.com"
+
+    expires_at, email = token_cache._tokens[token]
+    assert email == "a@example.com"
+    assert expires_at <= time.time() + 61
+
+    # Served from the cache: no second verification
+    monkeypatch.setattr(token_cache, "verify_access_token", pytest.fail)
+    assert token_cache.verify_token(token) == "a@example.com"
+
+
+def test_expired_token_is_rejected_and_not_cached():
+    token = token_for("a@example.com", -5)
+
+    assert token_cache.verify_token(token) is None
+    assert token not in token_cache._tokens
+
+
+def test_cache_entry_is_not_served_past_exp(monkeypatch):
+    token = token_for("a@example.com", 60)
+    assert token_cache.verify_token(token) == "a@example.com"
+
+    later = time.time() + 120
+    monkeypatch.setattr(token_cache.time, "time", lambda: later)
+    monkeypatch.setattr(token_cache, "verify_access_token", lambda t: None)
+
+    assert token_cache.verify_token(token) is None
+    assert token not in token_cache._tokens
+
+
+def test_tampered_token_is_rejected():
+    token = token_for("a@example.com", 60)
+
+    assert token_cache.verify_token(token[:-2] + "xx") is None
+    assert security.decode_token("not a token") is None
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(token_cache, "TOKEN_CACHE_MAX_ENTRIES", 2)
+    tokens = [token_for(f"u{i}@example.com", 60) for i in range(3)]
+
+    for token in tokens:
+        token_cache.verify_token(token)
+
+    assert list(token_cache._tokens) == tokens[1:]
+
+
+def test_missing_secret_key_fails_at_import(monkeypatch):
+    monkeypatch.delenv("SECRET_KEY")
+    monkeypatch.setattr("dotenv.load_dotenv", lambda *args, **kwargs: False)
+
+    spec = importlib.util.spec_from_file_location("security_without_key", security.__file__)
+    with pytest.raises(RuntimeError, match="SECRET_KEY"):
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+
+
+def test_token_utils_signs_with_core_security():
+    from app.utils import token_utils
+
+    assert token_utils.create_access_token is security.create_access_token
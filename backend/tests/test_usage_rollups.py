@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import usage_rollups
+from app.services.usage_rollups import LATENCY_BINS_MS, STATE_ID, latency_percentile
+from fake_mongo import FakeCollection
+
+NOW_HOUR = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+
+
+def hist(**counts):
+    """Histogram with counts placed by bin index, e.g. hist(b0=3, b2=1)."""
+    values = [0] * (len(LATENCY_BINS_MS) + 1)
+    for name, count in counts.items():
+        values[int(name[1:])] = count
+    return values
+
+
+def test_no_data():
+    assert latency_percentile(hist(), 0.95) is None
+
+
+def test_interpolates_within_the_bin():
+    # 10 samples in (100, 250]: the median sits halfway through the bin
+    assert latency_percentile(hist(b1=10), 0.5) == 175
+    assert latency_percentile(hist(b1=10), 1.0) == 250
+
+
+def test_picks_the_bin_holding_the_rank():
+    # 90 fast requests, 10 in (1000, 2000]
+    values = hist(b0=90, b4=10)
+
+    assert latency_percentile(values, 0.5) <= 100
+    assert 1000 <= latency_percentile(values, 0.95) <= 2000
+
+
+def test_open_ended_last_bin_reports_its_lower_bound():
+    assert latency_percentile(hist(b10=5), 0.95) == LATENCY_BINS_MS[-1]
+
+
+# =============================
+# ROLLUP
+# =============================
+def record(at: datetime, **fields):
+    return {"created_at": at, "sources": ["MedQuAD"], "latency_ms": 300, **fields}
+
+
+@pytest.fixture
+def rollup_db(monkeypatch):
+    """Fake hot / metrics / rollup collections and an archive (list of records)."""
+    db = {
+        "conversations": FakeCollection(),
+        "metrics": FakeCollection(),
+        "usage_rollups": FakeCollection(),
+        "archive": [],
+    }
+    monkeypatch.setattr(usage_rollups, "conversations_collection", db["conversations"])
+    monkeypatch.setattr(usage_rollups, "metrics_collection", db["metrics"])
+    monkeypatch.setattr(usage_rollups, "usage_rollups_collection", db["usage_rollups"])
+
+    def archived_until():
+        days = [r["created_at"].replace(hour=0, minute=0) for r in db["archive"]]
+        return max(days) + timedelta(days=1) if days else None
+
+    def iter_archived(start=None, end=None, user=None):
+        return (
+            r for r in db["archive"]
+            if (start is None or r["created_at"] >= start)
+            and (end is None or r["created_at"] < end)
+        )
+
+    monkeypatch.setattr(usage_rollups, "archived_until", archived_until)
+    monkeypatch.setattr(usage_rollups, "iter_archived", iter_archived)
+    return db
+
+
+def bucket(db, granularity: str, start: datetime):
+    key = f"{start:%Y-%m-%dT%H}" if granularity == "hour" else f"{start:%Y-%m-%d}"
+    return db["usage_rollups"].find_one({"_id": f"{granularity}:{key}"})
+
+
+def test_rollup_counts_hot_records_into_hours_and_days(rollup_db):
+    rollup_db["conversations"].insert_many([
+        record(NOW_HOUR + timedelta(minutes=5), emergency=True),
+        record(NOW_HOUR + timedelta(minutes=10), pipeline="precomputed_answer"),
+    ])
+
+    usage_rollups.rollup()
+
+    hour = bucket(rollup_db, "hour", NOW_HOUR)
+    assert (hour["queries"], hour["emergencies"], hour["precomputed"]) == (2, 1, 1)
+    assert bucket(rollup_db, "day", NOW_HOUR.replace(hour=0))["queries"] == 2
+
+
+def test_empty_rollup_still_advances_the_watermark(rollup_db):
+    usage_rollups.rollup()
+
+    state = rollup_db["metrics"].find_one({"_id": STATE_ID})
+    assert state["rolled_until"] == NOW_HOUR
+
+
+def test_incremental_rollup_reads_archived_hours_from_the_archive(rollup_db):
+    # The watermark sits in a day that has since been archived and
+    # whose hot copies the TTL monitor already removed
+    archived_day = (NOW_HOUR - timedelta(days=3)).replace(hour=0)
+    late_hour = archived_day + timedelta(hours=23)
+    rollup_db["archive"] = [record(late_hour + timedelta(minutes=m)) for m in (1, 2, 3)]
+    rollup_db["metrics"].insert_one({
+        "_id": STATE_ID, "rolled_until": archived_day + timedelta(days=1),
+    })
+
+    usage_rollups.rollup()
+
+    assert bucket(rollup_db, "hour", late_hour)["queries"] == 3
+    assert bucket(rollup_db, "day", archived_day)["queries"] == 3
+
+
+def test_rebuild_keeps_old_buckets_until_the_new_ones_are_written(rollup_db, monkeypatch):
+    stale = {"_id": "hour:2000-01-01T00", "granularity": "hour",
+             "start": datetime(2000, 1, 1), "queries": 7}
+    rollup_db["usage_rollups"].insert_one(dict(stale))
+    rollup_db["conversations"].insert_one(record(NOW_HOUR))
+
+    def failing_write(*args):
+        raise RuntimeError("write failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(usage_rollups, "_write_hours", failing_write)
+        with pytest.raises(RuntimeError):
+            usage_rollups.rollup(rebuild=True)
+    assert rollup_db["usage_rollups"].find_one({"_id": stale["_id"]})["queries"] == 7
+
+    usage_rollups.rollup(rebuild=True)
+    assert rollup_db["usage_rollups"].find_one({"_id": stale["_id"]}) is None
+    assert bucket(rollup_db, "hour", NOW_HOUR)["queries"] == 1
+
+
+# =============================
+# ADMIN API
+# =============================
+def test_usage_endpoint_reads_the_day_rollups(admin_client):
+    today = NOW_HOUR.replace(hour=0)
+    day = usage_rollups._empty_bucket()
+    for latency in (120, 300, 900):
+        usage_rollups._add_record(day, record(today, latency_ms=latency, emergency=latency > 500))
+    admin_client.db["usage_rollups"].docs.append(usage_rollups._to_doc("day", today, day))
+
+    response = admin_client.get("/api/admin/usage", params={"periods": 7})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["granularity"] == "day"
+    assert len(body["series"]) == 7
+    assert body["series"][-1]["queries"] == 3
+    assert body["total"]["queries"] == 3
+    assert body["total"]["emergency_rate"] == round(1 / 3, 4)
+    assert body["total"]["top_sources"] == [{"source": "MedQuAD", "count": 3}]
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.core import dependencies
+from app.core.security import create_access_token
+from app.db import async_mongo
+from fake_mongo import FakeDatabase
+
+ALICE = {"email": "alice@example.com", "password": "hash", "role": "User", "status": "Active"}
+
+
+@pytest.fixture
+def users(monkeypatch):
+    """Empty user cache over a fake async users collection holding ALICE."""
+    monkeypatch.setattr(dependencies, "_users", {})
+    if not isinstance(async_mongo._db, FakeDatabase):
+        monkeypatch.setattr(async_mongo, "_db", FakeDatabase(asynchronous=True))
+    collection = async_mongo._db["users"]
+    collection.docs.append(dict(ALICE))
+    return collection
+
+
+def load(email="alice@example.com"):
+    return asyncio.run(dependencies.load_user(email))
+
+
+def set_role(users, role):
+    next(d for d in users.docs if d["email"] == "alice@example.com")["role"] = role
+
+
+def test_cached_user_is_served_until_invalidated(users):
+    assert load()["role"] == "User"
+    assert "password" not in load()
+
+    set_role(users, "Admin")
+    assert load()["role"] == "User"
+
+    dependencies.invalidate_user("alice@example.com")
+    assert load()["role"] == "Admin"
+
+
+def test_expired_entries_are_reloaded(users, monkeypatch):
+    monkeypatch.setattr(dependencies, "USER_CACHE_TTL_SECONDS", 0)
+    load()
+
+    set_role(users, "Admin")
+
+    assert load()["role"] == "Admin"
+
+
+def test_unknown_users_are_not_cached(users):
+    assert load("bob@example.com") is None
+
+    users.docs.append({"email": "bob@example.com", "role": "User"})
+
+    assert load("bob@example.com")["role"] == "User"
+
+
+def test_oldest_entry_is_evicted_when_full(users, monkeypatch):
+    monkeypatch.setattr(dependencies, "USER_CACHE_MAX_ENTRIES", 1)
+    users.docs.append({"email": "bob@example.com", "role": "User"})
+
+    load()
+    load("bob@example.com")
+
+    assert list(dependencies._users) == ["bob@example.com"]
+
+
+# =============================
+# ADMIN ENDPOINTS INVALIDATE
+# =============================
+@pytest.mark.parametrize("path, form, field, value", [
+    ("/admin/users/update-role", {"user_email_target": "Alice@Example.com", "new_role": "Admin"}, "role", "Admin"),
+    ("/admin/users/update-status", {"email": "Alice@Example.com", "status": "Disabled"}, "status", "Disabled"),
+])
+def test_admin_updates_invalidate_the_cached_user(admin_client, users, monkeypatch, path, form, field, value):
+    monkeypatch.setattr("app.modules.admin.router.send_role_change_email", lambda **kwargs: None)
+    load()
+    admin_client.cookies.set("access_token", create_access_token("admin@example.com"))
+
+    response = admin_client.post(path, data=form, follow_redirects=False)
+
+    assert response.status_code == 303
+    assert "alice@example.com" not in dependencies._users
+    assert load()[field] == value
@@ -0,0 +1,119 @@
+# app/utils/pagination.py
+"""
+Keyset (cursor) pagination for Motor collections.
+
+A page is fetched with a range filter on the sort keys of the last
+(or first) row seen instead of skip(), so every page costs the same
+index seek however deep it is. Cursors are opaque, URL-safe tokens.
+
+    page = await paginate(users_collection, query, [("_id", 1)],
+                          limit=limit, cursor=cursor)
+    page["items"], page["next_cursor"], page["prev_cursor"]
+
+The sort must end with a unique field (normally _id) so ties on the
+other keys still give a strict order.
+"""
+
+import base64
+import binascii
+
+from bson import json_util
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# =====================================================
+# CURSOR TOKENS
+# =====================================================
+def encode_cursor(keys, direction: str) -> str:
+    raw = json_util.dumps({"d": direction, "k": keys}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str):
+    """(direction, keys); ValueError if the token was not issued by us."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json_util.loads(raw)
+        direction, keys = data["d"], data["k"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+    if direction not in ("next", "prev") or not isinstance(keys, list):
+        raise ValueError("Invalid pagination cursor")
+    return direction, keys
+
+
+def clamp_limit(limit) -> int:
+    return max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+
+# =====================================================
+# KEYSET FILTER
+# =====================================================
+def _keyset_filter(sort, keys):
+    """
+    Rows strictly after `keys` in `sort` order:
+    (a > x) OR (a == x AND b > y) OR …
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: keys[j] for j, (f, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction > 0 else "$lt": keys[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def _keys(doc, sort):
+    return [doc.get(field) for field, _ in sort]
+
+
+# =====================================================
+# PAGINATE
+# =====================================================
+async def paginate(collection, query: dict, sort, limit: int = DEFAULT_PAGE_SIZE,
+                   cursor: str = None, projection: dict = None) -> dict:
+    """
+    One page of `collection.find(query)` in `sort` order.
+    The projection must keep every sort field (including _id).
+    """
+    limit = clamp_limit(limit)
+    direction, after = decode_cursor(cursor) if cursor else ("next", None)
+
+    # Walking backwards = same filter on the reversed order
+    effective_sort = sort if direction == "next" else [(f, -d) for f, d in sort]
+    if after is not None:
+        query = {"$and": [query, _keyset_filter(effective_sort, after)]}
+
+    docs = await (
+        collection
+        .find(query, projection)
+        .sort(effective_sort)
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
+
+    more = len(docs) > limit
+    docs = docs[:limit]
+
+    if direction == "next":
+        has_next, has_prev = more, after is not None
+    else:
+        docs.reverse()
+        has_next, has_prev = True, more
+
+    return {
+        "items": docs,
+        "limit": limit,
+        "next_cursor": encode_cursor(_keys(docs[-1], sort), "next") if docs and has_next else None,
+        "prev_cursor": encode_cursor(_keys(docs[0], sort), "prev") if docs and has_prev else None,
+    }
+
+
+def stringify_ids(docs):
+    """ObjectId → str so pages serialize as JSON."""
+    for doc in docs:
+        if "_id" in doc:
+            doc["_id"] = str(doc["_id"])
+    return docs
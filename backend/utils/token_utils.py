@@ -1,14 +1,3 @@
-# If you want separate token file — but using security.py is enough
-from app.core.security import create_access_token, decode_token
-from datetime import datetime, timedelta
-from jose import jwt
-import os
-
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
-
-def create_access_token(email: str):
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    payload = {"sub": email, "exp": expire}
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+# app/utils/token_utils.py
+# Tokens are signed in one place only; kept for older imports
+from app.core.security import create_access_token, decode_token  # noqa: F401